@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Benchmark end-to-end transkrip → post WordPress tanpa jaringan dan tanpa biaya.
+
+Alur kerja penuh (`main.run_workflow`, langkah 1-7) dijalankan dengan backend
+Gemini palsu (`lib/fake_gemini.py`), lalu hasilnya diupload ke WordPress tiruan
+(`benchmarks/mock_wordpress.py`). Setiap tingkat konkurensi dijalankan di proses
+terpisah dengan direktori kerja, cache dan ledger baru, sehingga peak RSS dan
+angka lainnya tidak saling memengaruhi.
+
+Dilaporkan per tingkat konkurensi: latensi p50/p95 per langkah dan per post,
+throughput (post/menit), peak RSS, byte yang ditulis ke disk dan byte upload.
+Hasil disimpan sebagai JSON (default: benchmarks/results/end_to_end-<commit>.json)
+dan bisa dibandingkan dengan hasil commit lain lewat --compare.
+
+Contoh:
+    python benchmarks/end_to_end.py
+    python benchmarks/end_to_end.py --posts 12 --concurrency 1 2 4 8 --backend "fake:latency=0.5,jitter=0.3"
+    python benchmarks/end_to_end.py --compare benchmarks/results/end_to_end-abc1234.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+import contextlib
+import subprocess
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+# Root project (direktori parent dari benchmarks)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(PROJECT_ROOT, "benchmarks", "results")
+
+DEFAULT_BACKEND = "fake:latency=0.3,jitter=0.2,error_rate=0.02,rate_limit_rate=0.02,retry_after=0.5,seed=1"
+
+# Urutan tampilan; "upload" dan "post" (total per post) diukur di benchmark ini
+STEP_NAMES = {"1": "1.Draft", "2": "2.Keyphrases", "keyphrase": "Pilih keyphrase", "3": "3.Blog",
+              "4": "4.Update SEO", "5": "5.Image", "6": "6.HTML", "7": "7.SEO JSON", "upload": "Upload WordPress",
+              "post": "Total per post"}
+
+_TRANSCRIPT_WORDS = (
+    "In this tutorial we configure the odoo inventory module step by step. First open the warehouse settings "
+    "and enable multi step routes, then create a new product with stock tracking. We receive goods from the "
+    "vendor, validate the receipt and check the stock moves report. Next we set reordering rules so the "
+    "replenishment scheduler creates purchase orders automatically when stock falls below the minimum."
+).split()
+
+def percentile(values, pct):
+    """Persentil dengan interpolasi linear (`pct` 0-100); None untuk list kosong."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+def peak_rss_mb():
+    """Peak RSS proses ini dalam MB (ru_maxrss: KB di Linux, byte di macOS)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def io_write_bytes():
+    """Byte yang ditulis proses ini ke storage (Linux /proc/self/io), atau None."""
+    try:
+        with open("/proc/self/io", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("write_bytes:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+def folder_bytes(path):
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+def write_transcripts(directory, count, words):
+    """Membuat `count` transkrip sintetis dengan kode video unik; mengembalikan path-nya."""
+    paths = []
+    for n in range(1, count + 1):
+        body = " ".join(_TRANSCRIPT_WORDS[i % len(_TRANSCRIPT_WORDS)] for i in range(words))
+        path = os.path.join(directory, f"Bench Odoo Inventory {n:03d} [benchvid{n:03d}].txt")
+        with open(path, "w", encoding="utf-8") as f:
+            # Sedikit variasi agar prompt (dan keputusan error fake backend) berbeda per post
+            f.write(f"Video {n}. {body}\n")
+        paths.append(path)
+    return paths
+
+def run_level(concurrency, posts, words, backend_spec, model_config, prompt, wp_latency, max_concurrency):
+    """
+    Menjalankan satu tingkat konkurensi di proses dan direktori kerja saat ini.
+
+    Returns:
+        dict: Metrik tingkat ini (lihat `summarize`).
+    """
+    from benchmarks.mock_wordpress import MockWordPress
+    from lib import gemini_api
+    import main as blog_workflow
+    import subs_blog_wordpress
+
+    wordpress = MockWordPress(latency=wp_latency).start()
+    os.environ.update(wordpress.env())
+    backend = gemini_api.set_backend(backend_spec)
+    inputs = write_transcripts(os.getcwd(), posts, words)
+    local = threading.local()
+    rows = []
+    rows_lock = threading.Lock()
+
+    def process(input_path):
+        steps = {}
+        start = time.perf_counter()
+        row = {"input": os.path.basename(input_path), "status": "ok", "error": "", "steps": steps}
+        try:
+            result = blog_workflow.run_workflow(
+                input_path, prompt, model_config, [1, 2, 3, 4, 5, 6, 7], use_cache=False,
+                max_concurrency=max_concurrency, force=True)
+            steps.update({str(step_id): step["seconds"] for step_id, step in result["steps"].items()
+                          if step["status"] == "ok"})
+            if getattr(local, "uploader", None) is None:
+                local.uploader = subs_blog_wordpress.create_uploader()
+            upload_start = time.perf_counter()
+            subs_blog_wordpress.upload_folder(local.uploader, result["output_dir"])
+            steps["upload"] = time.perf_counter() - upload_start
+            row["output_bytes"] = folder_bytes(result["output_dir"])
+        except Exception as e:
+            row["status"], row["error"] = "failed", str(e)
+        row["seconds"] = steps["post"] = time.perf_counter() - start
+        with rows_lock:
+            rows.append(row)
+
+    io_before = io_write_bytes()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(process, inputs))
+    wall = time.perf_counter() - start
+    io_after = io_write_bytes()
+    wordpress.stop()
+
+    return summarize(rows, wall, concurrency, {
+        "peak_rss_mb": peak_rss_mb(),
+        "io_write_bytes": io_after - io_before if io_before is not None and io_after is not None else None,
+        "upload_bytes": wordpress.stats["bytes_received"],
+        "wordpress_requests": {key: value for key, value in wordpress.stats.items() if key != "bytes_received"},
+        "backend_stats": backend.stats() if hasattr(backend, "stats") else {},
+    })
+
+def summarize(rows, wall, concurrency, extra):
+    """Menggabungkan hasil per post menjadi metrik satu tingkat konkurensi."""
+    ok = [row for row in rows if row["status"] == "ok"]
+    steps = {}
+    for step_id in STEP_NAMES:
+        values = [row["steps"][step_id] for row in ok if step_id in row["steps"]]
+        if values:
+            steps[step_id] = {"name": STEP_NAMES[step_id], "count": len(values),
+                              "p50": percentile(values, 50), "p95": percentile(values, 95), "max": max(values)}
+    return {
+        "concurrency": concurrency,
+        "posts": len(rows),
+        "ok": len(ok),
+        "failed": [{"input": row["input"], "error": row["error"]} for row in rows if row["status"] != "ok"],
+        "wall_seconds": wall,
+        "posts_per_minute": len(ok) / wall * 60 if wall else 0.0,
+        "output_bytes": sum(row.get("output_bytes", 0) for row in ok),
+        "steps": steps,
+        **extra,
+    }
+
+def run_child(args):
+    # Mode internal: satu tingkat konkurensi di direktori sementara, hasil ditulis ke --result
+    workdir = tempfile.mkdtemp(prefix=f"bench-e2e-c{args.level}-")
+    os.chdir(workdir)
+    # Ledger, cache respon dan indeks post dibuat baru agar run tidak saling memengaruhi
+    os.environ["GEMINI_USAGE_DB"] = os.path.join(workdir, "usage.db")
+    os.environ["GEMINI_CACHE_DIR"] = os.path.join(workdir, ".cache")
+    os.environ["POST_INDEX_DB"] = os.path.join(workdir, "post_index.db")
+    sys.path.insert(0, PROJECT_ROOT)
+    log_path = os.path.join(workdir, "run.log")
+    with open(log_path, "w", encoding="utf-8") as log, contextlib.redirect_stdout(log):
+        result = run_level(args.level, args.posts, args.words, args.backend, args.model_config, args.prompt,
+                           args.wp_latency, args.max_concurrency)
+    if args.keep:
+        result["workdir"] = workdir
+        result["log"] = log_path
+    else:
+        os.chdir(PROJECT_ROOT)
+        shutil.rmtree(workdir, ignore_errors=True)
+    with open(args.result, "w", encoding="utf-8") as f:
+        json.dump(result, f)
+
+def git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=PROJECT_ROOT,
+                               capture_output=True, text=True).stdout.strip()
+        return commit + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def print_level(result):
+    failed = f", {len(result['failed'])} gagal" if result["failed"] else ""
+    rss = f"{result['peak_rss_mb']:.0f} MB" if result["peak_rss_mb"] is not None else "n/a"
+    io = f"{result['io_write_bytes'] / 1024:.0f} KB" if result["io_write_bytes"] is not None else "n/a"
+    print(f"\n⏱️  Konkurensi {result['concurrency']}: {result['ok']}/{result['posts']} post{failed} dalam "
+          f"{result['wall_seconds']:.1f} detik → {result['posts_per_minute']:.1f} post/menit")
+    print(f"   Peak RSS {rss}, ditulis ke disk {io}, artefak {result['output_bytes'] / 1024:.0f} KB, "
+          f"upload {result['upload_bytes'] / 1024:.0f} KB")
+    print(f"   {'Langkah':<18} {'p50':>8} {'p95':>8} {'max':>8}")
+    for step in result["steps"].values():
+        print(f"   {step['name']:<18} {step['p50']:8.2f} {step['p95']:8.2f} {step['max']:8.2f}")
+    for failure in result["failed"][:3]:
+        print(f"   ❌ {failure['input']}: {failure['error']}")
+    if result.get("log"):
+        print(f"   📄 Log run: {result['log']}")
+
+def _delta(new, old):
+    if old in (None, 0) or new is None:
+        return "     n/a"
+    return f"{(new - old) / old * 100:+7.1f}%"
+
+def print_comparison(results, baseline):
+    """Mencetak selisih throughput dan latensi terhadap hasil JSON sebelumnya."""
+    print(f"\n📈 Dibandingkan dengan {baseline.get('commit', '?')} ({baseline.get('timestamp', '?')}):")
+    old_levels = {level["concurrency"]: level for level in baseline.get("levels", [])}
+    for level in results:
+        old = old_levels.get(level["concurrency"])
+        if old is None:
+            print(f"   Konkurensi {level['concurrency']}: tidak ada di baseline")
+            continue
+        print(f"   Konkurensi {level['concurrency']}: throughput {_delta(level['posts_per_minute'], old['posts_per_minute'])}, "
+              f"peak RSS {_delta(level['peak_rss_mb'], old.get('peak_rss_mb'))}")
+        for step_id, step in level["steps"].items():
+            old_step = old["steps"].get(step_id)
+            if old_step:
+                print(f"      {step['name']:<18} p50 {_delta(step['p50'], old_step['p50'])}  "
+                      f"p95 {_delta(step['p95'], old_step['p95'])}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark end-to-end transkrip → post dengan Gemini dan WordPress tiruan.")
+    parser.add_argument("--posts", type=int, default=8, help="Jumlah transkrip per tingkat konkurensi. (Default: %(default)s)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4], metavar="N",
+                        help="Tingkat konkurensi (post yang diproses bersamaan). (Default: 1 2 4)")
+    parser.add_argument("--words", type=int, default=1500, help="Panjang transkrip sintetis, kata. (Default: %(default)s)")
+    parser.add_argument("--backend", default=DEFAULT_BACKEND,
+                        help="Spesifikasi backend Gemini, lihat gemini_api.backend_from_spec. (Default: %(default)s)")
+    parser.add_argument("--model-config", default=os.path.join(PROJECT_ROOT, "model", "model.json"),
+                        help="Path konfigurasi model. (Default: model/model.json)")
+    parser.add_argument("--prompt", default=os.path.join(PROJECT_ROOT, "prompt", "prompt_tutorial_odoo18.md"),
+                        help="Path prompt Langkah 1. (Default: prompt/prompt_tutorial_odoo18.md)")
+    parser.add_argument("--wp-latency", type=float, default=0.05, help="Latensi WordPress tiruan per request, detik. (Default: %(default)s)")
+    parser.add_argument("--max-concurrency", type=int, default=4,
+                        help="Batas request Gemini bersamaan per proses. (Default: %(default)s)")
+    parser.add_argument("--json", metavar="PATH", help="Path hasil JSON. (Default: benchmarks/results/end_to_end-<commit>.json)")
+    parser.add_argument("--compare", metavar="PATH", help="Bandingkan dengan hasil JSON sebelumnya.")
+    parser.add_argument("--keep", action="store_true", help="Simpan direktori kerja (output, log run) setiap tingkat.")
+    parser.add_argument("--level", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.level:
+        run_child(args)
+        return
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    print(f"🧪 Benchmark end-to-end: {args.posts} post per tingkat, konkurensi {args.concurrency}, "
+          f"backend {args.backend}")
+    levels = []
+    for concurrency in args.concurrency:
+        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as tmp:
+            result_path = tmp.name
+        command = [sys.executable, os.path.abspath(__file__), "--level", str(max(1, concurrency)),
+                   "--result", result_path, "--posts", str(args.posts), "--words", str(args.words),
+                   "--backend", args.backend, "--model-config", os.path.abspath(args.model_config),
+                   "--prompt", os.path.abspath(args.prompt), "--wp-latency", str(args.wp_latency),
+                   "--max-concurrency", str(args.max_concurrency)] + (["--keep"] if args.keep else [])
+        completed = subprocess.run(command, cwd=PROJECT_ROOT)
+        if completed.returncode != 0:
+            print(f"❌ Tingkat konkurensi {concurrency} gagal (exit {completed.returncode})")
+            os.remove(result_path)
+            continue
+        with open(result_path, encoding="utf-8") as f:
+            result = json.load(f)
+        os.remove(result_path)
+        levels.append(result)
+        print_level(result)
+
+    if baseline:
+        print_comparison(levels, baseline)
+
+    commit = git_commit()
+    output = args.json or os.path.join(RESULTS_DIR, f"end_to_end-{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"commit": commit, "timestamp": datetime.now().isoformat(timespec="seconds"),
+                   "python": sys.version.split()[0], "platform": sys.platform,
+                   "settings": {"posts": args.posts, "words": args.words, "backend": args.backend,
+                                "model_config": os.path.relpath(args.model_config, PROJECT_ROOT),
+                                "wp_latency": args.wp_latency, "max_concurrency": args.max_concurrency},
+                   "levels": levels}, f, indent=2)
+    print(f"\n💾 Hasil disimpan ke {output}")
+    if len(levels) != len(args.concurrency):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark waktu start (cold start) skrip CLI tanpa jaringan.
+
+Setiap target dijalankan beberapa kali sebagai proses baru untuk mengukur waktu
+wall-clock, lalu sekali lagi dengan `python -X importtime` untuk melihat modul
+mana yang paling lama diimpor.
+
+Contoh:
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --runs 10 --top 15 --json bench_import.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+# Root project (direktori parent dari benchmarks)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Invokasi yang tidak memanggil jaringan sama sekali
+TARGETS = {
+    "import main": ["-c", "import main"],
+    "main.py --help": ["main.py", "--help"],
+    "usage.py --help": ["usage.py", "--help"],
+    "subs_blog_wordpress.py --help": ["subs_blog_wordpress.py", "--help"],
+    "wordpress_uploader.py --help": ["wordpress_uploader.py", "--help"],
+    "gemini_tts_2_subs.py --help": ["gemini_tts_2_subs.py", "--help"],
+}
+
+def parse_importtime(stderr):
+    """
+    Mem-parsing output `-X importtime`.
+
+    Returns:
+        list: dict {"module", "self_us", "cumulative_us", "depth"} sesuai urutan impor.
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            stripped = name.lstrip()
+            rows.append({"module": stripped.strip(), "self_us": int(self_us), "cumulative_us": int(cumulative_us),
+                         # Setiap tingkat impor bersarang menambah dua spasi
+                         "depth": (len(name) - len(stripped) - 1) // 2})
+        except ValueError:
+            continue
+    return rows
+
+def measure(args, runs):
+    """Menjalankan target `runs` kali dan sekali dengan -X importtime."""
+    seconds = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=PROJECT_ROOT, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL)
+        seconds.append(time.perf_counter() - start)
+    traced = subprocess.run([sys.executable, "-X", "importtime"] + args, cwd=PROJECT_ROOT,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    imports = parse_importtime(traced.stderr)
+    return {
+        "runs": runs,
+        "min_seconds": min(seconds),
+        "median_seconds": statistics.median(seconds),
+        "import_seconds": sum(row["cumulative_us"] for row in imports if row["depth"] == 0) / 1_000_000,
+        "modules": len(imports),
+        "imports": imports,
+        "exit_code": traced.returncode,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Ukur waktu start skrip CLI dengan -X importtime.")
+    parser.add_argument("targets", nargs="*", metavar="TARGET",
+                        help=f"Target yang diukur (default: semua). Pilihan: {', '.join(TARGETS)}")
+    parser.add_argument("--runs", type=int, default=5, help="Jumlah run per target. (Default: %(default)s)")
+    parser.add_argument("--top", type=int, default=8, help="Jumlah modul terlambat yang ditampilkan. (Default: %(default)s)")
+    parser.add_argument("--json", metavar="PATH", help="Simpan hasil lengkap sebagai JSON.")
+    args = parser.parse_args()
+    unknown = [name for name in args.targets if name not in TARGETS]
+    if unknown:
+        parser.error(f"Target tidak dikenal: {', '.join(unknown)}")
+
+    results = {}
+    for name in args.targets or list(TARGETS):
+        result = measure(TARGETS[name], max(1, args.runs))
+        results[name] = result
+        status = "" if result["exit_code"] == 0 else f" (exit {result['exit_code']})"
+        print(f"\n⏱️  {name}{status}: median {result['median_seconds'] * 1000:.0f} ms, "
+              f"min {result['min_seconds'] * 1000:.0f} ms, impor {result['import_seconds'] * 1000:.0f} ms "
+              f"({result['modules']} modul)")
+        slowest = sorted(result["imports"], key=lambda row: row["cumulative_us"], reverse=True)[:args.top]
+        for row in slowest:
+            print(f"   {row['cumulative_us'] / 1000:8.1f} ms  {'  ' * row['depth']}{row['module']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "results": results}, f, indent=2)
+        print(f"\n💾 Hasil disimpan ke {args.json}")
+
+if __name__ == "__main__":
+    main()
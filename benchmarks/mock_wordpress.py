@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+WordPress tiruan untuk benchmark: melayani endpoint yang dipakai
+`wordpress_uploader.WordPressUploader` (media, posts, Rank Math) di localhost
+tanpa menyimpan apa pun, dengan latensi yang bisa diatur.
+
+Contoh (server terpisah untuk subs_blog_wordpress.py):
+    python benchmarks/mock_wordpress.py --port 8090 --latency 0.2
+    WP_URL=http://127.0.0.1:8090 WP_USERNAME=bench WP_PASSWORD=bench python subs_blog_wordpress.py ...
+"""
+import json
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class MockWordPress:
+    """
+    Server WordPress tiruan yang berjalan di thread latar belakang.
+
+    Args:
+        latency (float): Jeda setiap request, detik (meniru round-trip ke server asli).
+        host (str): Alamat bind.
+        port (int): Port; 0 = port bebas acak.
+    """
+    def __init__(self, latency=0.0, host="127.0.0.1", port=0):
+        self.latency = latency
+        self._lock = threading.Lock()
+        self._next_id = 1000
+        self.stats = {"media": 0, "posts": 0, "rankmath": 0, "other": 0, "bytes_received": 0}
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self):
+        """Variabel lingkungan untuk WordPressUploader agar memakai server ini."""
+        return {"WP_URL": self.url, "WP_USERNAME": "bench", "WP_PASSWORD": "bench"}
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-wordpress", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _record(self, kind, size):
+        with self._lock:
+            self.stats[kind] += 1
+            self.stats["bytes_received"] += size
+            self._next_id += 1
+            return self._next_id
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def reply(self, status, data):
+                body = json.dumps(data).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                size = int(self.headers.get("Content-Length") or 0)
+                self.rfile.read(size)
+                if mock.latency:
+                    time.sleep(mock.latency)
+                if self.path.endswith("/wp/v2/media"):
+                    item_id = mock._record("media", size)
+                    self.reply(201, {"id": item_id, "source_url": f"{mock.url}/media/{item_id}.jpg"})
+                elif self.path.endswith("/wp/v2/posts"):
+                    item_id = mock._record("posts", size)
+                    self.reply(201, {"id": item_id, "link": f"{mock.url}/?p={item_id}"})
+                elif "rank-math-api" in self.path:
+                    mock._record("rankmath", size)
+                    self.reply(200, {"rank_math_title": "updated", "rank_math_description": "updated",
+                                     "rank_math_focus_keyword": "updated"})
+                else:
+                    mock._record("other", size)
+                    self.reply(404, {"code": "rest_no_route"})
+
+        return Handler
+
+def main():
+    parser = argparse.ArgumentParser(description="Jalankan WordPress tiruan untuk benchmark upload.")
+    parser.add_argument("--host", default="127.0.0.1", help="Alamat bind (default: %(default)s).")
+    parser.add_argument("--port", type=int, default=8090, help="Port (default: %(default)s).")
+    parser.add_argument("--latency", type=float, default=0.0, help="Jeda per request, detik (default: 0).")
+    args = parser.parse_args()
+
+    server = MockWordPress(args.latency, args.host, args.port).start()
+    print(f"🧪 WordPress tiruan berjalan di {server.url} (Ctrl+C untuk berhenti)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print(f"\n📊 {server.stats}")
+        server.stop()
+
+if __name__ == "__main__":
+    main()
@@ -2,17 +2,18 @@
 import os
 import argparse
 from dotenv import load_dotenv, find_dotenv
-import google.generativeai as genai
 
 def configure_api():
     """
     Load GANAI_API_KEY from .env or environment and configure the client.
     """
     load_dotenv(find_dotenv())
+    # Diimpor saat dipakai agar --help tidak menunggu impor google.generativeai
+    from lib import gemini_api
     api_key = os.getenv("GANAI_API_KEY")
-    if not api_key:
+    if not api_key and gemini_api.backend().requires_api_key:
         raise RuntimeError("Environment variable GANAI_API_KEY belum diset")
-    genai.configure(api_key=api_key)
+    gemini_api.configure(api_key)
 
 def build_prompt(language: str, fmt: str) -> str:
     """
@@ -52,8 +53,10 @@ def process_audio(audio_path: str, language: str, fmt: str) -> str:
         }
     ]
 
-    response = genai.GenerativeModel("gemini-1.5-flash-latest") \
-                  .generate_content(contents)
+    # Lewat backend aktif: SDK asli, atau backend offline dengan GEMINI_BACKEND=fake
+    from lib import gemini_api, retry
+    model = gemini_api.get_model("gemini-1.5-flash-latest")
+    response = retry.call_with_retry(lambda: model.generate_content(contents), label="gemini-1.5-flash-latest")
     return response.text
 
 def main():
@@ -10,11 +10,6 @@ import sys
 import re
 import requests
 from urllib.parse import urlparse, parse_qs
-try:
-    from youtube_transcript_api import YouTubeTranscriptApi
-except ImportError:
-    print("Error: youtube-transcript-api is required. Install with: pip install youtube-transcript-api")
-    sys.exit(1)
 
 def extract_video_id(url_or_code):
     """Extract YouTube video ID from URL or return if it's already a code"""
@@ -113,6 +108,13 @@ def format_time_vtt(seconds):
 
 def download_subtitles(video_id, subtitle_formats=['txt'], language='en'):
     """Download subtitles for a YouTube video in one or more formats"""
+    # Imported here so that importing this module (e.g. from subs_blog_wordpress) never exits the process
+    try:
+        from youtube_transcript_api import YouTubeTranscriptApi
+    except ImportError:
+        print("Error: youtube-transcript-api is required. Install with: pip install youtube-transcript-api")
+        return None
+
     try:
         transcript_data_raw = None
         
@@ -0,0 +1,173 @@
+import os
+import time
+import sqlite3
+import threading
+from datetime import datetime
+from . import model_registry, usage_ledger, utils
+
+# Perkiraan token output jika generation_config tidak membatasi max_output_tokens
+MIN_OUTPUT_TOKENS = 1024
+MAX_OUTPUT_TOKENS = 65536
+
+# Reservasi yang tidak pernah di-settle (proses mati) berhenti dihitung setelah ini
+STALE_RESERVATION_SECONDS = 3600
+
+class BudgetExceeded(Exception):
+    """Dilempar jika panggilan akan melampaui batas biaya dan tidak ada model yang lebih murah."""
+
+# Satu run = satu proses main.py/worker; reservasi run lain dihitung hanya untuk batas harian
+RUN_ID = f"{os.getpid()}-{int(time.time())}"
+
+_config = {"daily_limit": None, "run_limit": None, "fallback_models": (), "on_exceed": "downgrade"}
+_config_lock = threading.Lock()
+
+def configure(daily_limit=None, run_limit=None, fallback_models=(), on_exceed="downgrade"):
+    """
+    Mengatur batas biaya (biasanya dari bagian "budget" di model/*.json atau opsi CLI).
+
+    Args:
+        daily_limit (float, optional): Batas biaya per hari (USD) untuk semua proses.
+        run_limit (float, optional): Batas biaya untuk proses ini (USD).
+        fallback_models (iterable): Model teks yang boleh dipakai sebagai pengganti
+            yang lebih murah, mis. semua model_* di konfigurasi.
+        on_exceed (str): "downgrade" (pakai model lebih murah jika muat) atau "refuse".
+    """
+    if on_exceed not in ("downgrade", "refuse"):
+        raise ValueError(f"on_exceed tidak dikenal: {on_exceed} (pilih downgrade atau refuse)")
+    with _config_lock:
+        _config.update(daily_limit=daily_limit, run_limit=run_limit, fallback_models=tuple(fallback_models),
+                       on_exceed=on_exceed)
+
+def enabled():
+    return _config["daily_limit"] is not None or _config["run_limit"] is not None
+
+class Reservation:
+    """
+    Biaya yang dipesan untuk satu panggilan. `settle` mengganti estimasi dengan
+    biaya sebenarnya, `release` membatalkannya (mis. panggilan gagal).
+    """
+    def __init__(self, model_name, amount=0.0, reservation_id=None):
+        self.model = model_name
+        self.amount = amount
+        self.id = reservation_id
+
+    def settle(self, usage, images_generated=0):
+        if self.id is None:
+            return
+        actual = utils.estimate_cost(self.model, usage, images_generated) if usage else self.amount
+        _update(self.id, actual)
+        self.id = None
+
+    def release(self):
+        if self.id is None:
+            return
+        _update(self.id, 0.0)
+        self.id = None
+
+def _update(reservation_id, amount):
+    conn = usage_ledger.connect()
+    try:
+        with conn:
+            conn.execute("UPDATE reservations SET amount = ?, settled = 1 WHERE id = ?", (amount, reservation_id))
+    except sqlite3.Error as e:
+        print(f"⚠️ Gagal memperbarui reservasi anggaran: {e}")
+    finally:
+        conn.close()
+
+def _spent(conn, day, run_id=None):
+    # Biaya yang sudah di-settle ditambah reservasi aktif (yang basi diabaikan)
+    column, key = ("run_id", run_id) if run_id else ("day", day)
+    return conn.execute(
+        f"SELECT COALESCE(SUM(amount), 0) FROM reservations WHERE {column} = ? AND (settled = 1 OR created_at > ?)",
+        (key, time.time() - STALE_RESERVATION_SECONDS)).fetchone()[0]
+
+def spent():
+    """
+    Returns:
+        dict: {"today": float, "run": float} biaya yang sudah dipakai atau sedang dipesan.
+    """
+    conn = usage_ledger.connect()
+    try:
+        day = datetime.now().strftime('%Y-%m-%d')
+        return {"today": _spent(conn, day), "run": _spent(conn, day, RUN_ID)}
+    finally:
+        conn.close()
+
+def estimate_call_cost(model_name, prompt_tokens, generation_config=None, images=0):
+    """Estimasi biaya satu panggilan sebelum dikirim (output dibatasi max_output_tokens jika ada)."""
+    max_output = (generation_config or {}).get("max_output_tokens") if isinstance(generation_config, dict) else None
+    output_tokens = 0 if images else min(MAX_OUTPUT_TOKENS, max_output or max(MIN_OUTPUT_TOKENS, prompt_tokens))
+    return utils.estimate_cost(model_name, utils.Usage(prompt_tokens=prompt_tokens, output_tokens=output_tokens),
+                               images_generated=images)
+
+def reserve(model_name, prompt_tokens, generation_config=None, images=0):
+    """
+    Memesan estimasi biaya sebelum panggilan API. Pengecekan dan pemesanan
+    dilakukan dalam satu transaksi SQLite, sehingga aman untuk banyak proses.
+
+    Args:
+        model_name (str): Model yang diminta.
+        prompt_tokens (int): Token prompt (hasil count_tokens atau perkiraan).
+        generation_config (dict, optional): Dipakai untuk batas token output.
+        images (int): Jumlah gambar (panggilan gambar tidak di-downgrade).
+
+    Returns:
+        Reservation: `reservation.model` bisa berbeda dari `model_name` jika di-downgrade.
+
+    Raises:
+        BudgetExceeded: Jika batas akan terlampaui dan tidak ada model pengganti yang muat.
+    """
+    if not enabled():
+        return Reservation(model_name)
+    with _config_lock:
+        config = dict(_config)
+
+    candidates = [model_name]
+    if not images and config["on_exceed"] == "downgrade":
+        # Pengganti harus punya kemampuan yang dibutuhkan panggilan ini (lihat registry model)
+        needs = "structured_output" if "response_schema" in (generation_config or {}) else "text"
+        # Dari yang termahal: pakai model terbaik yang masih muat dalam sisa anggaran
+        cheaper = {model for model in config["fallback_models"]
+                   if model != model_name and model_registry.lookup(model).supports(needs)
+                   and estimate_call_cost(model, prompt_tokens, generation_config)
+                   < estimate_call_cost(model_name, prompt_tokens, generation_config)}
+        candidates += sorted(cheaper, key=lambda model: estimate_call_cost(model, prompt_tokens, generation_config),
+                             reverse=True)
+
+    day = datetime.now().strftime('%Y-%m-%d')
+    conn = usage_ledger.connect()
+    try:
+        conn.isolation_level = None
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            today, this_run = _spent(conn, day), _spent(conn, day, RUN_ID)
+            for candidate in candidates:
+                amount = estimate_call_cost(candidate, prompt_tokens, generation_config, images)
+                over_daily = config["daily_limit"] is not None and today + amount > config["daily_limit"]
+                over_run = config["run_limit"] is not None and this_run + amount > config["run_limit"]
+                if over_daily or over_run:
+                    continue
+                cursor = conn.execute(
+                    "INSERT INTO reservations (day, run_id, model, amount, created_at, pid) VALUES (?, ?, ?, ?, ?, ?)",
+                    (day, RUN_ID, candidate, amount, time.time(), os.getpid()))
+                conn.execute("COMMIT")
+                if candidate != model_name:
+                    print(f"💸 Anggaran hampir habis: '{model_name}' diganti '{candidate}' "
+                          f"(estimasi ${amount:.4f}, terpakai hari ini ${today:.4f}, run ini ${this_run:.4f}).")
+                return Reservation(candidate, amount, cursor.lastrowid)
+            conn.execute("ROLLBACK")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.close()
+
+    limits = []
+    if config["daily_limit"] is not None:
+        limits.append(f"harian ${today:.4f}/${config['daily_limit']:.4f}")
+    if config["run_limit"] is not None:
+        limits.append(f"run ${this_run:.4f}/${config['run_limit']:.4f}")
+    amount = estimate_call_cost(model_name, prompt_tokens, generation_config, images)
+    raise BudgetExceeded(f"Panggilan '{model_name}' (estimasi ${amount:.4f}) melampaui batas anggaran "
+                         f"({', '.join(limits)})")
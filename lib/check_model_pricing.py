@@ -1,37 +1,13 @@
 #!/usr/bin/env python3
 import os
+import sys
 import google.generativeai as genai
 from dotenv import load_dotenv
 
-# Data harga berdasarkan dokumentasi resmi Google AI per Juni 2024.
-# Harga dapat berubah. Selalu periksa halaman harga resmi untuk data terbaru.
-# Harga dikonversi ke per 1.000 karakter untuk kemudahan perbandingan.
-MODEL_PRICING = {
-    # Model Gemini 1.5
-    "gemini-1.5-pro": {
-        "input_per_1k_chars": 0.0035,
-        "output_per_1k_chars": 0.0105,
-        "notes": "Model Pro, kemampuan canggih."
-    },
-    "gemini-1.5-flash": {
-        "input_per_1k_chars": 0.00035,
-        "output_per_1k_chars": 0.00105,
-        "notes": "Model Flash, sangat cepat dan hemat biaya."
-    },
-    # Model Gemini 1.0
-    "gemini-1.0-pro": {
-        "input_per_1k_chars": 0.0005,
-        "output_per_1k_chars": 0.0015,
-        "notes": "Model Pro generasi sebelumnya."
-    },
-    # Model untuk pembuatan gambar (harga per gambar)
-    "gemini-1.5-pro-latest": { # Seringkali model latest menunjuk ke 1.5 Pro
-        "input_per_1k_chars": 0.0035,
-        "output_per_1k_chars": 0.0105,
-        "image_generation_cost": 0.0180, # Estimasi biaya per gambar
-        "notes": "Versi terbaru dari model Pro."
-    },
-}
+# Skrip ini dijalankan langsung (python lib/check_model_pricing.py), jadi root project
+# ditambahkan ke path agar registry model bersama bisa diimpor
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lib import model_registry
 
 def check_models_with_pricing():
     """
@@ -50,18 +26,20 @@ def check_models_with_pricing():
         if 'generateContent' in m.supported_generation_methods:
             print(f"🔹 Nama Model: {m.name}")
             
-            # Cari harga untuk model ini
-            # Kita periksa jika nama model ada di dalam kunci dictionary
-            pricing_info = next((MODEL_PRICING[key] for key in MODEL_PRICING if key in m.name), None)
+            # Cari data model di registry (nama persis atau prefix terpanjang)
+            info = model_registry.lookup(m.name, warn=False)
 
-            if pricing_info:
-                print(f"   - Harga Input:  ${pricing_info.get('input_per_1k_chars', 'N/A'):.5f} / 1k karakter")
-                print(f"   - Harga Output: ${pricing_info.get('output_per_1k_chars', 'N/A'):.5f} / 1k karakter")
-                if 'image_generation_cost' in pricing_info:
-                    print(f"   - Harga Gambar: ${pricing_info.get('image_generation_cost', 'N/A'):.4f} / gambar")
-                print(f"   - Catatan:      {pricing_info.get('notes', 'Tidak ada')}\n")
+            if info.known:
+                pricing = info.pricing
+                print(f"   - Entri registry: {info.key}")
+                print(f"   - Harga Input:  ${pricing['input']:.4f} / 1 juta token")
+                print(f"   - Harga Output: ${pricing['output']:.4f} / 1 juta token")
+                if 'per_image' in pricing:
+                    print(f"   - Harga Gambar: ${pricing['per_image']:.4f} / gambar")
+                print(f"   - Context:      {info.context_window} token, RPM {info.rpm or '-'}, TPM {info.tpm or '-'}")
+                print(f"   - Kemampuan:    {', '.join(sorted(info.capabilities))}\n")
             else:
-                print("   - Harga:        Tidak ada data harga di skrip ini.\n")
+                print("   - Harga:        Tidak ada di registry model (config/models.json).\n")
 
 if __name__ == "__main__":
     check_models_with_pricing()
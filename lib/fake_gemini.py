@@ -0,0 +1,397 @@
+import re
+import time
+import inspect
+import random
+import asyncio
+import hashlib
+import threading
+from io import BytesIO
+from collections import Counter
+from types import SimpleNamespace
+from . import utils
+
+# Backend Gemini palsu untuk benchmark dan uji beban tanpa API key, tanpa jaringan
+# dan tanpa biaya. Respon dibuat dari template berdasarkan jenis prompt (draf blog,
+# keyphrase SEO, structured output, metadata SEO, HTML, transkripsi SRT/VTT, gambar)
+# sehingga `run_workflow` dan `gemini_tts_2_subs.process_audio` berjalan utuh.
+# Latensi, error 5xx dan 429 bisa disuntikkan; keputusan gagal/berhasil diturunkan
+# dari seed + prompt + nomor percobaan, jadi hasilnya sama di setiap run meski
+# urutan thread berbeda.
+
+_STOPWORDS = {
+    "this", "that", "with", "from", "have", "will", "your", "what", "when", "then", "there", "they", "them",
+    "into", "just", "like", "about", "also", "here", "which", "would", "could", "should", "these", "those",
+    "were", "been", "being", "more", "most", "some", "such", "than", "only", "over", "very", "file", "using",
+    "yang", "dengan", "untuk", "dari", "pada", "akan", "atau", "juga", "dalam", "kita", "kamu", "saya",
+    "context", "konteks", "post", "blog", "create", "make", "sure", "content", "following", "provided",
+}
+_FALLBACK_WORDS = ("odoo", "inventory", "setup", "module", "workflow")
+_SCORES = (8.5, 8.0, 7.5, 7.0, 6.5)
+
+# Perkiraan token audio Gemini: ~32 token per detik, MP3 128 kbps ~16 KB per detik
+_AUDIO_BYTES_PER_TOKEN = 500
+_AUDIO_BYTES_PER_SECOND = 16000
+_IMAGE_OUTPUT_TOKENS = 1290
+_STREAM_CHUNK_CHARS = 200
+
+class FakeApiError(Exception):
+    """Error API tiruan; atribut `code` dibaca `retry.status_code` seperti error SDK Google."""
+    def __init__(self, code, message):
+        super().__init__(f"{code} {message}")
+        self.code = code
+
+def _split_contents(contents):
+    # Prompt bisa berupa string, atau list part (str / dict {"text"} / dict {"inline_data"})
+    if isinstance(contents, str):
+        return contents, 0
+    texts, binary = [], 0
+    for part in contents if isinstance(contents, (list, tuple)) else [contents]:
+        if isinstance(part, str):
+            texts.append(part)
+        elif isinstance(part, dict):
+            if "text" in part:
+                texts.append(part["text"])
+            data = (part.get("inline_data") or {}).get("data")
+            binary += len(data or b"")
+        else:
+            texts.append(str(getattr(part, "text", "") or ""))
+    return "\n".join(texts), binary
+
+def _context(prompt_text):
+    # Konteks (transkrip/draf) ditempel setelah pemisah '---' terakhir oleh langkah workflow,
+    # didahului satu baris label ("Konteks dari file `x.md`:")
+    context = prompt_text.rsplit("\n---\n", 1)[-1].strip() if "\n---\n" in prompt_text else prompt_text
+    label, _, rest = context.partition("\n")
+    return rest if label.rstrip().endswith(":") else context
+
+def _topic_words(text, count=4):
+    words = re.findall(r"[a-z][a-z0-9]{3,}", text.lower())
+    top = [word for word, _ in Counter(w for w in words if w not in _STOPWORDS).most_common(count)]
+    return top + [word for word in _FALLBACK_WORDS if word not in top][:count - len(top)]
+
+def _keyphrases(text):
+    w = _topic_words(text)
+    return [f"{w[0]} {w[1]}", f"{w[0]} {w[2]} guide", f"{w[1]} {w[2]}", f"{w[0]} tutorial", f"{w[0]} {w[3]} setup"]
+
+def _title(keyphrase):
+    return f"{keyphrase.title()}: 7 Easy Steps for Beginners"
+
+def _classify(prompt_text, generation_config):
+    if generation_config and "response_schema" in generation_config:
+        return "structured"
+    head = prompt_text[:400]
+    if head.lstrip().startswith("Transcribe"):
+        return "transcribe"
+    if "seo.json" in head:
+        return "seo_json"
+    if "SEO-focused keyphrases" in head:
+        return "keyphrases"
+    if "Meta Description" in prompt_text[:2000] and "Social Share" in prompt_text[:2000]:
+        return "seo_meta"
+    if "HTML" in head:
+        return "html"
+    return "markdown"
+
+class FakeBackend:
+    """
+    Backend pengganti SDK Gemini untuk benchmark offline (`GEMINI_BACKEND=fake`).
+
+    Args:
+        latency (float): Jeda dasar setiap request, detik.
+        jitter (float): Tambahan jeda acak 0..jitter detik.
+        tokens_per_second (float): Kecepatan "generasi" token output; 0 = instan.
+        error_rate (float): Peluang request gagal dengan 503 (error sementara).
+        rate_limit_rate (float): Peluang request ditolak dengan 429.
+        retry_after (float): `retryDelay` yang disarankan pada error 429, detik.
+        seed (int): Seed untuk keputusan acak (deterministik per prompt dan percobaan).
+        image_size (int): Sisi gambar JPEG yang dihasilkan, piksel.
+        max_output_words (int): Batas kata isi draf/blog yang dihasilkan.
+    """
+    name = "fake"
+    requires_api_key = False
+
+    def __init__(self, latency=0.05, jitter=0.0, tokens_per_second=0.0, error_rate=0.0, rate_limit_rate=0.0,
+                 retry_after=1.0, seed=0, image_size=1024, max_output_words=900):
+        self.latency = float(latency)
+        self.jitter = float(jitter)
+        self.tokens_per_second = float(tokens_per_second)
+        self.error_rate = float(error_rate)
+        self.rate_limit_rate = float(rate_limit_rate)
+        self.retry_after = float(retry_after)
+        self.seed = seed
+        self.image_size = int(image_size)
+        self.max_output_words = int(max_output_words)
+        self._attempts = Counter()
+        self._stats = Counter()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_options(cls, text):
+        """
+        Membuat backend dari string opsi "kunci=nilai,...", mis.
+        "latency=0.5,error_rate=0.1,rate_limit_rate=0.05,seed=7".
+
+        Raises:
+            ValueError: Jika opsi tidak dikenal atau nilainya bukan angka.
+        """
+        defaults = inspect.signature(cls).parameters
+        options = {}
+        for item in filter(None, (part.strip() for part in (text or "").split(","))):
+            key, _, value = item.partition("=")
+            key = key.strip()
+            if key not in defaults:
+                raise ValueError(f"Opsi backend fake tidak dikenal: {key}")
+            try:
+                options[key] = type(defaults[key].default)(value.strip())
+            except ValueError:
+                raise ValueError(f"Nilai opsi '{key}' harus angka, bukan {value!r}")
+        return cls(**options)
+
+    def __repr__(self):
+        return (f"FakeBackend(latency={self.latency}, jitter={self.jitter}, tokens_per_second={self.tokens_per_second}, "
+                f"error_rate={self.error_rate}, rate_limit_rate={self.rate_limit_rate}, seed={self.seed})")
+
+    # --- Antarmuka backend (lihat gemini_api.GeminiBackend) ---
+
+    def configure(self, api_key):
+        pass
+
+    def model(self, model_name):
+        return FakeModel(self, model_name)
+
+    def cached_model(self, cached_content):
+        return FakeModel(self, cached_content.model, cached_content)
+
+    def create_cached_content(self, model_name, display_name, text, ttl_seconds):
+        self._count("cached_contents")
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()[:12]
+        return SimpleNamespace(name=f"cachedContents/fake-{digest}", model=model_name, display_name=display_name,
+                               text=text, delete=lambda: self._count("cached_deletes"))
+
+    def image_client(self, api_key):
+        return FakeImageClient(self)
+
+    def image_config(self):
+        return None
+
+    def stats(self):
+        """Returns: dict jumlah request per jenis dan error yang disuntikkan."""
+        with self._lock:
+            return dict(self._stats)
+
+    # --- Simulasi ---
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def _rng(self, kind, prompt_text):
+        # Percobaan ke-n untuk prompt yang sama selalu mendapat angka acak yang sama
+        key = hashlib.sha256(f"{kind}\0{prompt_text}".encode("utf-8")).hexdigest()
+        with self._lock:
+            self._attempts[key] += 1
+            attempt = self._attempts[key]
+        return random.Random(f"{self.seed}:{key}:{attempt}")
+
+    def _inject_failure(self, rng, model_name):
+        roll = rng.random()
+        if roll < self.rate_limit_rate:
+            self._count("errors_429")
+            raise FakeApiError(429, f"Resource has been exhausted (fake, model {model_name}). "
+                                    f"{{'retryDelay': '{self.retry_after:g}s'}}")
+        if roll < self.rate_limit_rate + self.error_rate:
+            self._count("errors_5xx")
+            raise FakeApiError(503, f"The service is currently unavailable (fake, model {model_name}).")
+
+    def _delay(self, rng, output_tokens):
+        delay = self.latency + rng.random() * self.jitter
+        if self.tokens_per_second > 0:
+            delay += output_tokens / self.tokens_per_second
+        return delay
+
+    def prepare_text(self, model_name, contents, generation_config=None, cached_text=""):
+        """
+        Membuat respon teks (tanpa menunggu) untuk satu request.
+
+        Returns:
+            tuple: (respon dengan `.text` dan `usage_metadata`, jeda detik).
+
+        Raises:
+            FakeApiError: Jika error 429/503 disuntikkan untuk request ini.
+        """
+        prompt_text, binary = _split_contents(contents)
+        rng = self._rng(model_name, cached_text + prompt_text)
+        self._inject_failure(rng, model_name)
+        kind = _classify(prompt_text, generation_config)
+        self._count("text")
+        self._count(f"text_{kind}")
+        text = getattr(self, f"_render_{kind}")(prompt_text, cached_text, binary)
+        cached_tokens = utils.estimate_tokens(cached_text) if cached_text else 0
+        metadata = SimpleNamespace(
+            prompt_token_count=utils.estimate_tokens(prompt_text) + binary // _AUDIO_BYTES_PER_TOKEN + cached_tokens,
+            candidates_token_count=utils.estimate_tokens(text),
+            cached_content_token_count=cached_tokens,
+            thoughts_token_count=0)
+        return SimpleNamespace(text=text, usage_metadata=metadata), self._delay(rng, metadata.candidates_token_count)
+
+    def prepare_image(self, model_name, prompt_text):
+        """Seperti `prepare_text`, untuk respon gambar (JPEG) ala google.genai."""
+        rng = self._rng(f"image:{model_name}", prompt_text)
+        self._inject_failure(rng, model_name)
+        self._count("image")
+        from PIL import Image, ImageDraw
+
+        size = (self.image_size, self.image_size)
+        gradient = Image.linear_gradient("L").resize(size)
+        image = Image.merge("RGB", (gradient, gradient.rotate(90), Image.new("L", size, rng.randrange(256))))
+        draw = ImageDraw.Draw(image)
+        for _ in range(12):
+            x, y = rng.randrange(size[0]), rng.randrange(size[1])
+            draw.rectangle((x, y, x + rng.randrange(20, 200), y + rng.randrange(20, 200)),
+                           fill=(rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+        draw.text((20, 20), prompt_text[:80], fill=(255, 255, 255))
+        buffer = BytesIO()
+        image.save(buffer, format="JPEG", quality=90)
+
+        parts = [SimpleNamespace(text="Here is the generated image.", inline_data=None),
+                 SimpleNamespace(text=None, inline_data=SimpleNamespace(mime_type="image/jpeg", data=buffer.getvalue()))]
+        metadata = SimpleNamespace(prompt_token_count=utils.estimate_tokens(prompt_text),
+                                   candidates_token_count=_IMAGE_OUTPUT_TOKENS,
+                                   cached_content_token_count=0, thoughts_token_count=0)
+        response = SimpleNamespace(text=parts[0].text, usage_metadata=metadata,
+                                   candidates=[SimpleNamespace(content=SimpleNamespace(parts=parts))])
+        return response, self._delay(rng, _IMAGE_OUTPUT_TOKENS)
+
+    # --- Template respon per jenis prompt ---
+
+    def _body_words(self, text):
+        words = [word for word in re.findall(r"\S+", _context(text)) if not word.startswith(("#", "_"))]
+        return words[:self.max_output_words] or list(_FALLBACK_WORDS)
+
+    def _render_markdown(self, prompt_text, cached_text, binary):
+        source = cached_text + "\n" + prompt_text
+        keyphrase = _keyphrases(_context(source))[0]
+        words = self._body_words(source)
+        lines = [f"# {_title(keyphrase)}", "",
+                 f"This guide explains {keyphrase} step by step, based on the original tutorial.", ""]
+        for number, start in enumerate(range(0, len(words), 120), 1):
+            lines += [f"## Step {number}: {' '.join(words[start:start + 4]).strip('.,')}", "",
+                      " ".join(words[start:start + 120]), ""]
+        lines += ["## Conclusion", "", f"You now know how to handle {keyphrase}.", ""]
+        return "\n".join(lines)
+
+    def _render_keyphrases(self, prompt_text, cached_text, binary):
+        phrases = _keyphrases(_context(prompt_text))
+        return "\n".join(["Here are 5 SEO-focused keyphrases:", ""] +
+                         [f"{number}. {phrase} (score: {score})"
+                          for number, (phrase, score) in enumerate(zip(phrases, _SCORES), 1)])
+
+    def _render_structured(self, prompt_text, cached_text, binary):
+        import json
+        items = []
+        for index, phrase in enumerate(_keyphrases(_context(cached_text + "\n" + prompt_text))):
+            items.append({
+                "keyphrase": phrase, "search_volume": 3 - index // 2, "keyword_difficulty": 2,
+                "search_intent": 3 - index % 2, "meta_title": _title(phrase)[:60],
+                "meta_description": f"{phrase.capitalize()}: learn the setup in minutes with this practical guide."[:150],
+                "slug": phrase.replace(" ", "-"), "social_description": f"Master {phrase} today. #{phrase.split()[0]}",
+            })
+        return json.dumps({"keyphrases": items}, ensure_ascii=False)
+
+    def _render_seo_meta(self, prompt_text, cached_text, binary):
+        keyphrase = _keyphrases(_context(prompt_text))[0]
+        return "\n".join([
+            f"**Focus Keyphrase:** {keyphrase}",
+            f"**Meta Title:** {_title(keyphrase)[:60]}",
+            f"**Slug:** {keyphrase.replace(' ', '-')}",
+            f"**Meta Description:** {keyphrase.capitalize()}: learn the setup in minutes with this practical guide.",
+            f"**Social Share Description:** Master {keyphrase} today with a clear walkthrough. "
+            f"#{keyphrase.split()[0]} #tutorial",
+        ])
+
+    def _render_seo_json(self, prompt_text, cached_text, binary):
+        import json
+        keyphrase = _keyphrases(_context(prompt_text))[0]
+        return json.dumps({"meta": {"rank_math_title": _title(keyphrase)[:60],
+                                    "rank_math_description": f"{keyphrase.capitalize()}: a practical guide.",
+                                    "rank_math_focus_keyword": keyphrase},
+                           "slug": keyphrase.replace(" ", "-")}, indent=2)
+
+    def _render_html(self, prompt_text, cached_text, binary):
+        from . import markdown_html
+        # Markdown ditempel setelah instruksi; mulai dari judul pertama
+        heading = re.search(r"^# ", prompt_text, re.MULTILINE)
+        markdown = prompt_text[heading.start():] if heading else prompt_text
+        return markdown_html.render_blog_post(markdown)
+
+    def _render_transcribe(self, prompt_text, cached_text, binary):
+        seconds = max(2, binary // _AUDIO_BYTES_PER_SECOND)
+        cues = list(range(0, seconds, 3))
+        if "SRT" in prompt_text:
+            def stamp(value):
+                return f"{value // 3600:02d}:{value // 60 % 60:02d}:{value % 60:02d},000"
+            blocks = [f"{n}\n{stamp(start)} --> {stamp(min(start + 3, seconds))}\nFake subtitle line {n}."
+                      for n, start in enumerate(cues, 1)]
+            return "\n\n".join(blocks) + "\n"
+        if "WebVTT" in prompt_text:
+            def stamp(value):
+                return f"{value // 3600:02d}:{value // 60 % 60:02d}:{value % 60:02d}.000"
+            blocks = [f"{stamp(start)} --> {stamp(min(start + 3, seconds))}\nFake subtitle line {n}."
+                      for n, start in enumerate(cues, 1)]
+            return "WEBVTT\n\n" + "\n\n".join(blocks) + "\n"
+        return " ".join(f"Fake subtitle line {n}." for n in range(1, len(cues) + 1)) + "\n"
+
+class FakeModel:
+    """Pengganti `GenerativeModel`: `generate_content` (biasa/stream), versi async, dan `count_tokens`."""
+    def __init__(self, backend, model_name, cached_content=None):
+        self.backend = backend
+        self.model_name = model_name
+        self.cached_text = cached_content.text if cached_content else ""
+
+    def generate_content(self, contents, generation_config=None, stream=False, **kwargs):
+        response, delay = self.backend.prepare_text(self.model_name, contents, generation_config, self.cached_text)
+        if stream:
+            self.backend._count("stream")
+            return self._stream(response, delay)
+        time.sleep(delay)
+        return response
+
+    async def generate_content_async(self, contents, generation_config=None, **kwargs):
+        response, delay = self.backend.prepare_text(self.model_name, contents, generation_config, self.cached_text)
+        await asyncio.sleep(delay)
+        return response
+
+    def _stream(self, response, delay):
+        # Jeda dibagi rata antar chunk; chunk terakhir membawa usage_metadata seperti SDK
+        text = response.text
+        pieces = [text[i:i + _STREAM_CHUNK_CHARS] for i in range(0, len(text), _STREAM_CHUNK_CHARS)] or [""]
+        for index, piece in enumerate(pieces):
+            time.sleep(delay / len(pieces))
+            last = index == len(pieces) - 1
+            yield SimpleNamespace(text=piece, usage_metadata=response.usage_metadata if last else None)
+
+    def count_tokens(self, contents):
+        self.backend._count("count_tokens")
+        prompt_text, binary = _split_contents(contents)
+        return SimpleNamespace(total_tokens=utils.estimate_tokens(prompt_text) + binary // _AUDIO_BYTES_PER_TOKEN)
+
+class _FakeImageModels:
+    def __init__(self, backend):
+        self.backend = backend
+
+    def generate_content(self, model, contents, config=None):
+        response, delay = self.backend.prepare_image(model, _split_contents(contents)[0])
+        time.sleep(delay)
+        return response
+
+class _FakeAsyncImageModels(_FakeImageModels):
+    async def generate_content(self, model, contents, config=None):
+        response, delay = self.backend.prepare_image(model, _split_contents(contents)[0])
+        await asyncio.sleep(delay)
+        return response
+
+class FakeImageClient:
+    """Pengganti klien `google.genai`: `client.models` dan `client.aio.models`."""
+    def __init__(self, backend):
+        self.models = _FakeImageModels(backend)
+        self.aio = SimpleNamespace(models=_FakeAsyncImageModels(backend))
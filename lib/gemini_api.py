@@ -1,33 +1,552 @@
-import google.generativeai as genai
-from google import genai as genai_image
-from google.genai import types
-from PIL import Image
+import os
+import asyncio
+import datetime
+import hashlib
+import time
+import threading
+import weakref
 from io import BytesIO
+from . import budget, model_registry, response_cache, rate_limit, retry, tracing, usage_ledger, utils
 
-def call_gemini(prompt_text, model_name):
+# Jumlah maksimum request Gemini yang boleh berjalan bersamaan (sync maupun async).
+DEFAULT_MAX_CONCURRENCY = 4
+
+# Pool objek model/klien yang dipakai ulang antar panggilan
+_models = {}
+_image_clients = {}
+_pool_lock = threading.Lock()
+
+_max_concurrency = DEFAULT_MAX_CONCURRENCY
+_sync_slots = threading.BoundedSemaphore(DEFAULT_MAX_CONCURRENCY)
+# Satu semaphore asyncio per event loop, karena semaphore terikat ke loop tempat ia dipakai
+_async_slots = weakref.WeakKeyDictionary()
+
+_preflight = False
+
+# Backend aktif: SDK Google asli, atau backend lain (mis. "fake" untuk benchmark offline)
+# yang dipilih lewat GEMINI_BACKEND atau `set_backend`.
+_backend = None
+
+# SDK Google dan PIL baru diimpor saat pertama dipakai: impornya memakan ~1,5 detik,
+# padahal --help, --plan dan langkah lokal tidak memanggil API sama sekali.
+
+class GeminiBackend:
+    """
+    Backend bawaan: SDK `google.generativeai` untuk teks dan `google.genai` untuk gambar.
+    Backend lain cukup menyediakan method yang sama (lihat `fake_gemini.FakeBackend`).
+    """
+    name = "gemini"
+    requires_api_key = True
+
+    def configure(self, api_key):
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+
+    def model(self, model_name):
+        import google.generativeai as genai
+        return genai.GenerativeModel(model_name)
+
+    def cached_model(self, cached_content):
+        import google.generativeai as genai
+        return genai.GenerativeModel.from_cached_content(cached_content=cached_content)
+
+    def create_cached_content(self, model_name, display_name, text, ttl_seconds):
+        from google.generativeai import caching
+        return caching.CachedContent.create(
+            model=model_name if model_name.startswith("models/") else f"models/{model_name}",
+            display_name=display_name,
+            contents=[text],
+            ttl=datetime.timedelta(seconds=ttl_seconds),
+        )
+
+    def image_client(self, api_key):
+        from google import genai as genai_image
+        return genai_image.Client(api_key=api_key)
+
+    def image_config(self):
+        from google.genai import types
+        return types.GenerateContentConfig(response_modalities=['TEXT', 'IMAGE'])
+
+def backend_from_spec(spec):
+    """
+    Membuat backend dari spesifikasi teks: "gemini" (default), "fake", atau
+    "fake:latency=0.5,error_rate=0.1,rate_limit_rate=0.05,seed=7".
+
+    Raises:
+        ValueError: Jika nama backend atau opsinya tidak dikenal.
+    """
+    name, _, options = (spec or "gemini").partition(":")
+    name = name.strip().lower()
+    if name == "gemini":
+        return GeminiBackend()
+    if name == "fake":
+        from .fake_gemini import FakeBackend
+        return FakeBackend.from_options(options)
+    raise ValueError(f"Backend Gemini tidak dikenal: {name} (pilih gemini atau fake)")
+
+def set_backend(new_backend):
+    """
+    Mengganti backend untuk semua panggilan berikutnya dan mengosongkan pool model/klien.
+    Selain backend asli, pemakaian dicatat ke ledger terpisah (usage.<nama>.db)
+    kecuali GEMINI_USAGE_DB diset, agar angka palsu tidak ikut anggaran harian.
+
+    Args:
+        new_backend: Objek backend, atau spesifikasi teks untuk `backend_from_spec`.
+
+    Returns:
+        Backend yang aktif.
+    """
+    global _backend
+    if new_backend is None or isinstance(new_backend, str):
+        new_backend = backend_from_spec(new_backend)
+    with _pool_lock:
+        _backend = new_backend
+        _models.clear()
+        _image_clients.clear()
+    if not os.environ.get("GEMINI_USAGE_DB"):
+        default_path = usage_ledger.DEFAULT_DB_PATH
+        path = default_path if new_backend.name == "gemini" else \
+            os.path.join(os.path.dirname(default_path), f"usage.{new_backend.name}.db")
+        if usage_ledger.db_path() != path:
+            usage_ledger.configure(path)
+    return new_backend
+
+def backend():
+    """Mengembalikan backend aktif; pada pemakaian pertama dipilih dari GEMINI_BACKEND."""
+    if _backend is None:
+        set_backend(os.environ.get("GEMINI_BACKEND"))
+    return _backend
+
+def configure(api_key):
+    """Mengonfigurasi backend aktif dengan API key (untuk SDK asli, mengimpor SDK saat itu juga)."""
+    backend().configure(api_key)
+
+def set_max_concurrency(limit):
+    """
+    Mengatur jumlah maksimum request Gemini yang berjalan bersamaan di proses ini.
+
+    Batas yang tidak berubah dipertahankan, sehingga memanggil ulang fungsi ini
+    di setiap run (mis. mode batch, worker, server) tidak mengganti semaphore
+    yang sedang dipegang panggilan dari post lain.
+
+    Args:
+        limit (int): Batas request paralel (minimal 1).
+    """
+    global _max_concurrency, _sync_slots
+    limit = max(1, int(limit))
+    with _pool_lock:
+        if limit == _max_concurrency:
+            return
+        _max_concurrency = limit
+        _sync_slots = threading.BoundedSemaphore(limit)
+        _async_slots.clear()
+
+def _get_async_slots():
+    loop = asyncio.get_running_loop()
+    with _pool_lock:
+        slots = _async_slots.get(loop)
+        if slots is None:
+            slots = asyncio.Semaphore(_max_concurrency)
+            _async_slots[loop] = slots
+        return slots
+
+def get_model(model_name):
+    """Mengambil objek `GenerativeModel` dari pool, membuatnya sekali per nama model."""
+    current = backend()
+    with _pool_lock:
+        model = _models.get(model_name)
+        if model is None:
+            model = current.model(model_name)
+            _models[model_name] = model
+        return model
+
+def get_image_client(api_key):
+    """Mengambil klien `google.genai` dari pool, membuatnya sekali per API key."""
+    current = backend()
+    with _pool_lock:
+        client = _image_clients.get(api_key)
+        if client is None:
+            client = current.image_client(api_key)
+            _image_clients[api_key] = client
+        return client
+
+class ContextCache:
+    """
+    Teks konteks (biasanya transkrip) yang diunggah sekali ke Gemini sebagai
+    cached content lalu dirujuk oleh beberapa langkah. Cache dibuat secara lazy
+    per model pada pemakaian pertama; jika model tidak mendukung caching atau
+    teks terlalu pendek, `get` mengembalikan None dan langkah memakai teks inline.
+
+    Args:
+        text (str): Isi konteks yang akan di-cache.
+        display_name (str): Nama cache di Gemini (untuk identifikasi).
+        ttl_seconds (int): Umur cache; sebaiknya sepanjang durasi satu run.
+        min_tokens (int): Perkiraan token minimum agar caching diterima API.
+    """
+    def __init__(self, text, display_name="transcript", ttl_seconds=3600, min_tokens=1024):
+        self.text = text
+        self.display_name = display_name[:120]
+        self.ttl_seconds = ttl_seconds
+        self.min_tokens = min_tokens
+        self.content_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        self._handles = {}
+        self._lock = threading.Lock()
+
+    def get(self, model_name):
+        """Mengembalikan objek `CachedContent` untuk model, atau None untuk fallback inline."""
+        with self._lock:
+            if model_name in self._handles:
+                return self._handles[model_name]
+
+            handle = None
+            if not model_registry.lookup(model_name).supports("caching"):
+                print(f"ℹ️  Model '{model_name}' tidak mendukung context caching, memakai teks inline.")
+            elif utils.estimate_tokens(self.text) < self.min_tokens:
+                print(f"ℹ️  Konteks terlalu pendek untuk context caching ({model_name}), memakai teks inline.")
+            else:
+                try:
+                    print(f"🗄️  Mengunggah konteks ke cache Gemini untuk model '{model_name}' (TTL {self.ttl_seconds} detik)...")
+                    handle = backend().create_cached_content(model_name, self.display_name, self.text,
+                                                             self.ttl_seconds)
+                except Exception as e:
+                    print(f"⚠️ Context caching tidak tersedia untuk '{model_name}', memakai teks inline: {e}")
+            self._handles[model_name] = handle
+            return handle
+
+    def invalidate(self, model_name):
+        """Menandai cache model sebagai tidak dapat dipakai (mis. kedaluwarsa) sehingga langkah memakai inline."""
+        with self._lock:
+            self._handles[model_name] = None
+
+    def unavailable(self, model_name):
+        """True jika cache untuk model sudah dicoba dan tidak bisa dipakai (tidak didukung, terlalu pendek atau kedaluwarsa)."""
+        with self._lock:
+            return model_name in self._handles and self._handles[model_name] is None
+
+    def close(self):
+        """Menghapus semua cached content yang dibuat agar tidak ditagih lebih lama dari run."""
+        with self._lock:
+            for model_name, handle in self._handles.items():
+                if handle is None:
+                    continue
+                try:
+                    handle.delete()
+                except Exception as e:
+                    print(f"⚠️ Gagal menghapus context cache untuk '{model_name}': {e}")
+            self._handles.clear()
+
+def get_cached_model(cached_content):
+    """Mengambil `GenerativeModel` yang terikat ke cached content, dari pool."""
+    current = backend()
+    with _pool_lock:
+        key = f"cached:{cached_content.name}"
+        model = _models.get(key)
+        if model is None:
+            model = current.cached_model(cached_content)
+            _models[key] = model
+        return model
+
+def _image_config():
+    return backend().image_config()
+
+def _cache_name(model_name):
+    # Respon backend selain Gemini asli disimpan di namespace sendiri di cache respon lokal
+    current = backend()
+    return model_name if current.name == "gemini" else f"{current.name}/{model_name}"
+
+def _pause_on_rate_limit(model_name):
+    # Saat server mengembalikan 429, tahan semua worker untuk model ini selama jeda backoff
+    def on_retry(exc, delay):
+        if retry.status_code(exc) == 429:
+            rate_limit.pause(model_name, delay)
+    return on_retry
+
+def _image_from_response(response):
+    from PIL import Image
+    for part in response.candidates[0].content.parts:
+        if part.inline_data is not None:
+            return Image.open(BytesIO(part.inline_data.data))
+    return None
+
+def _resolve_model(model_name, context):
+    # Model biasa dari pool, atau model yang terikat ke context cache (None jika cache tidak tersedia)
+    if context:
+        cached_content = context.get(model_name)
+        if cached_content is None:
+            return None
+        return get_cached_model(cached_content)
+    return get_model(model_name)
+
+def _is_context_error(exc):
+    # Cached content kedaluwarsa atau sudah dihapus: 404, atau 400/403 yang menyebut cached content
+    code = retry.status_code(exc)
+    message = str(exc).lower()
+    mentions_cache = any(marker in message for marker in ("cachedcontent", "cached content", "cached_content"))
+    return code == 404 or (mentions_cache and code in (None, 400, 403))
+
+def _chunk_text(chunk):
+    # Chunk terakhir bisa hanya berisi finish_reason tanpa teks
+    try:
+        return chunk.text
+    except ValueError:
+        return ""
+
+def stream_gemini(prompt_text, model_name, generation_config=None, context=None, usage_sink=None):
+    """
+    Memanggil Gemini dalam mode streaming dan menghasilkan potongan teks
+    segera setelah diterima. Retry hanya berlaku sampai streaming dimulai;
+    error di tengah streaming diteruskan ke pemanggil.
+
+    Args:
+        prompt_text (str): Prompt lengkap untuk dikirim ke model.
+        model_name (str): Nama model yang akan digunakan.
+        generation_config (dict, optional): Konfigurasi generasi untuk model.
+        context (ContextCache, optional): Konteks yang sudah di-cache di Gemini.
+        usage_sink (list, optional): Chunk terakhir yang membawa `usage_metadata`
+            ditambahkan ke list ini setelah streaming selesai.
+
+    Yields:
+        str: Potongan teks respon.
+
+    Raises:
+        RuntimeError: Jika context cache tidak tersedia untuk model.
+    """
+    model = _resolve_model(model_name, context)
+    if model is None:
+        raise RuntimeError(f"Context cache tidak tersedia untuk '{model_name}'")
+
+    def request():
+        rate_limit.acquire(model_name, utils.estimate_tokens(prompt_text))
+        return model.generate_content(prompt_text, generation_config=generation_config, stream=True)
+
+    # Slot konkurensi ditahan selama streaming berlangsung, bukan hanya saat request dibuka
+    with _sync_slots:
+        response = retry.call_with_retry(request, label=model_name, on_retry=_pause_on_rate_limit(model_name))
+        last_with_usage = None
+        for chunk in response:
+            if getattr(chunk, "usage_metadata", None):
+                last_with_usage = chunk
+            text = _chunk_text(chunk)
+            if text:
+                yield text
+        if usage_sink is not None and last_with_usage is not None:
+            usage_sink.append(last_with_usage)
+
+def _stream_to_file(prompt_text, model_name, generation_config, context, partial_path):
+    # Menulis setiap potongan ke file .partial; mengembalikan (teks lengkap, chunk dengan usage)
+    start = time.perf_counter()
+    first_token = None
+    parts = []
+    usage_sink = []
+    with open(partial_path, 'w', encoding='utf-8') as f:
+        for text in stream_gemini(prompt_text, model_name, generation_config, context, usage_sink):
+            if first_token is None:
+                first_token = time.perf_counter() - start
+                print(f"📡 Token pertama dari '{model_name}' diterima setelah {first_token:.1f} detik, "
+                      f"menulis ke {partial_path}")
+            f.write(text)
+            f.flush()
+            parts.append(text)
+    full_text = "".join(parts)
+    print(f"📡 Streaming selesai: {len(full_text)} karakter dalam {time.perf_counter() - start:.1f} detik.")
+    return full_text, (usage_sink[0] if usage_sink else None)
+
+def count_tokens(prompt_text, model_name):
+    """
+    Pre-flight: menghitung token prompt dengan tokenizer model (endpoint
+    `countTokens`, tanpa generasi dan tanpa biaya). Jika gagal, memakai
+    perkiraan `utils.estimate_tokens`.
+
+    Returns:
+        int: Jumlah token input.
+    """
+    try:
+        model = get_model(model_name)
+        result = retry.call_with_retry(lambda: model.count_tokens(prompt_text), label=f"count_tokens {model_name}")
+        return result.total_tokens
+    except Exception as e:
+        print(f"⚠️ count_tokens gagal untuk '{model_name}', memakai perkiraan: {e}")
+        return utils.estimate_tokens(prompt_text)
+
+def set_preflight(enabled):
+    """Mengaktifkan estimasi token dan biaya (`count_tokens`) sebelum setiap panggilan generasi."""
+    global _preflight
+    _preflight = bool(enabled)
+
+def _preflight_tokens(prompt_text, model_name):
+    # Token prompt untuk rate limiter: hasil count_tokens jika pre-flight aktif, selain itu perkiraan
+    if not _preflight:
+        return utils.estimate_tokens(prompt_text)
+    tokens = count_tokens(prompt_text, model_name)
+    cost = utils.estimate_cost(model_name, utils.Usage(prompt_tokens=tokens))
+    print(f"🔢 Pre-flight '{model_name}': {tokens} token input, estimasi biaya input ${cost:.6f}")
+    return tokens
+
+def _trace_result(span, result, usage):
+    # Token, byte output dan hasil panggilan untuk span API
+    if not tracing.enabled():
+        return
+    if result is None:
+        span.fail("Panggilan Gemini gagal atau ditolak anggaran")
+        return
+    if isinstance(result, str):
+        span.set(output_chars=len(result), bytes_received=len(result.encode("utf-8")))
+    elif hasattr(result, "size"):
+        span.set(image_size="x".join(map(str, result.size)))
+    if usage is not None:
+        span.set(prompt_tokens=usage.prompt_tokens, output_tokens=usage.output_tokens,
+                 cached_tokens=usage.cached_tokens, thinking_tokens=usage.thinking_tokens,
+                 from_cache=usage.from_cache, served_by=usage.model or None)
+
+def call_gemini(prompt_text, model_name, generation_config=None, context=None, stream_to=None):
     """
     Memanggil Gemini API dengan prompt dan model tertentu.
+    Respon untuk kombinasi (model, prompt, konfigurasi) yang sama diambil dari cache lokal.
+    Request melewati rate limiter per model dan diulang otomatis untuk error
+    sementara (429/5xx) dengan exponential backoff. Estimasi biaya dipesan lebih
+    dulu di `budget`; jika batas anggaran akan terlampaui, model diganti yang
+    lebih murah (`usage.model`) atau panggilan ditolak.
 
     Args:
         prompt_text (str): Prompt lengkap untuk dikirim ke model.
         model_name (str): Nama model yang akan digunakan.
+        generation_config (dict, optional): Konfigurasi generasi untuk model.
+        context (ContextCache, optional): Konteks yang sudah di-cache di Gemini.
+            `prompt_text` hanya berisi instruksi; konteks dirujuk lewat cache.
+        stream_to (str, optional): Path file `.partial`. Jika diberikan, respon
+            di-stream dan ditulis bertahap ke file ini; jika streaming terputus
+            file tersebut tetap berisi teks yang sudah diterima. Pemanggil yang
+            memfinalisasi file (lihat `utils.write_text_atomic`).
 
     Returns:
-        tuple: (Respon teks dari model, jumlah karakter input, jumlah karakter output)
-               atau (None, 0, 0) jika terjadi error.
+        tuple: (Respon teks dari model, `utils.Usage`) atau (None, None) jika
+               terjadi error. Respon dari cache lokal memiliki `usage.from_cache=True`.
     """
+    with tracing.span(f"gemini {model_name}", kind="api", model=model_name, prompt_chars=len(prompt_text),
+                      stream=bool(stream_to), context_cache=bool(context)) as span:
+        text, usage = _call_gemini(prompt_text, model_name, generation_config, context, stream_to)
+        _trace_result(span, text, usage)
+        return text, usage
+
+def _call_gemini(prompt_text, model_name, generation_config=None, context=None, stream_to=None):
+    context_key = context.content_hash if context else None
+    cached = response_cache.get(_cache_name(model_name), prompt_text, generation_config, context=context_key)
+    if cached is not None:
+        print(f"\n⚡ Respon untuk model '{model_name}' diambil dari cache lokal.")
+        return cached["text"], utils.Usage(from_cache=True, input_chars=len(prompt_text), output_chars=len(cached["text"]))
+
+    requested_model = model_name
+    reservation = None
     try:
+        prompt_tokens = _preflight_tokens(prompt_text, model_name)
+        # Konteks di cache Gemini tetap ditagih sebagai token input
+        context_tokens = utils.estimate_tokens(context.text) if context else 0
+        reservation = budget.reserve(model_name, prompt_tokens + context_tokens, generation_config)
+        model_name = reservation.model
+
+        model = _resolve_model(model_name, context)
+        if model is None:
+            # Alasannya sudah dicetak oleh ContextCache.get; pemanggil akan memakai teks inline
+            reservation.release()
+            return None, None
         print(f"\n🤖 Menghubungi Gemini dengan model '{model_name}'... (ini mungkin butuh beberapa saat)")
-        model = genai.GenerativeModel(model_name)
-        response = model.generate_content(prompt_text)
-        
-        input_chars = len(prompt_text)
-        output_chars = len(response.text)
 
-        return response.text, input_chars, output_chars
+        if stream_to and not model_registry.lookup(model_name).supports("streaming"):
+            print(f"ℹ️  Model '{model_name}' tidak mendukung streaming, menunggu respon lengkap.")
+            stream_to = None
+
+        start = time.perf_counter()
+        if stream_to:
+            text, response = _stream_to_file(prompt_text, model_name, generation_config, context, stream_to)
+        else:
+            def request():
+                rate_limit.acquire(model_name, prompt_tokens)
+                with _sync_slots:
+                    return model.generate_content(prompt_text, generation_config=generation_config)
+
+            response = retry.call_with_retry(request, label=model_name, on_retry=_pause_on_rate_limit(model_name))
+            text = response.text
+
+        usage = utils.Usage.from_response(response, time.perf_counter() - start, prompt_text, text)
+        reservation.settle(usage)
+        if model_name != requested_model:
+            usage.model = model_name
+        else:
+            # Respon model pengganti tidak disimpan atas nama model yang diminta
+            response_cache.put(_cache_name(model_name), prompt_text, {"text": text}, generation_config, context=context_key)
+        return text, usage
+    except budget.BudgetExceeded as e:
+        print(f"🛑 {e}")
+        return None, None
     except Exception as e:
+        if reservation is not None:
+            reservation.release()
         print(f"❌ Terjadi kesalahan saat menghubungi Gemini API: {e}")
-        return None, 0, 0
+        if context and _is_context_error(e):
+            # Hanya error cache yang membuat pemanggil beralih ke teks inline (lihat ContextCache.unavailable)
+            print(f"ℹ️  Context cache untuk '{model_name}' tidak bisa dipakai lagi (kedaluwarsa atau tidak ditemukan).")
+            context.invalidate(model_name)
+            context.invalidate(requested_model)
+        if stream_to and os.path.exists(stream_to):
+            if os.path.getsize(stream_to):
+                print(f"💾 Respon parsial tetap tersimpan di: {stream_to}")
+            else:
+                os.remove(stream_to)
+        return None, None
+
+async def acall_gemini(prompt_text, model_name, generation_config=None):
+    """
+    Versi asyncio dari `call_gemini`. Jumlah request yang berjalan bersamaan
+    dibatasi oleh `set_max_concurrency`.
+
+    Returns:
+        tuple: Sama seperti `call_gemini`.
+    """
+    with tracing.span(f"gemini {model_name}", kind="api", model=model_name, prompt_chars=len(prompt_text),
+                      asynchronous=True) as span:
+        text, usage = await _acall_gemini(prompt_text, model_name, generation_config)
+        _trace_result(span, text, usage)
+        return text, usage
+
+async def _acall_gemini(prompt_text, model_name, generation_config=None):
+    cached = response_cache.get(_cache_name(model_name), prompt_text, generation_config)
+    if cached is not None:
+        print(f"\n⚡ Respon untuk model '{model_name}' diambil dari cache lokal.")
+        return cached["text"], utils.Usage(from_cache=True, input_chars=len(prompt_text), output_chars=len(cached["text"]))
+
+    requested_model = model_name
+    reservation = None
+    try:
+        prompt_tokens = utils.estimate_tokens(prompt_text)
+        # Transaksi SQLite singkat, tapi tetap dijalankan di luar event loop
+        reservation = await asyncio.to_thread(budget.reserve, model_name, prompt_tokens, generation_config)
+        model_name = reservation.model
+        model = get_model(model_name)
+        start = time.perf_counter()
+
+        async def request():
+            await rate_limit.aacquire(model_name, prompt_tokens)
+            async with _get_async_slots():
+                print(f"\n🤖 Menghubungi Gemini dengan model '{model_name}' (async)...")
+                return await model.generate_content_async(prompt_text, generation_config=generation_config)
+
+        response = await retry.acall_with_retry(request, label=model_name, on_retry=_pause_on_rate_limit(model_name))
+        usage = utils.Usage.from_response(response, time.perf_counter() - start, prompt_text, response.text)
+        await asyncio.to_thread(reservation.settle, usage)
+
+        if model_name != requested_model:
+            usage.model = model_name
+        else:
+            response_cache.put(_cache_name(model_name), prompt_text, {"text": response.text}, generation_config)
+        return response.text, usage
+    except budget.BudgetExceeded as e:
+        print(f"🛑 {e}")
+        return None, None
+    except Exception as e:
+        if reservation is not None:
+            await asyncio.to_thread(reservation.release)
+        print(f"❌ Terjadi kesalahan saat menghubungi Gemini API: {e}")
+        return None, None
 
 def generate_image(prompt_text, model_name, api_key):
     """
@@ -39,22 +558,84 @@ def generate_image(prompt_text, model_name, api_key):
         api_key (str): API key untuk otentikasi.
 
     Returns:
-        PIL.Image.Image: Objek gambar, atau None jika terjadi error.
+        tuple: (PIL.Image.Image, `utils.Usage`), atau (None, None) jika terjadi error.
     """
+    with tracing.span(f"gemini-image {model_name}", kind="api", model=model_name,
+                      prompt_chars=len(prompt_text)) as span:
+        image, usage = _generate_image(prompt_text, model_name, api_key)
+        _trace_result(span, image, usage)
+        return image, usage
+
+def _generate_image(prompt_text, model_name, api_key):
+    reservation = None
     try:
+        reservation = budget.reserve(model_name, utils.estimate_tokens(prompt_text), images=1)
+        info = model_registry.lookup(model_name)
+        if info.known and not info.supports("image"):
+            print(f"⚠️ Model '{model_name}' tidak terdaftar sebagai model gambar di registry model.")
         print(f"\n🎨 Menghubungi Gemini dengan model '{model_name}' untuk membuat gambar...")
-        client = genai_image.Client(api_key=api_key)
-        response = client.models.generate_content(
-            model=model_name,
-            contents=prompt_text,
-            config=types.GenerateContentConfig(
-                 response_modalities=['TEXT', 'IMAGE']
-            )
-        )
+        client = get_image_client(api_key)
+        start = time.perf_counter()
+
+        def request():
+            rate_limit.acquire(model_name, utils.estimate_tokens(prompt_text))
+            with _sync_slots:
+                return client.models.generate_content(
+                    model=model_name,
+                    contents=prompt_text,
+                    config=_image_config()
+                )
 
-        for part in response.candidates[0].content.parts:
-            if part.inline_data is not None:
-                return Image.open(BytesIO(part.inline_data.data))
+        response = retry.call_with_retry(request, label=model_name, on_retry=_pause_on_rate_limit(model_name))
+        usage = utils.Usage.from_response(response, time.perf_counter() - start, prompt_text)
+        reservation.settle(usage, images_generated=1)
+        return _image_from_response(response), usage
+    except budget.BudgetExceeded as e:
+        print(f"🛑 {e}")
     except Exception as e:
+        if reservation is not None:
+            reservation.release()
         print(f"❌ Terjadi kesalahan saat membuat gambar: {e}")
-    return None
+    return None, None
+
+async def agenerate_image(prompt_text, model_name, api_key):
+    """
+    Versi asyncio dari `generate_image`, memakai klien async `client.aio`.
+
+    Returns:
+        tuple: Sama seperti `generate_image`.
+    """
+    with tracing.span(f"gemini-image {model_name}", kind="api", model=model_name,
+                      prompt_chars=len(prompt_text), asynchronous=True) as span:
+        image, usage = await _agenerate_image(prompt_text, model_name, api_key)
+        _trace_result(span, image, usage)
+        return image, usage
+
+async def _agenerate_image(prompt_text, model_name, api_key):
+    reservation = None
+    try:
+        reservation = await asyncio.to_thread(budget.reserve, model_name, utils.estimate_tokens(prompt_text), images=1)
+        client = get_image_client(api_key)
+        start = time.perf_counter()
+
+        async def request():
+            await rate_limit.aacquire(model_name, utils.estimate_tokens(prompt_text))
+            async with _get_async_slots():
+                print(f"\n🎨 Menghubungi Gemini dengan model '{model_name}' untuk membuat gambar (async)...")
+                return await client.aio.models.generate_content(
+                    model=model_name,
+                    contents=prompt_text,
+                    config=_image_config()
+                )
+
+        response = await retry.acall_with_retry(request, label=model_name, on_retry=_pause_on_rate_limit(model_name))
+        usage = utils.Usage.from_response(response, time.perf_counter() - start, prompt_text)
+        await asyncio.to_thread(reservation.settle, usage, 1)
+        return _image_from_response(response), usage
+    except budget.BudgetExceeded as e:
+        print(f"🛑 {e}")
+    except Exception as e:
+        if reservation is not None:
+            await asyncio.to_thread(reservation.release)
+        print(f"❌ Terjadi kesalahan saat membuat gambar: {e}")
+    return None, None
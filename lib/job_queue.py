@@ -0,0 +1,287 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from datetime import datetime
+
+# Dapatkan direktori root project (direktori parent dari lib)
+_project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Antrean job dipakai bersama oleh semua client (main.py, subs_blog_wordpress.py) dan worker
+DEFAULT_DB_PATH = os.path.join(_project_root, "jobs.db")
+
+# Job yang lease-nya habis (worker mati tanpa heartbeat) diambil worker lain
+DEFAULT_LEASE_SECONDS = 120
+DEFAULT_MAX_ATTEMPTS = 3
+# Job yang gagal diantrekan ulang setelah jeda ini dikali nomor percobaan
+RETRY_DELAY_SECONDS = 30
+
+KINDS = ("workflow", "video")
+STATUSES = ("queued", "running", "done", "failed")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    cwd TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    worker_id TEXT,
+    lease_until REAL,
+    heartbeat_at REAL,
+    not_before REAL,
+    checkpoint TEXT,
+    result TEXT,
+    error TEXT,
+    created_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs (status, cwd, id);
+"""
+
+_db_path = os.environ.get("GEMINI_JOBS_DB") or DEFAULT_DB_PATH
+_initialized = set()
+_checkpoint_lock = threading.Lock()
+
+class Job:
+    """Satu baris tabel jobs; `payload`, `checkpoint` dan `result` sudah di-decode dari JSON."""
+    def __init__(self, row):
+        self.id = row["id"]
+        self.kind = row["kind"]
+        self.payload = json.loads(row["payload"])
+        self.cwd = row["cwd"]
+        self.status = row["status"]
+        self.attempts = row["attempts"]
+        self.max_attempts = row["max_attempts"]
+        self.worker_id = row["worker_id"]
+        self.lease_until = row["lease_until"]
+        self.heartbeat_at = row["heartbeat_at"]
+        self.checkpoint = json.loads(row["checkpoint"]) if row["checkpoint"] else {}
+        self.result = json.loads(row["result"]) if row["result"] else None
+        self.error = row["error"]
+        self.created_at = row["created_at"]
+        self.not_before = row["not_before"]
+        self.started_at = row["started_at"]
+        self.finished_at = row["finished_at"]
+
+def configure(db_path=None):
+    """Mengganti lokasi database antrean (default: jobs.db di root project atau GEMINI_JOBS_DB)."""
+    global _db_path
+    _db_path = db_path or os.environ.get("GEMINI_JOBS_DB") or DEFAULT_DB_PATH
+
+def db_path():
+    return _db_path
+
+def connect(path=None):
+    """Membuka koneksi SQLite dalam mode WAL dan memastikan skema tersedia."""
+    path = path or _db_path
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    # Banyak worker dan client mengakses antrean bersamaan
+    conn.execute("PRAGMA busy_timeout = 30000")
+    if path not in _initialized:
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.executescript(_SCHEMA)
+        _initialized.add(path)
+    return conn
+
+def _now():
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+def enqueue(kind, payload, cwd=None, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """
+    Menambahkan job ke antrean.
+
+    Args:
+        kind (str): "workflow" (main.run_workflow) atau "video" (subs_blog_wordpress.process).
+        payload (dict): Argumen job (harus bisa di-serialize ke JSON).
+        cwd (str, optional): Direktori kerja job; default direktori kerja saat ini.
+            Hanya worker yang berjalan di direktori yang sama yang mengambil job ini.
+        max_attempts (int): Jumlah percobaan sebelum job dianggap gagal.
+
+    Returns:
+        int: ID job.
+    """
+    if kind not in KINDS:
+        raise ValueError(f"Jenis job tidak dikenal: {kind} (pilih {', '.join(KINDS)})")
+    conn = connect()
+    try:
+        with conn:
+            cursor = conn.execute(
+                "INSERT INTO jobs (kind, payload, cwd, max_attempts, created_at) VALUES (?, ?, ?, ?, ?)",
+                (kind, json.dumps(payload, ensure_ascii=False), os.path.abspath(cwd or os.getcwd()),
+                 max_attempts, _now()))
+        return cursor.lastrowid
+    finally:
+        conn.close()
+
+def claim(worker_id, cwd=None, lease_seconds=DEFAULT_LEASE_SECONDS):
+    """
+    Mengambil satu job secara atomik: job "queued" tertua, atau job "running"
+    yang lease-nya sudah habis (worker sebelumnya mati). Job yang sudah
+    mencapai `max_attempts` ditandai gagal alih-alih diambil.
+
+    Returns:
+        Job atau None jika antrean kosong.
+    """
+    cwd = os.path.abspath(cwd or os.getcwd())
+    conn = connect()
+    try:
+        conn.isolation_level = None
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            while True:
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE cwd = ? AND ((status = 'queued' AND (not_before IS NULL OR not_before <= ?)) "
+                    "OR (status = 'running' AND lease_until < ?)) ORDER BY id LIMIT 1", (cwd, now, now)).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                if row["attempts"] >= row["max_attempts"]:
+                    conn.execute("UPDATE jobs SET status = 'failed', error = ?, finished_at = ? WHERE id = ?",
+                                 (f"Lease habis setelah {row['attempts']} percobaan (worker terakhir: {row['worker_id']})",
+                                  _now(), row["id"]))
+                    continue
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', worker_id = ?, attempts = attempts + 1, lease_until = ?, "
+                    "heartbeat_at = ?, started_at = ?, error = NULL WHERE id = ?",
+                    (worker_id, now + lease_seconds, now, _now(), row["id"]))
+                job = Job(conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone())
+                conn.execute("COMMIT")
+                return job
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.close()
+
+def heartbeat(job_ids, worker_id, lease_seconds=DEFAULT_LEASE_SECONDS):
+    """
+    Memperpanjang lease job yang sedang dikerjakan worker ini.
+
+    Returns:
+        set: ID job yang lease-nya sudah diambil worker lain (tidak diperpanjang).
+    """
+    if not job_ids:
+        return set()
+    now = time.time()
+    lost = set()
+    conn = connect()
+    try:
+        with conn:
+            for job_id in job_ids:
+                cursor = conn.execute(
+                    "UPDATE jobs SET lease_until = ?, heartbeat_at = ? WHERE id = ? AND worker_id = ? AND status = 'running'",
+                    (now + lease_seconds, now, job_id, worker_id))
+                if cursor.rowcount == 0:
+                    lost.add(job_id)
+    finally:
+        conn.close()
+    return lost
+
+def checkpoint(job_id, step, status, seconds=None):
+    """Mencatat hasil satu langkah job (checkpoint per langkah)."""
+    with _checkpoint_lock:
+        conn = connect()
+        try:
+            with conn:
+                row = conn.execute("SELECT checkpoint FROM jobs WHERE id = ?", (job_id,)).fetchone()
+                data = json.loads(row["checkpoint"]) if row and row["checkpoint"] else {}
+                data[str(step)] = {"status": status, "seconds": round(seconds, 3) if seconds is not None else None,
+                                   "at": _now()}
+                conn.execute("UPDATE jobs SET checkpoint = ? WHERE id = ?", (json.dumps(data), job_id))
+        finally:
+            conn.close()
+
+def complete(job_id, worker_id, result=None):
+    """Menandai job selesai. Returns: False jika job sudah bukan milik worker ini."""
+    conn = connect()
+    try:
+        with conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'done', result = ?, lease_until = NULL, finished_at = ? "
+                "WHERE id = ? AND worker_id = ? AND status = 'running'",
+                (json.dumps(result, ensure_ascii=False, default=str), _now(), job_id, worker_id))
+        return cursor.rowcount == 1
+    finally:
+        conn.close()
+
+def fail(job_id, worker_id, error, retry=True):
+    """
+    Mencatat kegagalan job. Jika `retry` dan percobaan belum habis, job kembali
+    ke antrean setelah jeda `RETRY_DELAY_SECONDS` x percobaan; langkah yang sudah
+    selesai dilewati oleh manifest saat dicoba ulang.
+
+    Returns:
+        str: Status baru ("queued" atau "failed"), atau None jika job bukan milik worker ini.
+    """
+    conn = connect()
+    try:
+        with conn:
+            row = conn.execute("SELECT attempts, max_attempts FROM jobs WHERE id = ? AND worker_id = ? AND status = 'running'",
+                               (job_id, worker_id)).fetchone()
+            if row is None:
+                return None
+            status = "queued" if retry and row["attempts"] < row["max_attempts"] else "failed"
+            not_before = time.time() + RETRY_DELAY_SECONDS * row["attempts"] if status == "queued" else None
+            conn.execute("UPDATE jobs SET status = ?, error = ?, lease_until = NULL, not_before = ?, finished_at = ? "
+                         "WHERE id = ?", (status, str(error), not_before, _now() if status == "failed" else None, job_id))
+        return status
+    finally:
+        conn.close()
+
+def get(job_id):
+    """Returns: Job atau None."""
+    conn = connect()
+    try:
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job(row) if row else None
+    finally:
+        conn.close()
+
+def list_jobs(status=None, limit=50):
+    """Returns: list Job terbaru lebih dulu, opsional difilter status."""
+    query, params = "SELECT * FROM jobs", []
+    if status:
+        query += " WHERE status = ?"
+        params.append(status)
+    query += " ORDER BY id DESC LIMIT ?"
+    params.append(limit)
+    conn = connect()
+    try:
+        return [Job(row) for row in conn.execute(query, params)]
+    finally:
+        conn.close()
+
+def active(cwd=None):
+    """Returns: list Job yang masih queued atau running, opsional hanya untuk satu direktori kerja."""
+    query, params = "SELECT * FROM jobs WHERE status IN ('queued', 'running')", []
+    if cwd:
+        query += " AND cwd = ?"
+        params.append(os.path.abspath(cwd))
+    conn = connect()
+    try:
+        return [Job(row) for row in conn.execute(query + " ORDER BY id", params)]
+    finally:
+        conn.close()
+
+def counts(cwd=None):
+    """Returns: dict {status: jumlah job}, opsional hanya untuk satu direktori kerja."""
+    query, params = "SELECT status, COUNT(*) AS n FROM jobs", []
+    if cwd:
+        query += " WHERE cwd = ?"
+        params.append(os.path.abspath(cwd))
+    conn = connect()
+    try:
+        result = {status: 0 for status in STATUSES}
+        result.update({row["status"]: row["n"] for row in conn.execute(query + " GROUP BY status", params)})
+        return result
+    finally:
+        conn.close()
@@ -0,0 +1,100 @@
+import os
+import json
+import hashlib
+import threading
+from datetime import datetime
+
+MANIFEST_NAME = ".manifest.json"
+
+def file_hash(path):
+    """Mengembalikan sha256 isi file, atau None jika file tidak ada."""
+    try:
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                h.update(chunk)
+        return h.hexdigest()
+    except (FileNotFoundError, IsADirectoryError):
+        return None
+
+def text_hash(text):
+    """Mengembalikan sha256 dari sebuah string (atau None)."""
+    if text is None:
+        return None
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+class Manifest:
+    """
+    Catatan build per direktori output. Untuk setiap langkah disimpan hash dari
+    semua input-nya (file transkrip, file prompt, nama model, artefak hulu, dll).
+    Sebuah langkah dianggap masih terkini jika hash input-nya sama dengan yang
+    tercatat dan semua file output-nya masih ada.
+    """
+    def __init__(self, output_dir):
+        self.path = os.path.join(output_dir, MANIFEST_NAME)
+        self._lock = threading.Lock()
+        self._data = {"steps": {}}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data.get("steps"), dict):
+                self._data = data
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+
+    @staticmethod
+    def fingerprint(files=None, values=None):
+        """
+        Membuat fingerprint input langkah.
+
+        Args:
+            files (dict): {nama: path} file yang isinya di-hash.
+            values (dict): {nama: nilai} nilai non-file (nama model, keyphrase, dll).
+
+        Returns:
+            dict: {nama: hash} yang siap dibandingkan dan disimpan.
+        """
+        result = {}
+        for name, path in (files or {}).items():
+            result[f"file:{name}"] = file_hash(path)
+        for name, value in (values or {}).items():
+            result[f"value:{name}"] = text_hash(json.dumps(value, sort_keys=True, ensure_ascii=False, default=str))
+        return result
+
+    def is_current(self, step_key, fingerprint, outputs):
+        """Mengecek apakah langkah bisa dilewati karena input-nya tidak berubah."""
+        with self._lock:
+            record = self._data["steps"].get(str(step_key))
+        if not record or record.get("inputs") != fingerprint:
+            return False
+        return all(os.path.exists(path) for path in outputs)
+
+    def get(self, step_key, field, default=None):
+        """Mengambil nilai tambahan yang disimpan bersama catatan langkah."""
+        with self._lock:
+            record = self._data["steps"].get(str(step_key)) or {}
+        return record.get(field, default)
+
+    def record(self, step_key, fingerprint, outputs, **extra):
+        """Mencatat bahwa langkah berhasil dijalankan dengan input tertentu."""
+        with self._lock:
+            entry = {
+                "inputs": fingerprint,
+                "outputs": {os.path.basename(path): file_hash(path) for path in outputs},
+                "updated": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            }
+            entry.update(extra)
+            self._data["steps"][str(step_key)] = entry
+            self._save()
+
+    def invalidate(self, step_key):
+        """Menghapus catatan langkah sehingga langkah pasti dijalankan ulang berikutnya."""
+        with self._lock:
+            if self._data["steps"].pop(str(step_key), None) is not None:
+                self._save()
+
+    def _save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
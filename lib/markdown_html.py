@@ -0,0 +1,321 @@
+import re
+import html
+
+# Naikkan jika hasil render berubah, agar manifest menjalankan ulang Langkah 6
+RENDERER_VERSION = 1
+
+YOUTUBE_EMBED = (
+    '<!-- wp:embed {{"url":"{url}","type":"video","providerNameSlug":"youtube","responsive":true,'
+    '"className":"wp-embed-aspect-16-9 wp-has-aspect-ratio"}} -->'
+    '<figure class="wp-block-embed is-type-video is-provider-youtube wp-block-embed-youtube '
+    'wp-embed-aspect-16-9 wp-has-aspect-ratio"><div class="wp-block-embed__wrapper"> {url} </div></figure>'
+    '<!-- /wp:embed -->'
+)
+
+# Baris yang disisipkan Langkah 3 di bawah judul; di HTML diganti embed video
+_YOUTUBE_NOTE = re.compile(r'^.*Tonton video tutorial asli di YouTube.*$\n?', re.MULTILINE | re.IGNORECASE)
+
+_FENCE = re.compile(r'^( {0,3})(`{3,}|~{3,})\s*([^`\s]*)[^`]*$')
+_HEADING = re.compile(r'^ {0,3}(#{1,6})(?:\s+(.*?))?(?:\s+#+)?\s*$')
+_HR = re.compile(r'^ {0,3}([-*_])(?:\s*\1){2,}\s*$')
+_BLOCKQUOTE = re.compile(r'^ {0,3}>\s?')
+_HTML_BLOCK = re.compile(r'^ {0,3}<(?:!--|/?[a-zA-Z][\w-]*(?:[\s/>]|$))')
+_LIST_ITEM = re.compile(r'^(\s*)([-*+]|\d{1,9}[.)])(?:(\s+)(.*))?$')
+_TABLE_SEPARATOR = re.compile(r'^\s*\|?\s*:?-+:?\s*(?:\|\s*:?-+:?\s*)*\|?\s*$')
+
+def _indent(line):
+    return len(line) - len(line.lstrip(' '))
+
+def _dedent(line, width):
+    return line[min(width, _indent(line)):]
+
+def _is_table_start(lines, i):
+    return '|' in lines[i] and i + 1 < len(lines) and _TABLE_SEPARATOR.match(lines[i + 1]) is not None
+
+def _starts_block(line):
+    """True jika baris memulai blok baru sehingga memotong paragraf."""
+    return bool(_FENCE.match(line) or _HEADING.match(line) or _HR.match(line)
+                or _BLOCKQUOTE.match(line) or _HTML_BLOCK.match(line) or _LIST_ITEM.match(line))
+
+def render_inline(text):
+    """
+    Merender format inline Markdown: code span, link, gambar, tebal, miring,
+    coret, escape backslash dan hard line break. Teks lain di-escape sebagai HTML.
+    """
+    stash = []
+
+    def keep(fragment):
+        stash.append(fragment)
+        return f"\x00{len(stash) - 1}\x00"
+
+    def link(match, image=False):
+        label, url, title = match.group(1), match.group(2), match.group(3)
+        title_attr = f' title="{html.escape(title)}"' if title else ""
+        if image:
+            return keep(f'<img src="{html.escape(url)}" alt="{html.escape(label)}"{title_attr} />')
+        return keep(f'<a href="{html.escape(url)}"{title_attr}>{render_inline(label)}</a>')
+
+    text = re.sub(r'(`+)(.+?)\1', lambda m: keep(f"<code>{html.escape(m.group(2).strip(), quote=False)}</code>"), text)
+    text = re.sub(r'\\([\\`*_{}\[\]()#+\-.!|~<>])', lambda m: keep(html.escape(m.group(1), quote=False)), text)
+    text = re.sub(r'<((?:https?|mailto):[^\s<>]+)>',
+                  lambda m: keep(f'<a href="{html.escape(m.group(1))}">{html.escape(m.group(1), quote=False)}</a>'), text)
+    url_part = r'\(\s*<?([^\s()<>]+(?:\([^\s()]*\))?)>?(?:\s+"([^"]*)")?\s*\)'
+    text = re.sub(r'!\[([^\]]*)\]' + url_part, lambda m: link(m, image=True), text)
+    text = re.sub(r'\[([^\]]+)\]' + url_part, link, text)
+
+    text = html.escape(text, quote=False)
+    text = re.sub(r'(?<!\w)(\*\*|__)(?=\S)(.+?)(?<=\S)\1(?!\w)', r'<strong>\2</strong>', text)
+    text = re.sub(r'\*\*(?=\S)(.+?)(?<=\S)\*\*', r'<strong>\1</strong>', text)
+    text = re.sub(r'(?<![\w*])\*(?=[^\s*])(.+?)(?<=[^\s*])\*(?![\w*])', r'<em>\1</em>', text)
+    text = re.sub(r'(?<!\w)_(?=\S)(.+?)(?<=\S)_(?!\w)', r'<em>\1</em>', text)
+    text = re.sub(r'~~(?=\S)(.+?)(?<=\S)~~', r'<del>\1</del>', text)
+    text = re.sub(r'(?: {2,}|\\)\n', '<br />\n', text)
+
+    while '\x00' in text:
+        text = re.sub(r'\x00(\d+)\x00', lambda m: stash[int(m.group(1))], text)
+    return text
+
+def _render_code(lines, start):
+    match = _FENCE.match(lines[start])
+    indent, fence, language = len(match.group(1)), match.group(2), match.group(3)
+    body = []
+    i = start + 1
+    while i < len(lines):
+        closing = lines[i].strip()
+        if closing.startswith(fence[0] * len(fence)) and not closing.strip(fence[0]):
+            i += 1
+            break
+        body.append(_dedent(lines[i], indent))
+        i += 1
+    class_attr = f' class="language-{html.escape(language.lower())}"' if language else ""
+    code = html.escape("\n".join(body), quote=False)
+    return f"<pre><code{class_attr}>{code}</code></pre>", i
+
+def _split_row(line):
+    row = line.strip()
+    if row.startswith('|'):
+        row = row[1:]
+    if row.endswith('|') and not row.endswith('\\|'):
+        row = row[:-1]
+    # Pisahkan di '|' yang tidak di-escape dan tidak berada di dalam code span
+    cells, current, in_code, previous = [], [], False, ""
+    for char in row:
+        if char == '`':
+            in_code = not in_code
+        if char == '|' and not in_code and previous != '\\':
+            cells.append("".join(current).strip())
+            current = []
+        else:
+            current.append(char)
+        previous = char
+    cells.append("".join(current).strip())
+    return cells
+
+def _render_table(lines, start):
+    header = _split_row(lines[start])
+    aligns = []
+    for cell in _split_row(lines[start + 1]):
+        if cell.startswith(':') and cell.endswith(':'):
+            aligns.append("center")
+        elif cell.endswith(':'):
+            aligns.append("right")
+        elif cell.startswith(':'):
+            aligns.append("left")
+        else:
+            aligns.append(None)
+
+    def cells(row, tag):
+        out = []
+        for index in range(len(header)):
+            value = row[index] if index < len(row) else ""
+            align = aligns[index] if index < len(aligns) else None
+            style = f' style="text-align: {align}"' if align else ""
+            out.append(f"<{tag}{style}>{render_inline(value)}</{tag}>")
+        return "<tr>" + "".join(out) + "</tr>"
+
+    rows = []
+    i = start + 2
+    while i < len(lines) and lines[i].strip() and '|' in lines[i]:
+        rows.append(cells(_split_row(lines[i]), "td"))
+        i += 1
+
+    parts = ["<table>", "<thead>", cells(header, "th"), "</thead>"]
+    if rows:
+        parts += ["<tbody>"] + rows + ["</tbody>"]
+    parts.append("</table>")
+    return "\n".join(parts), i
+
+def _render_list(lines, start):
+    first = _LIST_ITEM.match(lines[start])
+    base_indent = len(first.group(1))
+    ordered = first.group(2)[-1] in '.)'
+    items = []
+    loose = False
+    blank_pending = False
+    content_offset = 0
+    i = start
+
+    while i < len(lines):
+        line = lines[i]
+        match = _LIST_ITEM.match(line)
+        if not line.strip():
+            blank_pending = True
+            i += 1
+            continue
+
+        indent = _indent(line)
+        if match and indent <= base_indent + 1:
+            if (match.group(2)[-1] in '.)') != ordered:
+                break
+            spaces = len(match.group(3) or " ")
+            content_offset = indent + len(match.group(2)) + (spaces if spaces <= 4 else 1)
+            if blank_pending and items:
+                loose = True
+            items.append([match.group(4) or ""])
+            blank_pending = False
+        elif indent > base_indent:
+            # Isi lanjutan atau sub-list milik item saat ini
+            if blank_pending:
+                items[-1].append("")
+            items[-1].append(_dedent(line, content_offset))
+            blank_pending = False
+        elif not blank_pending and not _starts_block(line) and not _is_table_start(lines, i):
+            # Lazy continuation: baris paragraf tanpa indentasi
+            items[-1].append(line.strip())
+        else:
+            break
+        i += 1
+
+    for item in items:
+        while item and not item[-1].strip():
+            item.pop()
+        # Paragraf kedua dalam satu item juga membuat list menjadi "loose"
+        for index in range(1, len(item)):
+            line = item[index]
+            if (not item[index - 1].strip() and line.strip() and _indent(line) == 0
+                    and not _LIST_ITEM.match(line)):
+                loose = True
+
+    tag = "ol" if ordered else "ul"
+    start_number = int(first.group(2)[:-1]) if ordered else 1
+    start_attr = f' start="{start_number}"' if ordered and start_number != 1 else ""
+    parts = [f"<{tag}{start_attr}>"]
+    for item in items:
+        inner = _render_blocks(item, tight=not loose)
+        parts.append("<li>" + "\n".join(inner) + "</li>")
+    parts.append(f"</{tag}>")
+
+    # Baris kosong terakhir milik blok berikutnya
+    while i > start and not lines[i - 1].strip():
+        i -= 1
+    return "\n".join(parts), i
+
+def _render_blocks(lines, tight=False):
+    blocks = []
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if not line.strip():
+            i += 1
+            continue
+
+        if _FENCE.match(line):
+            block, i = _render_code(lines, i)
+            blocks.append(block)
+            continue
+
+        heading = _HEADING.match(line)
+        if heading:
+            level = len(heading.group(1))
+            blocks.append(f"<h{level}>{render_inline(heading.group(2) or '')}</h{level}>")
+            i += 1
+            continue
+
+        if _HR.match(line):
+            blocks.append("<hr />")
+            i += 1
+            continue
+
+        if _HTML_BLOCK.match(line):
+            raw = []
+            while i < len(lines) and lines[i].strip():
+                raw.append(lines[i])
+                i += 1
+            blocks.append("\n".join(raw))
+            continue
+
+        if _BLOCKQUOTE.match(line):
+            quoted = []
+            while i < len(lines) and lines[i].strip():
+                if _BLOCKQUOTE.match(lines[i]):
+                    quoted.append(_BLOCKQUOTE.sub('', lines[i], count=1))
+                elif quoted and not _starts_block(lines[i]):
+                    quoted.append(lines[i])
+                else:
+                    break
+                i += 1
+            blocks.append("<blockquote>\n" + "\n".join(_render_blocks(quoted)) + "\n</blockquote>")
+            continue
+
+        if _is_table_start(lines, i):
+            block, i = _render_table(lines, i)
+            blocks.append(block)
+            continue
+
+        if _LIST_ITEM.match(line):
+            block, i = _render_list(lines, i)
+            blocks.append(block)
+            continue
+
+        paragraph = [line.strip() if not line.endswith("  ") else line.lstrip()]
+        i += 1
+        while i < len(lines) and lines[i].strip() and not _starts_block(lines[i]) and not _is_table_start(lines, i):
+            paragraph.append(lines[i].lstrip())
+            i += 1
+        text = render_inline("\n".join(paragraph).rstrip())
+        blocks.append(text if tight else f"<p>{text}</p>")
+    return blocks
+
+def markdown_to_html(markdown_text):
+    """
+    Mengubah Markdown menjadi fragmen HTML secara deterministik, tanpa memanggil model.
+
+    Mendukung heading, paragraf, code block berpagar dengan kelas `language-*`,
+    tabel (termasuk perataan kolom), list bertingkat, blockquote, garis
+    horizontal, blok HTML mentah dan format inline.
+
+    Args:
+        markdown_text (str): Konten Markdown.
+
+    Returns:
+        str: Fragmen HTML.
+    """
+    lines = markdown_text.replace('\r\n', '\n').replace('\t', '    ').split('\n')
+    return "\n".join(_render_blocks(lines)) + "\n"
+
+def _unwrap_document_fence(markdown_text):
+    # Model kadang membungkus seluruh artikel dalam ```markdown ... ```
+    match = re.match(r'^\s*```(?:markdown|md)?\s*\n(.*)\n```\s*$', markdown_text, re.DOTALL | re.IGNORECASE)
+    return match.group(1) if match else markdown_text
+
+def render_blog_post(markdown_text, youtube_link=None):
+    """
+    Merender artikel `.blog.md` menjadi HTML siap WordPress, mengikuti aturan
+    prompt_convert_md_to_html.md: baris "Tonton video tutorial asli di YouTube"
+    dihapus dan embed YouTube disisipkan setelah judul.
+
+    Args:
+        markdown_text (str): Isi file `.blog.md`.
+        youtube_link (str, optional): URL video YouTube untuk di-embed.
+
+    Returns:
+        str: HTML artikel.
+    """
+    markdown_text = _YOUTUBE_NOTE.sub('', _unwrap_document_fence(markdown_text))
+    lines = markdown_text.replace('\r\n', '\n').replace('\t', '    ').split('\n')
+    blocks = _render_blocks(lines)
+    if youtube_link:
+        embed = YOUTUBE_EMBED.format(url=html.escape(youtube_link))
+        position = next((index + 1 for index, block in enumerate(blocks) if block.startswith("<h1>")), 0)
+        blocks.insert(position, embed)
+    return "\n".join(blocks) + "\n"
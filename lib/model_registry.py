@@ -0,0 +1,122 @@
+import os
+import json
+import threading
+from dataclasses import dataclass, field
+
+# Dapatkan direktori root project (direktori parent dari lib)
+_project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Registry model (harga, context window, RPM/TPM, kemampuan). Bisa diganti lewat GEMINI_MODELS_FILE.
+REGISTRY_FILE = os.environ.get("GEMINI_MODELS_FILE") or os.path.join(_project_root, "config", "models.json")
+
+# Dipakai jika file registry tidak ada; sengaja mahal agar estimasi tidak terlalu rendah
+FALLBACK_ENTRY = {"context_window": 32768, "input": 1.25, "output": 10.0, "cached_input": 0.31, "per_image": 0.039,
+                  "capabilities": ["text", "streaming"]}
+
+@dataclass(frozen=True)
+class ModelInfo:
+    """
+    Data satu model dari registry.
+
+    `key` adalah entri registry yang cocok ("default" jika tidak ada yang cocok);
+    `pricing` berisi tarif per 1 juta token seperti di config/models.json.
+    """
+    name: str
+    key: str
+    pricing: dict = field(repr=False)
+    context_window: int = None
+    rpm: int = None
+    tpm: int = None
+    capabilities: frozenset = frozenset()
+
+    def supports(self, capability):
+        """Apakah model punya kemampuan tertentu (text, image, caching, streaming, structured_output)."""
+        return capability in self.capabilities
+
+    @property
+    def known(self):
+        return self.key != "default"
+
+class ModelRegistry:
+    """
+    Registry model dengan pencocokan nama persis lalu prefix terpanjang, sehingga
+    hasilnya tidak bergantung pada urutan entri di file. Prefix harus berakhir
+    di batas segmen nama ('-'), jadi 'gemini-1.5-pro-latest' cocok dengan
+    'gemini-1.5-pro' tetapi 'gemini-1.5-pro' tidak cocok dengan 'gemini-1.5-p'.
+    """
+    def __init__(self, data):
+        self.version = data.get("version", "")
+        models = dict(data.get("models", {}))
+        models.setdefault("default", FALLBACK_ENTRY)
+        self._entries = models
+        # Prefix terpanjang dicek lebih dulu
+        self._prefixes = sorted((key for key in models if key != "default"), key=len, reverse=True)
+        self._resolved = {}
+        self._lock = threading.Lock()
+        # Semua nama yang ada di registry sudah di-resolve sejak awal
+        for key in models:
+            self._resolved[key] = self._build(key, key)
+
+    def _build(self, name, key):
+        entry = self._entries[key]
+        return ModelInfo(name=name, key=key, pricing=entry, context_window=entry.get("context_window"),
+                         rpm=entry.get("rpm"), tpm=entry.get("tpm"),
+                         capabilities=frozenset(entry.get("capabilities", ())))
+
+    def _match(self, name):
+        if name in self._entries:
+            return name
+        for prefix in self._prefixes:
+            if name.startswith(prefix) and name[len(prefix)] == "-":
+                return prefix
+        return "default"
+
+    def lookup(self, model_name, warn=True):
+        """
+        Mengambil `ModelInfo` untuk nama model (boleh diawali 'models/').
+        Model yang tidak dikenal memakai entri "default" dan (jika `warn`) diberi peringatan sekali.
+        """
+        info = self._resolved.get(model_name)
+        if info is not None:
+            return info
+        name = model_name[len("models/"):] if model_name.startswith("models/") else model_name
+        key = self._match(name)
+        info = self._build(model_name, key)
+        with self._lock:
+            if warn and model_name not in self._resolved and key == "default":
+                print(f"⚠️ Model '{model_name}' tidak ada di registry model, memakai harga dan batas default.")
+            self._resolved.setdefault(model_name, info)
+        return info
+
+    def names(self):
+        """Nama model di registry (tanpa entri default)."""
+        return [key for key in self._entries if key != "default"]
+
+_registry = None
+_registry_lock = threading.Lock()
+
+def load(path=None):
+    """
+    Memuat registry dari file JSON berversi (default: config/models.json, di-cache).
+
+    Returns:
+        ModelRegistry
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is not None and path is None:
+            return _registry
+        try:
+            with open(path or REGISTRY_FILE, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError) as e:
+            print(f"⚠️ Registry model tidak bisa dimuat ({e}), memakai harga default.")
+            data = {"version": "fallback", "models": {}}
+        registry = ModelRegistry(data)
+        if path is None:
+            _registry = registry
+        return registry
+
+def lookup(model_name, warn=True):
+    """Shortcut untuk `load().lookup(model_name)`."""
+    return load().lookup(model_name, warn)
@@ -6,7 +6,6 @@ import re
 import io
 import json
 import subprocess
-from datetime import datetime
 from google import genai as genai_image
 import google.generativeai as genai
 from PIL import Image
@@ -14,30 +13,10 @@ from dotenv import load_dotenv
 from google.genai import types
 from io import BytesIO
 
-# Data harga berdasarkan dokumentasi resmi Google AI.
-# Ini digunakan untuk membuat estimasi biaya dan mencatatnya.
-MODEL_PRICING = {
-    "gemini-1.5-pro": {
-        "input_per_1k_chars": 0.0035, "output_per_1k_chars": 0.0105, "image_cost": 0.0180
-    },
-    "gemini-1.5-flash": {
-        "input_per_1k_chars": 0.00035, "output_per_1k_chars": 0.00105, "image_cost": 0.0
-    },
-    "gemini-1.0-pro": {
-        "input_per_1k_chars": 0.0005, "output_per_1k_chars": 0.0015, "image_cost": 0.0
-    },
-    # Model default jika tidak ditemukan
-    "default": {
-        "input_per_1k_chars": 0.0035, "output_per_1k_chars": 0.0105, "image_cost": 0.0180
-    }
-}
-
-def get_pricing(model_name):
-    """Mencari data harga untuk model tertentu, atau mengembalikan harga default."""
-    for key, value in MODEL_PRICING.items():
-        if key in model_name:
-            return value
-    return MODEL_PRICING["default"]
+# Skrip ini dijalankan langsung, jadi root project ditambahkan ke path agar
+# pencatatan biaya memakai registry model dan ledger bersama
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lib.utils import log_usage_and_cost
 
 def call_gemini(prompt_text, model_name):
     """
@@ -65,28 +44,6 @@ def call_gemini(prompt_text, model_name):
         print(f"❌ Terjadi kesalahan saat menghubungi Gemini API: {e}")
         return None
 
-def log_usage_and_cost(model_name, input_chars=0, output_chars=0, images_generated=0):
-    """Mencatat penggunaan API dan estimasi biaya ke file CSV."""
-    log_file = 'usage_log.csv'
-    
-    pricing = get_pricing(model_name)
-    input_cost = (input_chars / 1000) * pricing['input_per_1k_chars']
-    output_cost = (output_chars / 1000) * pricing['output_per_1k_chars']
-    image_cost = images_generated * pricing.get('image_cost', 0.0)
-    total_cost = input_cost + output_cost + image_cost
-
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    log_entry = f"{timestamp},{model_name},{input_chars},{output_chars},{images_generated},{total_cost:.6f}\n"
-
-    # Buat header jika file belum ada
-    if not os.path.exists(log_file):
-        with open(log_file, 'w', encoding='utf-8') as f:
-            f.write("Timestamp,Model,Input Chars,Output Chars,Images Generated,Estimated Cost ($)\n")
-
-    with open(log_file, 'a', encoding='utf-8') as f:
-        f.write(log_entry)
-    print(f"📝 Penggunaan dicatat. Estimasi biaya untuk panggilan ini: ${total_cost:.6f}")
-
 def generate_image(prompt_text, model_name, api_key):
     """
     Memanggil Gemini API untuk membuat gambar.
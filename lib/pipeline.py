@@ -0,0 +1,155 @@
+import os
+import json
+import queue
+import threading
+import contextvars
+from datetime import datetime
+from dataclasses import dataclass
+
+# Penanda akhir antrean untuk worker tahap berikutnya
+_DONE = object()
+
+@dataclass
+class Stage:
+    """
+    Satu tahap pipeline.
+
+    `func(item)` menerima dict item (hasil tahap sebelumnya sudah digabung) dan
+    mengembalikan dict hasil yang digabung ke item. Exception apa pun membuat
+    item gagal di tahap ini; item tersebut tidak diteruskan ke tahap berikutnya.
+    """
+    name: str
+    func: callable
+    workers: int = 1
+
+class PipelineState:
+    """
+    Status per item yang disimpan ke file JSON setiap kali sebuah tahap selesai,
+    sehingga run berikutnya melanjutkan dari tahap yang belum selesai.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._data = {"items": {}}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data.get("items"), dict):
+                self._data = data
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+
+    def get(self, key):
+        """Mengembalikan salinan status item, atau dict kosong jika belum pernah diproses."""
+        with self._lock:
+            return json.loads(json.dumps(self._data["items"].get(key, {})))
+
+    def items(self):
+        with self._lock:
+            return json.loads(json.dumps(self._data["items"]))
+
+    def stage_done(self, key, stage, result):
+        """Mencatat hasil tahap yang berhasil."""
+        with self._lock:
+            entry = self._data["items"].setdefault(key, {"stages": {}})
+            entry["stages"][stage] = result
+            entry.update(status="running", stage=stage, error="",
+                         updated=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+            self._save()
+
+    def finish(self, key, status, stage=None, error=""):
+        """Mencatat status akhir item (done atau failed)."""
+        with self._lock:
+            entry = self._data["items"].setdefault(key, {"stages": {}})
+            entry.update(status=status, error=error, updated=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+            if stage:
+                entry["stage"] = stage
+            self._save()
+
+    def _save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+def run_pipeline(items, stages, state, queue_size=2):
+    """
+    Menjalankan item melalui tahap-tahap berurutan. Setiap tahap punya pool
+    thread sendiri dan antrean masukan terbatas (`queue_size`), sehingga tahap
+    yang lambat menahan tahap sebelumnya alih-alih menumpuk pekerjaan, dan
+    tahap berbeda untuk item berbeda berjalan bersamaan (download video N+1
+    sambil generate video N).
+
+    Tahap yang sudah tercatat selesai di `state` dilewati dan hasilnya dipakai
+    ulang; item yang statusnya "done" tidak diproses lagi.
+
+    Args:
+        items (list): Dict item, masing-masing dengan kunci unik "key".
+        stages (list): Daftar `Stage` berurutan.
+        state (PipelineState): Penyimpanan status per item.
+        queue_size (int): Kapasitas antrean di depan setiap tahap.
+
+    Returns:
+        dict: {key: status item dari `state`} untuk semua item input.
+    """
+    queues = [queue.Queue(maxsize=max(1, queue_size)) for _ in stages]
+    counts = [max(1, stage.workers) for stage in stages]
+    remaining = list(counts)
+    remaining_lock = threading.Lock()
+
+    def worker(index):
+        stage = stages[index]
+        next_queue = queues[index + 1] if index + 1 < len(stages) else None
+        try:
+            while True:
+                item = queues[index].get()
+                if item is _DONE:
+                    break
+                key = item["key"]
+                stored = state.get(key).get("stages", {})
+                if stage.name in stored:
+                    print(f"⏭️ [{stage.name}] {key}: sudah selesai di run sebelumnya")
+                    item.update(stored[stage.name])
+                else:
+                    try:
+                        result = stage.func(dict(item)) or {}
+                    except Exception as e:
+                        print(f"❌ [{stage.name}] {key}: {e}")
+                        state.finish(key, "failed", stage.name, str(e))
+                        continue
+                    item.update(result)
+                    state.stage_done(key, stage.name, result)
+                if next_queue is not None:
+                    next_queue.put(item)
+                else:
+                    state.finish(key, "done", stage.name)
+        finally:
+            # Worker terakhir yang selesai menutup antrean tahap berikutnya
+            with remaining_lock:
+                remaining[index] -= 1
+                last = remaining[index] == 0
+            if last and next_queue is not None:
+                for _ in range(counts[index + 1]):
+                    next_queue.put(_DONE)
+
+    threads = []
+    for index, stage in enumerate(stages):
+        for number in range(counts[index]):
+            thread = threading.Thread(target=contextvars.copy_context().run, args=(worker, index),
+                                      name=f"{stage.name}-{number + 1}", daemon=True)
+            thread.start()
+            threads.append(thread)
+
+    keys = []
+    for item in items:
+        keys.append(item["key"])
+        if state.get(item["key"]).get("status") == "done":
+            print(f"⏭️ {item['key']}: sudah selesai, dilewati")
+            continue
+        queues[0].put(dict(item))
+    for _ in range(counts[0]):
+        queues[0].put(_DONE)
+
+    for thread in threads:
+        thread.join()
+    return {key: state.get(key) for key in keys}
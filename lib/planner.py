@@ -0,0 +1,193 @@
+import os
+from . import model_registry, usage_ledger, utils, workflow_steps
+
+# Perkiraan ukuran output per langkah jika artefak belum ada dan ledger belum punya
+# riwayat langkah tersebut (draf ~0.6x input, blog ~1.1x input, keyphrase/metadata kecil)
+DRAFT_OUTPUT_RATIO = 0.6
+BLOG_OUTPUT_RATIO = 1.1
+HTML_OUTPUT_RATIO = 1.3
+KEYPHRASE_OUTPUT_TOKENS = 450
+STRUCTURED_OUTPUT_TOKENS = 1200
+SEO_META_OUTPUT_TOKENS = 250
+MAX_OUTPUT_TOKENS = 65536
+
+# Dipakai jika riwayat model belum punya data latensi
+DEFAULT_TOKENS_PER_SECOND = 60.0
+REQUEST_OVERHEAD_SECONDS = 1.5
+LOCAL_STEP_SECONDS = 0.05
+
+STEP_NAMES = {1: "1.Draft", 2: "2.Keyphrases", 3: "3.Blog", 4: "4.Update SEO", 5: "5.Image", 6: "6.HTML", 7: "7.SEO JSON"}
+
+def load_history():
+    """
+    Membaca riwayat pemakaian per model dari ledger SQLite (lihat `usage_ledger`).
+
+    Returns:
+        dict: {model: {"calls", "avg_output_tokens", "tokens_per_second", "avg_latency",
+                       "image_latency", "steps"}}
+              `tokens_per_second` dan latensi None jika belum ada data latensi;
+              `steps` berisi rata-rata token output per nama langkah.
+    """
+    history = {}
+    for model, entry in usage_ledger.model_history().items():
+        generation_time = entry["latency"] - entry["timed_calls"] * REQUEST_OVERHEAD_SECONDS
+        history[model] = {
+            "calls": entry["calls"],
+            "avg_output_tokens": entry["avg_output_tokens"],
+            "tokens_per_second": (entry["timed_output"] / generation_time) if generation_time > 0 else None,
+            "avg_latency": (entry["latency"] / entry["timed_calls"]) if entry["timed_calls"] else None,
+            "image_latency": entry.get("image_latency"),
+            "steps": entry["steps"],
+        }
+    return history
+
+def _read(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+def estimate_latency(model_name, output_tokens, history):
+    """Perkiraan durasi satu panggilan (detik) dari kecepatan output historis model."""
+    tokens_per_second = (history.get(model_name) or {}).get("tokens_per_second") or DEFAULT_TOKENS_PER_SECOND
+    return REQUEST_OVERHEAD_SECONDS + output_tokens / tokens_per_second
+
+def _critical_path(seconds, depends_on):
+    finish = {}
+
+    def finish_time(step):
+        if step not in finish:
+            finish[step] = seconds[step] + max([finish_time(dep) for dep in depends_on[step] if dep in seconds] + [0.0])
+        return finish[step]
+
+    return max([finish_time(step) for step in seconds] + [0.0])
+
+def plan_post(input_path, blog_prompt_path, model_config, steps_to_run, history, structured_seo=False,
+              llm_html=False, token_counter=None):
+    """
+    Memperkirakan token, biaya dan latensi setiap langkah untuk satu transkrip
+    tanpa memanggil endpoint generasi. Artefak yang sudah ada di direktori output
+    (draf, blog) dipakai untuk ukuran yang sebenarnya.
+
+    Args:
+        input_path (str): File transkrip.
+        blog_prompt_path (str): Prompt Langkah 1.
+        model_config (dict): Isi model/*.json.
+        steps_to_run (list): Langkah yang akan dijalankan.
+        history (dict): Hasil `load_history`.
+        token_counter (callable, optional): counter(prompt, model) -> token, mis.
+            `gemini_api.count_tokens`, untuk mengkalibrasi rasio karakter per token.
+
+    Returns:
+        dict: {"input", "steps": [..], "cost", "seconds", "critical_seconds", "flags": [..]}
+    """
+    base_name = os.path.basename(input_path)
+    dir_name, _ = os.path.splitext(base_name)
+    transcript = _read(input_path) or ""
+    blog_prompt = _read(blog_prompt_path) or ""
+    prompt = lambda name: _read(os.path.join(workflow_steps.PROMPT_DIR, name)) or ""
+
+    model_tutorial = model_config.get('model_tutorial', 'gemini-1.5-flash-latest')
+    model_seo = model_config.get('model_seo', 'gemini-1.5-flash-latest')
+    model_blog = model_config.get('model_blog', 'gemini-1.5-pro-latest')
+    model_image = model_config.get('model_image', 'gemini-1.5-pro-latest')
+    model_html = model_config.get("model_html", "gemini-1.5-flash")
+
+    draft_prompt = f"{blog_prompt}\n\n---\n\nKonteks dari file `{base_name}`:\n\n{transcript}"
+    chars_per_token = 4.0
+    if token_counter:
+        counted = token_counter(draft_prompt, model_tutorial)
+        if counted:
+            chars_per_token = max(1.0, len(draft_prompt) / counted)
+    tokens = lambda text: int(len(text) / chars_per_token) + 1
+
+    draft = _read(os.path.join(dir_name, f"{dir_name}.md"))
+    blog = _read(os.path.join(dir_name, f"{dir_name}.blog.md"))
+    draft_tokens = tokens(draft) if draft else min(MAX_OUTPUT_TOKENS, int(tokens(draft_prompt) * DRAFT_OUTPUT_RATIO))
+    blog_input_tokens = tokens(prompt("prompt_create_blog.md")) + tokens(transcript) + draft_tokens
+    blog_tokens = tokens(blog) if blog else min(MAX_OUTPUT_TOKENS, int(blog_input_tokens * BLOG_OUTPUT_RATIO))
+
+    seo_prompt = "prompt_seo_structured.md" if structured_seo else "prompt_add_seo.md"
+    plans = {
+        1: (model_tutorial, tokens(draft_prompt), draft_tokens),
+        2: (model_seo, tokens(prompt(seo_prompt)) + draft_tokens,
+            STRUCTURED_OUTPUT_TOKENS if structured_seo else KEYPHRASE_OUTPUT_TOKENS),
+        3: (model_blog, blog_input_tokens, blog_tokens),
+        4: None if structured_seo else (model_seo, tokens(prompt("prompt_create_seo.md")) + blog_tokens,
+                                        SEO_META_OUTPUT_TOKENS),
+        5: (model_image, tokens(prompt("prompt_create_picture.md")), 0),
+        6: (model_html, tokens(prompt("prompt_convert_md_to_html.md")) + blog_tokens,
+            int(blog_tokens * HTML_OUTPUT_RATIO)) if llm_html else None,
+        # Langkah 7 memakai parser lokal; model hanya dipakai jika parsing gagal
+        7: None,
+    }
+
+    steps = []
+    flags = []
+    seconds = {}
+    for step in sorted(steps_to_run):
+        plan = plans.get(step)
+        if plan is None:
+            steps.append({"step": step, "name": STEP_NAMES[step], "model": "lokal", "input_tokens": 0,
+                          "output_tokens": 0, "cost": 0.0, "seconds": LOCAL_STEP_SECONDS})
+            seconds[step] = LOCAL_STEP_SECONDS
+            continue
+
+        model_name, input_tokens, output_tokens = plan
+        images = 1 if step == 5 else 0
+        # Langkah dengan output kecil yang tetap: pakai rata-rata historis langkah ini jika ada
+        step_average = (history.get(model_name) or {}).get("steps", {}).get(STEP_NAMES[step])
+        if step in (2, 4) and step_average:
+            output_tokens = int(step_average)
+        usage = utils.Usage(prompt_tokens=input_tokens, output_tokens=output_tokens)
+        cost = utils.estimate_cost(model_name, usage, images_generated=images)
+        latency = (history.get(model_name) or {}).get("image_latency") if images else None
+        latency = latency or estimate_latency(model_name, output_tokens if not images else 0, history)
+        context_window = model_registry.lookup(model_name).context_window
+        if context_window and input_tokens > context_window:
+            flags.append(f"{STEP_NAMES[step]}: {input_tokens} token input melebihi context window "
+                         f"'{model_name}' ({context_window})")
+        steps.append({"step": step, "name": STEP_NAMES[step], "model": model_name, "input_tokens": input_tokens,
+                      "output_tokens": output_tokens, "cost": cost, "seconds": latency})
+        seconds[step] = latency
+
+    depends_on = {1: [], 2: [1], 3: [1, 2], 4: [2] if structured_seo else [2, 3], 5: [2], 6: [3], 7: [2, 4]}
+    return {
+        "input": input_path,
+        "steps": steps,
+        "cost": sum(step["cost"] for step in steps),
+        "seconds": sum(seconds.values()),
+        "critical_seconds": _critical_path(seconds, depends_on),
+        "flags": flags,
+    }
+
+def print_plan(plans, max_post_cost=None, workers=1):
+    """
+    Mencetak rincian per langkah dan ringkasan seluruh rencana.
+
+    Args:
+        plans (list): Hasil `plan_post` untuk setiap transkrip.
+        max_post_cost (float, optional): Batas biaya per post; post yang melebihi ditandai.
+        workers (int): Jumlah post paralel untuk memperkirakan durasi batch.
+    """
+    for plan in plans:
+        if max_post_cost is not None and plan["cost"] > max_post_cost:
+            plan["flags"].append(f"Estimasi biaya ${plan['cost']:.4f} melebihi batas ${max_post_cost:.4f} per post")
+
+        print(f"\n🧮 Rencana untuk {os.path.basename(plan['input'])}:")
+        print(f"   {'Langkah':<14} {'Model':<42} {'Input':>9} {'Output':>8} {'Biaya ($)':>10} {'Detik':>7}")
+        for step in plan["steps"]:
+            print(f"   {step['name']:<14} {step['model'][:42]:<42} {step['input_tokens']:9d} {step['output_tokens']:8d} "
+                  f"{step['cost']:10.6f} {step['seconds']:7.1f}")
+        print(f"   Total: ${plan['cost']:.6f}, {plan['seconds']:.1f} detik panggilan API, "
+              f"~{plan['critical_seconds']:.1f} detik dengan langkah paralel")
+        for flag in plan["flags"]:
+            print(f"   ⚠️ {flag}")
+
+    if len(plans) > 1:
+        total_cost = sum(plan["cost"] for plan in plans)
+        total_seconds = sum(plan["critical_seconds"] for plan in plans) / max(1, workers)
+        flagged = sum(1 for plan in plans if plan["flags"])
+        print(f"\n📊 Ringkasan rencana: {len(plans)} transkrip, estimasi biaya ${total_cost:.4f}, "
+              f"~{total_seconds / 60:.1f} menit dengan {workers} worker, {flagged} ditandai.")
@@ -0,0 +1,234 @@
+import os
+import re
+import json
+import sqlite3
+from datetime import datetime
+
+# Indeks disimpan di direktori kerja, di samping transkrip dan folder output
+DEFAULT_DB_NAME = "post_index.db"
+
+FIELDS = ("video_id", "keywords", "transcript", "output_dir", "has_seo_json", "has_html", "html_file", "post_ids",
+          "post_status")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    key TEXT PRIMARY KEY,
+    video_id TEXT,
+    keywords TEXT,
+    transcript TEXT,
+    output_dir TEXT,
+    has_seo_json INTEGER NOT NULL DEFAULT 0,
+    has_html INTEGER NOT NULL DEFAULT 0,
+    html_file TEXT,
+    post_ids TEXT,
+    post_status TEXT,
+    updated TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_posts_video_id ON posts (video_id);
+"""
+# Dibuat setelah migrasi kolom `keywords` agar indeks lama (tanpa kolom itu) tetap bisa dibuka
+_KEYWORDS_INDEX = "CREATE INDEX IF NOT EXISTS idx_posts_keywords ON posts (keywords)"
+
+_initialized = set()
+
+def db_path():
+    """Path indeks: POST_INDEX_DB, atau post_index.db di direktori kerja."""
+    return os.environ.get("POST_INDEX_DB") or os.path.join(os.getcwd(), DEFAULT_DB_NAME)
+
+def connect(path=None):
+    """Membuka koneksi SQLite (WAL) dan memastikan skema tersedia."""
+    path = os.path.abspath(path or db_path())
+    conn = sqlite3.connect(path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    # Worker pipeline menulis dari beberapa thread sekaligus
+    conn.execute("PRAGMA busy_timeout = 30000")
+    if path not in _initialized:
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.executescript(_SCHEMA)
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(posts)")}
+        if "keywords" not in columns:
+            conn.execute("ALTER TABLE posts ADD COLUMN keywords TEXT")
+        conn.execute(_KEYWORDS_INDEX)
+        _initialized.add(path)
+    return conn
+
+def identifier_for(name):
+    """
+    Kunci indeks untuk nama file/input: kode [video] jika ada, selain itu
+    seluruh kata nama file (huruf kecil, dipisah '-'). Judul yang hanya sama
+    di awal (mis. "Odoo 18 Tutorial Inventory" dan "Odoo 18 Tutorial Sales")
+    mendapat kunci berbeda.
+
+    Returns:
+        tuple: (identifier, is_code)
+    """
+    match = re.search(r'\[([a-zA-Z0-9_-]{8,})\]', name)
+    if match:
+        return match.group(1), True
+    words = re.findall(r'\w+', name)
+    return ('-'.join(words).lower() if words else name.lower()), False
+
+def keywords_for(name):
+    """Maksimal 3 kata pertama (huruf kecil, dipisah '-'); kunci sekunder untuk `lookup`."""
+    words = re.findall(r'\w+', name)
+    return '-'.join(words[:3]).lower() if words else name.lower()
+
+def folder_status(output_dir):
+    """
+    Status artefak di folder output.
+
+    Returns:
+        tuple: (has_seo_json, has_html, html_file_path)
+    """
+    if not os.path.isdir(output_dir):
+        return False, False, None
+    has_seo_json = os.path.exists(os.path.join(output_dir, 'seo.json'))
+    html_files = sorted(entry.path for entry in os.scandir(output_dir)
+                        if entry.is_file() and entry.name.endswith('.html'))
+    return has_seo_json, bool(html_files), (html_files[0] if html_files else None)
+
+def _row_to_dict(row):
+    entry = dict(row)
+    entry["post_ids"] = json.loads(entry["post_ids"]) if entry["post_ids"] else []
+    entry["has_seo_json"] = bool(entry["has_seo_json"])
+    entry["has_html"] = bool(entry["has_html"])
+    return entry
+
+def get(key, path=None):
+    """
+    Mengambil entri indeks berdasarkan kunci (kode video atau keywords).
+
+    Returns:
+        dict: Kolom entri (post_ids sudah berupa list), atau None jika tidak ada.
+    """
+    conn = connect(path)
+    try:
+        row = conn.execute("SELECT * FROM posts WHERE key = ?", (key,)).fetchone()
+    finally:
+        conn.close()
+    return _row_to_dict(row) if row else None
+
+def lookup(identifier, path=None):
+    """
+    Mencari entri untuk identifier dari `identifier_for`: lewat kuncinya, lalu
+    lewat 3 kata pertama (`keywords_for`) untuk input berupa keywords saja.
+    Pencarian keywords gagal jika cocok dengan lebih dari satu entri.
+
+    Returns:
+        dict: Entri indeks, atau None jika tidak ada atau ambigu.
+    """
+    entry = get(identifier, path)
+    if entry:
+        return entry
+    keywords = keywords_for(identifier)
+    conn = connect(path)
+    try:
+        rows = conn.execute("SELECT * FROM posts WHERE keywords = ? LIMIT 2", (keywords,)).fetchall()
+    finally:
+        conn.close()
+    if len(rows) > 1:
+        print(f"⚠️ Keywords \"{keywords}\" cocok dengan lebih dari satu entri indeks; gunakan nama file lengkap.")
+        return None
+    return _row_to_dict(rows[0]) if rows else None
+
+def record(key, path=None, **fields):
+    """
+    Menambah atau memperbarui entri; hanya kolom yang diberikan yang diubah.
+
+    Args:
+        key (str): Kunci entri (lihat `identifier_for`).
+        **fields: Kolom dari `FIELDS`; `post_ids` berupa list.
+    """
+    unknown = set(fields) - set(FIELDS)
+    if unknown:
+        raise ValueError(f"Kolom indeks tidak dikenal: {', '.join(sorted(unknown))}")
+    if "post_ids" in fields:
+        fields["post_ids"] = json.dumps(fields["post_ids"])
+    fields["updated"] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    columns = ", ".join(["key"] + list(fields))
+    placeholders = ", ".join("?" * (len(fields) + 1))
+    updates = ", ".join(f"{column} = excluded.{column}" for column in fields)
+    try:
+        conn = connect(path)
+        try:
+            with conn:
+                conn.execute(f"INSERT INTO posts ({columns}) VALUES ({placeholders}) "
+                             f"ON CONFLICT(key) DO UPDATE SET {updates}", [key] + list(fields.values()))
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        # Indeks hanya mempercepat pencarian; kegagalannya tidak boleh menghentikan proses
+        print(f"⚠️ Gagal memperbarui indeks post: {e}")
+
+def record_transcript(transcript, path=None):
+    """Mencatat file transkrip di bawah kuncinya. Returns: kunci entri."""
+    name = os.path.splitext(os.path.basename(transcript))[0]
+    key, is_code = identifier_for(name)
+    record(key, path, video_id=key if is_code else None, keywords=None if is_code else keywords_for(name),
+           transcript=transcript)
+    return key
+
+def record_outputs(key, output_dir, path=None):
+    """Mencatat folder output beserta status seo.json dan HTML-nya saat ini."""
+    has_seo_json, has_html, html_file = folder_status(output_dir)
+    record(key, path, output_dir=output_dir, has_seo_json=int(has_seo_json), has_html=int(has_html),
+           html_file=html_file)
+
+def record_upload(key, post_ids, post_status, path=None):
+    """Mencatat ID post WordPress yang dibuat untuk entri."""
+    record(key, path, post_ids=list(post_ids), post_status=post_status)
+
+def rebuild(root=".", path=None):
+    """
+    Membangun ulang indeks dari isi `root` dalam satu kali scan direktori.
+    ID post WordPress tidak ada di disk, jadi yang sudah tercatat dipertahankan
+    (entri lama berkunci 3 kata dipindahkan ke satu-satunya transkrip yang cocok).
+    Jika ada beberapa transkrip untuk satu kunci, yang dipakai adalah yang
+    pertama menurut urutan nama (diutamakan yang folder output-nya ada).
+
+    Returns:
+        int: Jumlah entri setelah rebuild.
+    """
+    entries = sorted(os.scandir(root), key=lambda entry: entry.name)
+    directories = {entry.name for entry in entries if entry.is_dir()}
+    transcripts = {}
+    for entry in entries:
+        if not (entry.is_file() and entry.name.lower().endswith('.txt')):
+            continue
+        output_dir = os.path.splitext(entry.name)[0]
+        key, is_code = identifier_for(output_dir)
+        current = transcripts.get(key)
+        if current is None or (output_dir in directories and current[1] not in directories):
+            transcripts[key] = (entry.name, output_dir, is_code)
+
+    conn = connect(path)
+    try:
+        with conn:
+            uploads = {row["key"]: (row["post_ids"], row["post_status"])
+                       for row in conn.execute("SELECT key, post_ids, post_status FROM posts WHERE post_ids IS NOT NULL")}
+            conn.execute("DELETE FROM posts")
+            # Indeks lama memakai 3 kata pertama sebagai kunci; pindahkan uploadnya jika tidak ambigu
+            for old_key in [key for key in uploads if key not in transcripts]:
+                matches = [key for key, (name, output_dir, is_code) in transcripts.items()
+                           if not is_code and keywords_for(output_dir) == old_key]
+                if len(matches) == 1 and matches[0] not in uploads:
+                    uploads[matches[0]] = uploads.pop(old_key)
+            now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            for key, (name, output_dir, is_code) in transcripts.items():
+                output_path = os.path.normpath(os.path.join(root, output_dir))
+                has_seo_json, has_html, html_file = folder_status(output_path)
+                post_ids, post_status = uploads.pop(key, (None, None))
+                conn.execute(
+                    "INSERT INTO posts (key, video_id, keywords, transcript, output_dir, has_seo_json, has_html, "
+                    "html_file, post_ids, post_status, updated) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, key if is_code else None, None if is_code else keywords_for(output_dir),
+                     os.path.normpath(os.path.join(root, name)),
+                     output_path if output_dir in directories else None,
+                     int(has_seo_json), int(has_html), html_file, post_ids, post_status, now))
+            # Entri yang sudah diupload tetap dicatat walaupun filenya sudah dihapus
+            for key, (post_ids, post_status) in uploads.items():
+                conn.execute("INSERT INTO posts (key, post_ids, post_status, updated) VALUES (?, ?, ?, ?)",
+                             (key, post_ids, post_status, now))
+        return conn.execute("SELECT COUNT(*) FROM posts").fetchone()[0]
+    finally:
+        conn.close()
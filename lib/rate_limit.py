@@ -0,0 +1,109 @@
+import time
+import asyncio
+import threading
+from . import model_registry
+
+class TokenBucket:
+    """
+    Token bucket thread-safe. `reserve` langsung mengurangi saldo (boleh minus)
+    dan mengembalikan berapa detik pemanggil harus menunggu, sehingga bisa dipakai
+    dari thread biasa maupun dari coroutine asyncio.
+    """
+    def __init__(self, capacity, per_seconds=60.0):
+        self.capacity = float(capacity)
+        self.rate = self.capacity / per_seconds
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount=1.0):
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # Request yang lebih besar dari kapasitas tetap boleh lewat setelah bucket penuh
+            amount = min(float(amount), self.capacity)
+            self.tokens -= amount
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+class ModelLimiter:
+    """Batas RPM (request per menit) dan TPM (token per menit) untuk satu model."""
+    def __init__(self, rpm=None, tpm=None):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def pause(self, seconds):
+        """Menahan semua request ke model ini, misalnya setelah menerima 429."""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def reserve(self, tokens=0):
+        """Mengembalikan jumlah detik yang harus ditunggu sebelum request boleh dikirim."""
+        with self._lock:
+            wait = max(0.0, self.paused_until - time.monotonic())
+        if self.requests:
+            wait = max(wait, self.requests.reserve(1))
+        if self.tokens and tokens:
+            wait = max(wait, self.tokens.reserve(tokens))
+        return wait
+
+_limiters = {}
+_limits = {}
+_registry_lock = threading.Lock()
+
+def configure(rate_limits):
+    """
+    Mengatur batas per model, biasanya dari bagian "rate_limits" di model/*.json:
+    {"gemini-2.5-pro": {"rpm": 150, "tpm": 2000000}, ...}
+
+    Limiter yang batasnya tidak berubah dipertahankan, sehingga memanggil ulang
+    `configure` di setiap run (mis. dalam mode batch) tidak mereset kuota.
+    """
+    with _registry_lock:
+        for model_name, limits in (rate_limits or {}).items():
+            limits = {"rpm": limits.get("rpm"), "tpm": limits.get("tpm")}
+            if _limits.get(model_name) != limits:
+                _limits[model_name] = limits
+                _limiters.pop(model_name, None)
+
+def get_limiter(model_name):
+    """
+    Mengambil limiter untuk model. Batas dari konfigurasi model diutamakan, lalu
+    RPM/TPM dari registry model. Model tanpa batas tetap mendapat limiter agar `pause` berlaku.
+    """
+    with _registry_lock:
+        limiter = _limiters.get(model_name)
+        if limiter is None:
+            limits = _limits.get(model_name)
+            if limits is None:
+                info = model_registry.lookup(model_name)
+                limits = {"rpm": info.rpm, "tpm": info.tpm}
+            limiter = ModelLimiter(**limits)
+            _limiters[model_name] = limiter
+        return limiter
+
+def acquire(model_name, tokens=0):
+    """Menunggu (blocking) sampai request ke `model_name` diizinkan oleh limiter."""
+    wait = get_limiter(model_name).reserve(tokens)
+    if wait > 0:
+        print(f"⏳ Rate limit '{model_name}': menunggu {wait:.1f} detik...")
+        time.sleep(wait)
+    return wait
+
+async def aacquire(model_name, tokens=0):
+    """Versi asyncio dari `acquire`."""
+    wait = get_limiter(model_name).reserve(tokens)
+    if wait > 0:
+        print(f"⏳ Rate limit '{model_name}': menunggu {wait:.1f} detik...")
+        await asyncio.sleep(wait)
+    return wait
+
+def pause(model_name, seconds):
+    """Menahan model selama `seconds` detik untuk semua worker (dipakai saat menerima 429)."""
+    get_limiter(model_name).pause(seconds)
@@ -0,0 +1,215 @@
+import os
+import json
+import time
+import hashlib
+import threading
+
+# Direktori cache default berada di root project (bukan CWD), supaya
+# hasil dari beberapa direktori kerja tetap bisa dipakai ulang.
+_current_dir = os.path.dirname(os.path.abspath(__file__))
+_project_root = os.path.dirname(_current_dir)
+DEFAULT_CACHE_DIR = os.path.join(_project_root, ".cache", "gemini")
+
+# Batas default: 500 MB atau 30 hari, mana yang tercapai lebih dulu.
+DEFAULT_MAX_BYTES = 500 * 1024 * 1024
+DEFAULT_MAX_AGE_DAYS = 30
+# Scan penuh direktori cache (untuk entri kedaluwarsa dan koreksi ukuran) paling sering tiap N penulisan
+PRUNE_EVERY_WRITES = 500
+# Eviksi berbasis ukuran turun sampai 90% batas agar penulisan berikutnya tidak langsung memicu scan lagi
+PRUNE_TARGET_RATIO = 0.9
+
+_settings = {
+    "enabled": True,
+    "refresh": False,
+    "cache_dir": os.getenv("GEMINI_CACHE_DIR", DEFAULT_CACHE_DIR),
+    "max_bytes": DEFAULT_MAX_BYTES,
+    "max_age_seconds": DEFAULT_MAX_AGE_DAYS * 24 * 3600,
+}
+_stats = {"hits": 0, "misses": 0, "writes": 0, "evicted": 0}
+_lock = threading.Lock()
+# Perkiraan ukuran total cache (None = belum di-scan) agar `put` tidak men-scan direktori setiap kali
+_size = {"bytes": None, "writes_since_prune": 0}
+_prune_lock = threading.Lock()
+
+def configure(enabled=True, refresh=False, cache_dir=None, max_bytes=None, max_age_days=None):
+    """
+    Mengatur perilaku cache respon.
+
+    Args:
+        enabled (bool): False untuk mematikan baca dan tulis cache (--no-cache).
+        refresh (bool): True untuk mengabaikan isi cache tetapi tetap menyimpan respon baru (--refresh).
+        cache_dir (str, optional): Lokasi direktori cache.
+        max_bytes (int, optional): Ukuran total maksimum cache sebelum entri terlama dihapus.
+        max_age_days (float, optional): Umur maksimum sebuah entri.
+    """
+    _settings["enabled"] = enabled
+    _settings["refresh"] = refresh
+    if cache_dir and cache_dir != _settings["cache_dir"]:
+        _settings["cache_dir"] = cache_dir
+        with _lock:
+            _size["bytes"] = None
+    if max_bytes is not None:
+        _settings["max_bytes"] = max_bytes
+    if max_age_days is not None:
+        _settings["max_age_seconds"] = max_age_days * 24 * 3600
+
+def make_key(model_name, prompt_text, generation_config=None, context=None):
+    """
+    Membuat kunci cache (sha256) dari nama model, prompt lengkap, dan konfigurasi generasi.
+    `context` adalah hash konteks yang dirujuk lewat context caching Gemini (jika ada).
+    """
+    material = {"model": model_name, "prompt": prompt_text, "config": generation_config}
+    if context is not None:
+        material["context"] = context
+    material = json.dumps(material, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+def _entry_path(key):
+    # Dua karakter pertama sebagai sub-direktori agar satu folder tidak terlalu penuh
+    return os.path.join(_settings["cache_dir"], key[:2], f"{key}.json")
+
+def _count(name, amount=1):
+    with _lock:
+        _stats[name] += amount
+
+def get(model_name, prompt_text, generation_config=None, context=None):
+    """
+    Mengambil respon yang tersimpan untuk kombinasi model/prompt/konfigurasi.
+
+    Returns:
+        dict: Entri cache (berisi minimal 'text'), atau None jika tidak ada / kedaluwarsa.
+    """
+    if not _settings["enabled"]:
+        return None
+    if _settings["refresh"]:
+        _count("misses")
+        return None
+
+    path = _entry_path(make_key(model_name, prompt_text, generation_config, context))
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError, OSError):
+        _count("misses")
+        return None
+
+    if time.time() - entry.get("created", 0) > _settings["max_age_seconds"]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        _count("misses")
+        _count("evicted")
+        return None
+
+    # Perbarui mtime supaya eviksi berbasis ukuran membuang entri yang paling jarang dipakai
+    try:
+        os.utime(path, None)
+    except OSError:
+        pass
+    _count("hits")
+    return entry
+
+def put(model_name, prompt_text, payload, generation_config=None, context=None):
+    """
+    Menyimpan respon ke cache secara atomik. Ukuran total dilacak per proses;
+    direktori hanya di-scan (`prune`) pada penulisan pertama, saat total
+    melewati batas, atau setiap `PRUNE_EVERY_WRITES` penulisan.
+    """
+    if not _settings["enabled"]:
+        return
+
+    path = _entry_path(make_key(model_name, prompt_text, generation_config, context))
+    entry = dict(payload)
+    entry["model"] = model_name
+    entry["created"] = time.time()
+
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        try:
+            replaced = os.path.getsize(path)
+        except OSError:
+            replaced = 0
+        added = os.path.getsize(tmp_path) - replaced
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"⚠️ Gagal menyimpan respon ke cache: {e}")
+        return
+
+    with _lock:
+        _stats["writes"] += 1
+        _size["writes_since_prune"] += 1
+        if _size["bytes"] is not None:
+            _size["bytes"] += added
+        needs_prune = (_size["bytes"] is None or _size["bytes"] > _settings["max_bytes"]
+                       or _size["writes_since_prune"] >= PRUNE_EVERY_WRITES)
+    # Satu thread saja yang men-scan; thread lain tidak menunggu
+    if needs_prune and _prune_lock.acquire(blocking=False):
+        try:
+            prune()
+        finally:
+            _prune_lock.release()
+
+def prune():
+    """
+    Menghapus entri yang kedaluwarsa, lalu entri terlama hingga total ukuran
+    turun ke `PRUNE_TARGET_RATIO` dari batas (jika batas terlampaui).
+    """
+    cache_dir = _settings["cache_dir"]
+    if not os.path.isdir(cache_dir):
+        return 0
+
+    now = time.time()
+    entries = []
+    removed = 0
+    for root, _, files in os.walk(cache_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if now - st.st_mtime > _settings["max_age_seconds"]:
+                try:
+                    os.remove(path)
+                    removed += 1
+                except OSError:
+                    pass
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    if total > _settings["max_bytes"]:
+        target = _settings["max_bytes"] * PRUNE_TARGET_RATIO
+        for _, size, path in sorted(entries):
+            try:
+                os.remove(path)
+                removed += 1
+                total -= size
+            except OSError:
+                pass
+            if total <= target:
+                break
+
+    with _lock:
+        if removed:
+            _stats["evicted"] += removed
+        _size["bytes"] = total
+        _size["writes_since_prune"] = 0
+    return removed
+
+def stats():
+    """Mengembalikan salinan penghitung hit/miss/write/evicted."""
+    with _lock:
+        return dict(_stats)
+
+def print_stats():
+    """Mencetak ringkasan penggunaan cache untuk run saat ini."""
+    s = stats()
+    if not _settings["enabled"]:
+        print("📦 Cache respon: nonaktif (--no-cache)")
+        return
+    print(f"📦 Cache respon: {s['hits']} hit, {s['misses']} miss, {s['writes']} disimpan, {s['evicted']} dihapus")
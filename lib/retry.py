@@ -0,0 +1,132 @@
+import re
+import time
+import random
+import asyncio
+from . import tracing
+
+# Kode HTTP yang layak dicoba ulang: timeout, rate limit, dan error sementara di server
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+# Kode yang pasti gagal lagi jika dikirim ulang (request salah, kunci salah, model tidak ada)
+FATAL_STATUS = {400, 401, 403, 404}
+
+_RETRYABLE_MARKERS = ("RESOURCE_EXHAUSTED", "UNAVAILABLE", "DEADLINE_EXCEEDED", "INTERNAL",
+                      "Too Many Requests", "overloaded", "timed out", "Connection reset")
+
+_policy = {"max_attempts": 5, "base_delay": 2.0, "max_delay": 60.0}
+
+def configure(max_attempts=None, base_delay=None, max_delay=None):
+    """
+    Mengatur kebijakan retry global (biasanya dari bagian "retry" di model/*.json).
+
+    Args:
+        max_attempts (int): Jumlah percobaan maksimum termasuk percobaan pertama.
+        base_delay (float): Jeda dasar backoff eksponensial (detik).
+        max_delay (float): Batas atas jeda antar percobaan (detik).
+    """
+    if max_attempts is not None:
+        _policy["max_attempts"] = max(1, int(max_attempts))
+    if base_delay is not None:
+        _policy["base_delay"] = float(base_delay)
+    if max_delay is not None:
+        _policy["max_delay"] = float(max_delay)
+
+def status_code(exc):
+    """Mengambil kode status HTTP dari exception SDK Google (google.api_core maupun google.genai)."""
+    for attr in ("code", "status_code"):
+        code = getattr(exc, attr, None)
+        if isinstance(code, int):
+            return code
+    response = getattr(exc, "response", None)
+    code = getattr(response, "status_code", None)
+    return code if isinstance(code, int) else None
+
+def is_retryable(exc):
+    """Mengklasifikasikan error: True jika sementara (boleh diulang), False jika fatal."""
+    code = status_code(exc)
+    if code in RETRYABLE_STATUS:
+        return True
+    if code in FATAL_STATUS:
+        return False
+    if isinstance(exc, (ConnectionError, TimeoutError, asyncio.TimeoutError)):
+        return True
+    message = str(exc)
+    return any(marker.lower() in message.lower() for marker in _RETRYABLE_MARKERS)
+
+def retry_after(exc):
+    """
+    Mencari jeda yang diminta server, dari header Retry-After atau dari
+    RetryInfo (`retryDelay` / `retry_delay`) di pesan error. None jika tidak ada.
+    """
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers:
+        value = headers.get("Retry-After") or headers.get("retry-after")
+        try:
+            return float(value) if value is not None else None
+        except ValueError:
+            pass
+
+    message = str(exc)
+    match = (re.search(r"retryDelay['\"]?\s*:\s*['\"]?(\d+(?:\.\d+)?)s", message)
+             or re.search(r"retry_delay\s*\{\s*seconds:\s*(\d+)", message))
+    if match:
+        return float(match.group(1))
+    return None
+
+def backoff_delay(attempt, exc=None):
+    """Menghitung jeda sebelum percobaan berikutnya (exponential backoff dengan full jitter)."""
+    requested = retry_after(exc) if exc is not None else None
+    if requested is not None:
+        # Hormati permintaan server, plus sedikit jitter agar worker tidak serentak mencoba lagi
+        return min(_policy["max_delay"], requested) + random.uniform(0, 1)
+    ceiling = min(_policy["max_delay"], _policy["base_delay"] * (2 ** attempt))
+    return random.uniform(0, ceiling)
+
+def call_with_retry(func, label="request", on_retry=None):
+    """
+    Menjalankan `func()` dan mengulanginya untuk error sementara.
+
+    Args:
+        func (callable): Fungsi tanpa argumen yang melakukan request.
+        label (str): Nama request untuk log.
+        on_retry (callable, optional): Dipanggil dengan (exc, delay) sebelum menunggu.
+
+    Returns:
+        Nilai kembali dari `func()`.
+
+    Raises:
+        Exception: Error fatal langsung, atau error terakhir setelah percobaan habis.
+    """
+    attempts = _policy["max_attempts"]
+    for attempt in range(attempts):
+        try:
+            return func()
+        except Exception as e:
+            if not is_retryable(e) or attempt == attempts - 1:
+                raise
+            delay = backoff_delay(attempt, e)
+            print(f"🔁 {label}: error sementara ({status_code(e) or type(e).__name__}), "
+                  f"mencoba lagi dalam {delay:.1f} detik (percobaan {attempt + 2}/{attempts})")
+            tracing.add_event("retry", attempt=attempt + 2, status=status_code(e) or type(e).__name__,
+                              delay=round(delay, 3))
+            if on_retry:
+                on_retry(e, delay)
+            time.sleep(delay)
+
+async def acall_with_retry(func, label="request", on_retry=None):
+    """Versi asyncio dari `call_with_retry`; `func()` harus mengembalikan coroutine baru."""
+    attempts = _policy["max_attempts"]
+    for attempt in range(attempts):
+        try:
+            return await func()
+        except Exception as e:
+            if not is_retryable(e) or attempt == attempts - 1:
+                raise
+            delay = backoff_delay(attempt, e)
+            print(f"🔁 {label}: error sementara ({status_code(e) or type(e).__name__}), "
+                  f"mencoba lagi dalam {delay:.1f} detik (percobaan {attempt + 2}/{attempts})")
+            tracing.add_event("retry", attempt=attempt + 2, status=status_code(e) or type(e).__name__,
+                              delay=round(delay, 3))
+            if on_retry:
+                on_retry(e, delay)
+            await asyncio.sleep(delay)
@@ -0,0 +1,136 @@
+import time
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from . import tracing
+
+# Nilai kembali khusus untuk langkah yang dilewati karena artefaknya masih terkini
+UP_TO_DATE = "up-to-date"
+
+class Step:
+    """
+    Satu simpul pada graf dependensi alur kerja.
+
+    Args:
+        step_id: ID unik langkah (misalnya 1-7, atau nama untuk langkah bantu).
+        name (str): Nama yang ditampilkan di log.
+        func (callable): Fungsi tanpa argumen; mengembalikan True jika berhasil,
+                         atau UP_TO_DATE jika langkah tidak perlu dijalankan ulang.
+        depends_on (iterable): ID langkah yang harus selesai lebih dulu.
+        inputs (iterable): Path file yang dibaca langkah ini (dokumentasi graf).
+        outputs (iterable): Path file yang ditulis langkah ini (dokumentasi graf).
+        required (bool): Jika True, kegagalan menghentikan langkah yang bergantung padanya
+                         dan langkah baru tidak lagi dijalankan.
+    """
+    def __init__(self, step_id, name, func, depends_on=(), inputs=(), outputs=(), required=False):
+        self.step_id = step_id
+        self.name = name
+        self.func = func
+        self.depends_on = tuple(depends_on)
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.required = required
+
+def _run_step(step):
+    start = time.perf_counter()
+    with tracing.span(step.name, kind="step", step=str(step.step_id)) as span:
+        try:
+            result = step.func()
+            status = UP_TO_DATE if result == UP_TO_DATE else ("ok" if result else "failed")
+        except Exception as e:
+            print(f"❌ Error tak terduga di langkah {step.name}: {e}")
+            status = "failed"
+            span.event("exception", type=type(e).__name__, message=str(e))
+        span.set(outcome=status)
+        if status == "failed":
+            span.fail(f"Langkah {step.name} gagal")
+    return status, time.perf_counter() - start
+
+def run_steps(steps, max_workers=None, on_step_done=None):
+    """
+    Menjalankan langkah-langkah sesuai graf dependensinya. Setiap langkah yang
+    dependensinya sudah selesai langsung dijalankan secara paralel.
+
+    Dependensi ke langkah yang tidak ada di `steps` diabaikan (artefaknya
+    dianggap sudah tersedia di disk dari run sebelumnya).
+
+    Args:
+        steps (list[Step]): Langkah yang akan dijalankan.
+        max_workers (int, optional): Jumlah thread maksimum. Default: jumlah langkah.
+        on_step_done (callable, optional): Dipanggil `on_step_done(step_id, status, seconds)`
+            setiap kali sebuah langkah selesai (mis. untuk checkpoint job).
+
+    Returns:
+        dict: {step_id: {"status": "ok"|"up-to-date"|"failed"|"skipped", "seconds": float}}
+    """
+    by_id = {step.step_id: step for step in steps}
+    pending = {
+        step.step_id: {dep for dep in step.depends_on if dep in by_id}
+        for step in steps
+    }
+    for step_id, deps in pending.items():
+        for dep in deps:
+            if dep == step_id:
+                raise ValueError(f"Langkah {step_id} tidak boleh bergantung pada dirinya sendiri")
+
+    results = {}
+    running = {}
+    aborted = False
+
+    def _skip_dependents(failed_id):
+        for step_id in list(pending):
+            # Bisa saja sudah dihapus oleh pemanggilan rekursif sebelumnya
+            if step_id in pending and failed_id in pending[step_id]:
+                del pending[step_id]
+                results[step_id] = {"status": "skipped", "seconds": 0.0}
+                print(f"⏭️ Langkah {by_id[step_id].name} dilewati karena langkah {by_id[failed_id].name} gagal.")
+                _skip_dependents(step_id)
+
+    with ThreadPoolExecutor(max_workers=max_workers or max(1, len(steps))) as executor:
+        while pending or running:
+            if not aborted:
+                ready = [step_id for step_id, deps in pending.items() if not deps]
+                for step_id in ready:
+                    del pending[step_id]
+                    # Salin context agar contextvars (mis. akumulator biaya) ikut ke thread langkah
+                    ctx = contextvars.copy_context()
+                    running[executor.submit(ctx.run, _run_step, by_id[step_id])] = step_id
+
+            if not running:
+                if pending:
+                    if not aborted:
+                        raise ValueError(f"Graf langkah memiliki siklus: {sorted(map(str, pending))}")
+                    for step_id in pending:
+                        results[step_id] = {"status": "skipped", "seconds": 0.0}
+                    pending.clear()
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                step_id = running.pop(future)
+                status, seconds = future.result()
+                results[step_id] = {"status": status, "seconds": seconds}
+                if on_step_done:
+                    on_step_done(step_id, status, seconds)
+                if status != "failed":
+                    for deps in pending.values():
+                        deps.discard(step_id)
+                elif by_id[step_id].required:
+                    aborted = True
+                    _skip_dependents(step_id)
+                else:
+                    # Langkah opsional yang gagal tidak menahan langkah lain
+                    for deps in pending.values():
+                        deps.discard(step_id)
+
+    return results
+
+def print_summary(steps, results):
+    """Mencetak ringkasan status dan durasi setiap langkah."""
+    icons = {"ok": "✅", UP_TO_DATE: "💤", "failed": "❌", "skipped": "⏭️"}
+    print("\n⏱️  Ringkasan langkah:")
+    for step in steps:
+        result = results.get(step.step_id)
+        if not result:
+            continue
+        note = " (terkini, dilewati)" if result['status'] == UP_TO_DATE else ""
+        print(f"   {icons[result['status']]} {step.name:<20} {result['seconds']:7.2f} detik{note}")
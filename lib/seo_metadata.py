@@ -0,0 +1,149 @@
+import re
+import unicodedata
+
+# Naikkan jika hasil parsing berubah, agar manifest menjalankan ulang Langkah 7
+PARSER_VERSION = 2
+
+# Batas panjang yang disarankan Rank Math
+MAX_TITLE_CHARS = 60
+MAX_DESCRIPTION_CHARS = 160
+MAX_SLUG_CHARS = 75
+
+# Label yang dipakai model untuk setiap field (sudah dinormalisasi ke huruf kecil)
+FIELD_LABELS = {
+    "title": ("meta title", "seo title", "title", "slug-based title", "slug based title", "judul", "judul seo",
+              "seo meta title"),
+    "description": ("meta description", "seo description", "description", "deskripsi", "deskripsi meta",
+                    "seo meta description"),
+    "focus_keyword": ("focus keyword", "focus keyphrase", "seo focus keyphrase", "seo focus keyword",
+                      "seo keyphrase", "keyphrase", "focus keyphrase seo", "kata kunci utama"),
+    "slug": ("slug", "url slug", "seo slug", "slug-based", "slug based", "permalink"),
+}
+
+# Penanda judul, butir list dan nomor boleh digabung, mis. "### 1. SEO Focus Keyphrase" atau "- 2) Slug:"
+_LABEL_LINE = re.compile(r'^\s*(?:#{1,6}\s+)?(?:[-*+]\s+)?(?:\d+[.)]\s+)?(.+?)\s*$')
+# Keterangan panjang yang sering ditambahkan model, mis. "(58 characters)"
+_LENGTH_NOTE = re.compile(r'\s*[\(\[]\s*\d+\s*(?:characters?|chars?|karakter)\s*[\)\]]\s*$', re.IGNORECASE)
+
+def _normalize_label(label):
+    label = re.sub(r'[*_`#]', '', label).strip().rstrip(':').strip().lower()
+    return re.sub(r'\s+', ' ', label)
+
+def _clean_value(value):
+    value = value.strip()
+    value = re.sub(r'^[*_`]+|[*_`]+$', '', value).strip()
+    value = _LENGTH_NOTE.sub('', value)
+    # Buang tanda kutip pembungkus, termasuk kutip tipografis
+    if len(value) >= 2 and value[0] in '"\'“‘' and value[-1] in '"\'”’':
+        value = value[1:-1].strip()
+    return value
+
+def _field_for(label):
+    normalized = _normalize_label(label)
+    for field, labels in FIELD_LABELS.items():
+        if normalized in labels:
+            return field
+    return None
+
+def _next_value(lines, start):
+    # Nilai pada baris tidak kosong berikutnya, untuk format label sebagai judul
+    for line in lines[start:]:
+        if line.strip():
+            value = _clean_value(re.sub(r'^\s*[-*+>]\s+', '', line))
+            return None if _field_for(value) else value
+    return None
+
+def _parse_fields(text):
+    fields = {}
+    lines = text.splitlines()
+    for index, line in enumerate(lines):
+        body = _LABEL_LINE.match(line).group(1) if line.strip() else ""
+        # "Label: nilai", label boleh ditebalkan (**Label:** nilai / **Label**: nilai)
+        labelled = re.match(r'^(.+?):\s*(.*)$', body)
+        field = _field_for(labelled.group(1)) if labelled else None
+        if field:
+            value = _clean_value(labelled.group(2)) or _next_value(lines, index + 1)
+        else:
+            field = _field_for(body)
+            value = _next_value(lines, index + 1) if field else None
+        if field and value and field not in fields:
+            fields[field] = value
+    return fields
+
+def parse_seo_metadata(seo_content, metadata_header=None):
+    """
+    Mengambil Meta Title, Meta Description, Focus Keyword dan Slug dari isi
+    file .seo.md tanpa memanggil model. Label yang dikenali cukup longgar
+    (mis. "SEO Title", "Focus Keyphrase", "**Slug:**", atau label sebagai judul).
+
+    Args:
+        seo_content (str): Isi file .seo.md.
+        metadata_header (str, optional): Judul bagian metadata Langkah 4; jika ada,
+            bagian itu diprioritaskan dibanding daftar keyphrase Langkah 2.
+
+    Returns:
+        dict: {"title", "description", "focus_keyword", "slug"} (field yang tidak
+              ditemukan tidak disertakan).
+    """
+    sections = [seo_content]
+    if metadata_header and metadata_header in seo_content:
+        sections.insert(0, seo_content.split(metadata_header, 1)[1])
+
+    fields = {}
+    for section in sections:
+        for field, value in _parse_fields(section).items():
+            fields.setdefault(field, value)
+    return fields
+
+def normalize_slug(text):
+    """Mengubah teks (atau URL) menjadi slug huruf kecil ASCII yang dipisah '-'."""
+    text = text.strip()
+    if '/' in text:
+        # Nilai berupa URL atau path: ambil segmen terakhir
+        text = [part for part in text.split('/') if part][-1] if text.strip('/') else ''
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    text = re.sub(r'[^a-z0-9]+', '-', text.lower())
+    return text.strip('-')
+
+def check_lengths(seo_json):
+    """
+    Memeriksa panjang field terhadap batas yang disarankan Rank Math.
+
+    Returns:
+        list: Pesan peringatan (kosong jika semua sesuai).
+    """
+    meta = seo_json.get("meta", {})
+    checks = [
+        ("Meta title", meta.get("rank_math_title", ""), MAX_TITLE_CHARS),
+        ("Meta description", meta.get("rank_math_description", ""), MAX_DESCRIPTION_CHARS),
+        ("Slug", seo_json.get("slug", ""), MAX_SLUG_CHARS),
+    ]
+    return [
+        f"{name} {len(value)} karakter, melebihi batas {limit} karakter"
+        for name, value, limit in checks if len(value) > limit
+    ]
+
+def build_seo_json(seo_content, metadata_header=None):
+    """
+    Membuat struktur seo.json yang dipakai `WordPressUploader.update_rankmath_seo`.
+
+    Returns:
+        dict: {"meta": {...}, "slug": str}, atau None jika title, description
+              atau focus keyword tidak ditemukan (pemanggil memakai model).
+    """
+    fields = parse_seo_metadata(seo_content, metadata_header)
+    if not all(fields.get(name) for name in ("title", "description", "focus_keyword")):
+        return None
+
+    # Slug diturunkan dari focus keyword jika tidak disebutkan
+    slug = normalize_slug(fields.get("slug") or fields["focus_keyword"])
+    if not slug:
+        return None
+    return {
+        "meta": {
+            "rank_math_title": fields["title"],
+            "rank_math_description": fields["description"],
+            "rank_math_focus_keyword": fields["focus_keyword"],
+        },
+        "slug": slug,
+    }
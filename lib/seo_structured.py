@@ -0,0 +1,148 @@
+import json
+from dataclasses import dataclass, asdict
+from . import seo_metadata, utils
+
+# Skema respon JSON (subset OpenAPI yang diterima Gemini) untuk mode structured output
+SEO_PLAN_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "keyphrases": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "keyphrase": {"type": "STRING"},
+                    "search_volume": {"type": "INTEGER"},
+                    "keyword_difficulty": {"type": "INTEGER"},
+                    "search_intent": {"type": "INTEGER"},
+                    "meta_title": {"type": "STRING"},
+                    "meta_description": {"type": "STRING"},
+                    "slug": {"type": "STRING"},
+                    "social_description": {"type": "STRING"},
+                },
+                "required": ["keyphrase", "search_volume", "keyword_difficulty", "search_intent",
+                             "meta_title", "meta_description", "slug", "social_description"],
+            },
+        },
+    },
+    "required": ["keyphrases"],
+}
+
+GENERATION_CONFIG = {"response_mime_type": "application/json", "response_schema": SEO_PLAN_SCHEMA}
+
+_METRICS = ("search_volume", "keyword_difficulty", "search_intent")
+
+@dataclass
+class SeoKeyphrase:
+    """Satu kandidat keyphrase beserta skor dan metadata SEO-nya."""
+    keyphrase: str
+    search_volume: int
+    keyword_difficulty: int
+    search_intent: int
+    meta_title: str
+    meta_description: str
+    slug: str
+    social_description: str = ""
+
+    @property
+    def score(self):
+        """Total skor (High=3, Medium=2, Low=1 untuk setiap metrik)."""
+        return self.search_volume + self.keyword_difficulty + self.search_intent
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Membuat dan memvalidasi satu kandidat dari dict hasil model.
+
+        Raises:
+            ValueError: Jika field wajib kosong atau skor di luar 1-3.
+        """
+        if not isinstance(data, dict):
+            raise ValueError(f"Kandidat keyphrase harus berupa object, bukan {type(data).__name__}")
+        values = {}
+        for name in ("keyphrase", "meta_title", "meta_description", "slug"):
+            value = data.get(name)
+            if not isinstance(value, str) or not value.strip():
+                raise ValueError(f"Field '{name}' kosong atau bukan teks")
+            values[name] = value.strip()
+        for name in _METRICS:
+            value = data.get(name)
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or not 1 <= value <= 3:
+                raise ValueError(f"Skor '{name}' untuk '{values['keyphrase']}' harus 1-3, bukan {value!r}")
+            values[name] = int(value)
+        values["social_description"] = str(data.get("social_description") or "").strip()
+        values["slug"] = seo_metadata.normalize_slug(values["slug"])
+        if not values["slug"]:
+            raise ValueError(f"Slug untuk '{values['keyphrase']}' tidak valid")
+        return cls(**values)
+
+@dataclass
+class SeoPlan:
+    """Hasil satu panggilan structured output: kandidat keyphrase terurut dari skor tertinggi."""
+    keyphrases: list
+
+    @classmethod
+    def from_json(cls, text):
+        """
+        Mem-parsing dan memvalidasi respon JSON model.
+
+        Raises:
+            ValueError: Jika JSON tidak valid atau tidak sesuai skema.
+        """
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Respon bukan JSON valid: {e}")
+        items = data.get("keyphrases") if isinstance(data, dict) else None
+        if not isinstance(items, list) or not items:
+            raise ValueError("Respon tidak berisi daftar 'keyphrases'")
+        keyphrases = [SeoKeyphrase.from_dict(item) for item in items]
+        # Aturan tie-break dari prompt: skor total, lalu skor search intent
+        keyphrases.sort(key=lambda item: (item.score, item.search_intent), reverse=True)
+        return cls(keyphrases)
+
+    @classmethod
+    def load(cls, path):
+        """Membaca rencana SEO yang disimpan oleh `save`."""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_json(f.read())
+
+    def save(self, path):
+        """Menyimpan rencana SEO sebagai JSON (ditulis atomik)."""
+        data = {"keyphrases": [asdict(item) for item in self.keyphrases]}
+        utils.write_text_atomic(path, json.dumps(data, indent=2, ensure_ascii=False) + "\n")
+
+    def find(self, keyphrase):
+        """Mencari kandidat berdasarkan teks keyphrase (tidak peka huruf besar/kecil)."""
+        wanted = (keyphrase or "").strip().lower()
+        for item in self.keyphrases:
+            if item.keyphrase.lower() == wanted:
+                return item
+        return None
+
+    def keyphrase_markdown(self):
+        """
+        Daftar keyphrase bernomor dengan format yang dibaca
+        `utils.parse_and_select_keyphrase` ("1. keyphrase (score: N)").
+        """
+        lines = []
+        for number, item in enumerate(self.keyphrases, 1):
+            lines.append(f"{number}. {item.keyphrase} (score: {item.score})")
+            lines.append(f"   - Search Volume: {item.search_volume}, Keyword Difficulty: {item.keyword_difficulty}, "
+                         f"Search Intent: {item.search_intent}")
+        return "\n".join(lines)
+
+def metadata_markdown(item):
+    """
+    Bagian metadata SEO untuk keyphrase terpilih, dengan label yang dikenali
+    parser seo.json lokal (`seo_metadata.build_seo_json`).
+    """
+    lines = [
+        f"**Focus Keyword:** {item.keyphrase}",
+        f"**Meta Title:** {item.meta_title}",
+        f"**Slug:** {item.slug}",
+        f"**Meta Description:** {item.meta_description}",
+    ]
+    if item.social_description:
+        lines.append(f"**Social Share Description:** {item.social_description}")
+    return "\n\n".join(lines) + "\n"
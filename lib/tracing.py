@@ -0,0 +1,270 @@
+import os
+import json
+import time
+import atexit
+import threading
+import contextvars
+import urllib.request
+from contextlib import contextmanager
+
+# Tracing ringan: span per langkah workflow, per panggilan API Gemini dan per
+# request HTTP WordPress. Span yang selesai ditulis ke log JSON-lines, opsional
+# dikirim ke collector OpenTelemetry (OTLP/HTTP JSON), dan opsional dirangkum
+# sebagai ringkasan flame di akhir run. Tanpa konfigurasi, `span` tidak mencatat
+# apa pun sehingga biayanya hampir nol.
+
+OTLP_BATCH_SIZE = 256
+SERVICE_NAME = "gemini-blog"
+
+_settings = {
+    "log_path": os.environ.get("GEMINI_TRACE_LOG") or None,
+    "otlp_endpoint": os.environ.get("GEMINI_TRACE_OTLP") or None,
+    "summary": False,
+}
+_current = contextvars.ContextVar("trace_span", default=None)
+_lock = threading.Lock()
+_otlp_buffer = []
+_otlp_warned = False
+# Agregat ringkasan flame: {path span: {"count", "seconds", "errors", "tokens", "bytes", "order"}}
+_summary = {}
+
+def configure(log_path=None, otlp_endpoint=None, summary=None):
+    """
+    Mengaktifkan tracing. Argumen yang None tidak mengubah pengaturan sebelumnya
+    (default dari GEMINI_TRACE_LOG dan GEMINI_TRACE_OTLP).
+
+    Args:
+        log_path (str, optional): File JSON-lines; setiap span selesai ditambahkan satu baris.
+        otlp_endpoint (str, optional): URL collector OTLP/HTTP, mis. http://localhost:4318.
+        summary (bool, optional): Kumpulkan agregat untuk `print_summary`.
+    """
+    if log_path is not None:
+        _settings["log_path"] = log_path or None
+    if otlp_endpoint is not None:
+        _settings["otlp_endpoint"] = otlp_endpoint.rstrip("/") or None
+    if summary is not None:
+        _settings["summary"] = bool(summary)
+
+def enabled():
+    return bool(_settings["log_path"] or _settings["otlp_endpoint"] or _settings["summary"])
+
+class Span:
+    """Satu span yang sedang berjalan; atribut dan event ditambahkan lewat `set` dan `event`."""
+    def __init__(self, name, kind, parent, attributes):
+        self.name = name
+        self.kind = kind
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent else None
+        self.path = (parent.path if parent else ()) + (name,)
+        self.attributes = {key: value for key, value in attributes.items() if value is not None}
+        self.events = []
+        self.status = "ok"
+        self.error = ""
+        self.start_time = time.time()
+        self._start = time.perf_counter()
+        self.duration = 0.0
+
+    def set(self, **attributes):
+        """Menambahkan atribut (mis. token, byte, kode status); nilai None diabaikan."""
+        self.attributes.update({key: value for key, value in attributes.items() if value is not None})
+
+    def event(self, name, **attributes):
+        """Mencatat kejadian di dalam span (mis. retry) beserta waktunya."""
+        self.events.append({"name": name, "time": time.time(), "attributes": attributes})
+
+    def fail(self, error=""):
+        """Menandai span gagal tanpa exception (mis. langkah mengembalikan False)."""
+        self.status = "error"
+        self.error = str(error)
+
+    def to_dict(self):
+        return {
+            "event": "span", "trace_id": self.trace_id, "span_id": self.span_id, "parent_id": self.parent_id,
+            "name": self.name, "kind": self.kind, "start_time": self.start_time,
+            "end_time": self.start_time + self.duration, "duration_ms": round(self.duration * 1000, 3),
+            "status": self.status, "error": self.error, "attributes": self.attributes, "events": self.events,
+            "pid": os.getpid(), "thread": threading.current_thread().name,
+        }
+
+class _NoopSpan:
+    # Dipakai saat tracing tidak aktif agar pemanggil tidak perlu mengecek
+    def set(self, **attributes):
+        pass
+
+    def event(self, name, **attributes):
+        pass
+
+    def fail(self, error=""):
+        pass
+
+_NOOP = _NoopSpan()
+
+@contextmanager
+def span(name, kind="internal", **attributes):
+    """
+    Context manager yang membuka span anak dari span aktif (termasuk lintas
+    thread yang menyalin context, seperti `scheduler.run_steps`). Exception
+    menandai span gagal lalu diteruskan.
+
+    Args:
+        name (str): Nama span, mis. "3.Blog" atau "gemini gemini-2.5-flash".
+        kind (str): "run", "step", "api", "http" atau "internal".
+        **attributes: Atribut awal span.
+
+    Yields:
+        Span (atau objek no-op jika tracing tidak aktif).
+    """
+    if not enabled():
+        yield _NOOP
+        return
+    current = Span(name, kind, _current.get(), attributes)
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.fail(f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        _current.reset(token)
+        current.duration = time.perf_counter() - current._start
+        _finish(current)
+
+def current_span():
+    """Returns: span aktif, atau objek no-op jika tidak ada."""
+    return _current.get() or _NOOP
+
+def add_event(name, **attributes):
+    """Mencatat event pada span aktif (tidak melakukan apa pun jika tidak ada span)."""
+    current_span().event(name, **attributes)
+
+def _finish(finished):
+    record = finished.to_dict()
+    with _lock:
+        if _settings["log_path"]:
+            try:
+                with open(_settings["log_path"], "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+            except OSError as e:
+                print(f"⚠️ Gagal menulis log trace {_settings['log_path']}: {e}")
+        if _settings["summary"]:
+            _aggregate(finished)
+        if _settings["otlp_endpoint"]:
+            _otlp_buffer.append(record)
+            batch = _otlp_buffer[:] if len(_otlp_buffer) >= OTLP_BATCH_SIZE else None
+            if batch:
+                _otlp_buffer.clear()
+        else:
+            batch = None
+    if batch:
+        _export_otlp(batch)
+
+def _aggregate(finished):
+    attributes = finished.attributes
+    entry = _summary.setdefault(finished.path, {"count": 0, "seconds": 0.0, "errors": 0, "tokens_in": 0,
+                                                "tokens_out": 0, "bytes": 0, "retries": 0, "kind": finished.kind,
+                                                "order": len(_summary)})
+    entry["count"] += 1
+    entry["seconds"] += finished.duration
+    entry["errors"] += finished.status == "error"
+    entry["retries"] += sum(1 for item in finished.events if item["name"] == "retry")
+    entry["tokens_in"] += attributes.get("prompt_tokens", 0) or 0
+    entry["tokens_out"] += (attributes.get("output_tokens", 0) or 0) + (attributes.get("thinking_tokens", 0) or 0)
+    entry["bytes"] += (attributes.get("bytes_sent", 0) or 0) + (attributes.get("bytes_received", 0) or 0)
+
+# --- Ekspor OTLP/HTTP JSON (tanpa dependensi opentelemetry) ---
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+def _otlp_attributes(attributes):
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+def _otlp_span(record):
+    # Kind OTLP: 1 internal, 3 client (API Gemini dan WordPress)
+    data = {
+        "traceId": record["trace_id"], "spanId": record["span_id"], "name": record["name"],
+        "kind": 3 if record["kind"] in ("api", "http") else 1,
+        "startTimeUnixNano": str(int(record["start_time"] * 1e9)),
+        "endTimeUnixNano": str(int(record["end_time"] * 1e9)),
+        "attributes": _otlp_attributes({**record["attributes"], "span.kind": record["kind"]}),
+        "events": [{"name": item["name"], "timeUnixNano": str(int(item["time"] * 1e9)),
+                    "attributes": _otlp_attributes(item["attributes"])} for item in record["events"]],
+        "status": {"code": 2, "message": record["error"]} if record["status"] == "error" else {"code": 1},
+    }
+    if record["parent_id"]:
+        data["parentSpanId"] = record["parent_id"]
+    return data
+
+def _export_otlp(records):
+    global _otlp_warned
+    payload = {"resourceSpans": [{
+        "resource": {"attributes": _otlp_attributes({"service.name": SERVICE_NAME})},
+        "scopeSpans": [{"scope": {"name": "lib.tracing"}, "spans": [_otlp_span(record) for record in records]}],
+    }]}
+    request = urllib.request.Request(f"{_settings['otlp_endpoint']}/v1/traces",
+                                     data=json.dumps(payload).encode("utf-8"),
+                                     headers={"Content-Type": "application/json"}, method="POST")
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            response.read()
+    except Exception as e:
+        # Collector yang mati tidak boleh menghentikan run; cukup diperingatkan sekali
+        if not _otlp_warned:
+            _otlp_warned = True
+            print(f"⚠️ Gagal mengirim trace ke {_settings['otlp_endpoint']}: {e}")
+
+def flush():
+    """Mengirim span OTLP yang masih di buffer."""
+    with _lock:
+        batch = _otlp_buffer[:]
+        _otlp_buffer.clear()
+    if batch and _settings["otlp_endpoint"]:
+        _export_otlp(batch)
+
+atexit.register(flush)
+
+def print_summary(width=30):
+    """
+    Mencetak ringkasan flame: pohon span (digabung per jalur nama) dengan jumlah,
+    total durasi, persentase dari root dan token/byte. Langkah paralel bisa
+    berjumlah lebih dari induknya.
+    """
+    with _lock:
+        entries = sorted(_summary.items(), key=lambda item: item[1]["order"])
+    if not entries:
+        print("\n🔥 Trace: tidak ada span yang tercatat.")
+        return
+    total = sum(entry["seconds"] for path, entry in entries if len(path) == 1) or 1.0
+    ordered = []
+
+    def visit(prefix):
+        for path, entry in entries:
+            if len(path) == len(prefix) + 1 and path[:len(prefix)] == prefix:
+                ordered.append((path, entry))
+                visit(path)
+
+    visit(())
+    print(f"\n🔥 Ringkasan trace (total {total:.2f} detik):")
+    print(f"   {'Span':<44} {'n':>4} {'total':>9} {'%':>6}  {'':<{width}}  detail")
+    for path, entry in ordered:
+        label = ("  " * (len(path) - 1) + path[-1])[:44]
+        share = entry["seconds"] / total
+        bar = "█" * max(1, round(min(share, 1.0) * width))
+        details = []
+        if entry["tokens_in"] or entry["tokens_out"]:
+            details.append(f"{entry['tokens_in']} tok in / {entry['tokens_out']} out")
+        if entry["bytes"]:
+            details.append(f"{entry['bytes'] / 1024:.1f} KB" if entry["bytes"] >= 1024 else f"{entry['bytes']} B")
+        if entry["retries"]:
+            details.append(f"🔁 {entry['retries']} retry")
+        if entry["errors"]:
+            details.append(f"❌ {entry['errors']} gagal")
+        print(f"   {label:<44} {entry['count']:>4} {entry['seconds']:8.2f}s {share * 100:5.1f}%  "
+              f"{bar:<{width}}  {', '.join(details)}")
@@ -0,0 +1,339 @@
+import os
+import csv
+import queue
+import atexit
+import hashlib
+import sqlite3
+import threading
+import contextvars
+from contextlib import contextmanager
+
+# Dapatkan direktori root project (direktori parent dari lib)
+_project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_DB_PATH = os.path.join(_project_root, "usage.db")
+
+# Baris ditulis per batch oleh thread latar belakang
+BATCH_SIZE = 100
+BATCH_WAIT_SECONDS = 0.5
+
+COLUMNS = ("timestamp", "model", "step", "post_id", "prompt_tokens", "output_tokens", "cached_tokens",
+           "thinking_tokens", "images", "input_chars", "output_chars", "latency", "cost", "pricing_version", "source")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS usage (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    model TEXT NOT NULL,
+    step TEXT,
+    post_id TEXT,
+    prompt_tokens INTEGER DEFAULT 0,
+    output_tokens INTEGER DEFAULT 0,
+    cached_tokens INTEGER DEFAULT 0,
+    thinking_tokens INTEGER DEFAULT 0,
+    images INTEGER DEFAULT 0,
+    input_chars INTEGER DEFAULT 0,
+    output_chars INTEGER DEFAULT 0,
+    latency REAL,
+    cost REAL NOT NULL DEFAULT 0,
+    pricing_version TEXT,
+    source TEXT DEFAULT 'api'
+);
+CREATE INDEX IF NOT EXISTS idx_usage_timestamp ON usage(timestamp);
+CREATE INDEX IF NOT EXISTS idx_usage_model ON usage(model, timestamp);
+CREATE INDEX IF NOT EXISTS idx_usage_post ON usage(post_id);
+CREATE INDEX IF NOT EXISTS idx_usage_step ON usage(step);
+CREATE TABLE IF NOT EXISTS reservations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    day TEXT NOT NULL,
+    run_id TEXT NOT NULL,
+    model TEXT NOT NULL,
+    amount REAL NOT NULL,
+    settled INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    pid INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_reservations_day ON reservations(day);
+CREATE INDEX IF NOT EXISTS idx_reservations_run ON reservations(run_id);
+CREATE TABLE IF NOT EXISTS imports (
+    sha256 TEXT PRIMARY KEY,
+    path TEXT,
+    rows INTEGER,
+    imported_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+# Post dan langkah yang sedang berjalan; ikut tersalin ke thread langkah bersama context
+current_post = contextvars.ContextVar("usage_post", default=None)
+current_step = contextvars.ContextVar("usage_step", default=None)
+
+_db_path = os.environ.get("GEMINI_USAGE_DB") or DEFAULT_DB_PATH
+_writer = None
+_writer_lock = threading.Lock()
+_initialized = set()
+
+def configure(db_path=None):
+    """Mengatur lokasi database ledger (default: usage.db di root project, atau GEMINI_USAGE_DB)."""
+    global _db_path
+    close()
+    _db_path = db_path or os.environ.get("GEMINI_USAGE_DB") or DEFAULT_DB_PATH
+
+def db_path():
+    return _db_path
+
+def connect(path=None):
+    """Membuka koneksi SQLite dalam mode WAL dan memastikan skema tersedia."""
+    path = path or _db_path
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    # Beberapa proses (batch, worker) boleh menulis bersamaan
+    conn.execute("PRAGMA busy_timeout = 30000")
+    if path not in _initialized:
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.executescript(_SCHEMA)
+        _initialized.add(path)
+    conn.execute("PRAGMA synchronous = NORMAL")
+    return conn
+
+@contextmanager
+def context(post_id=None, step=None):
+    """Menandai semua pemakaian di dalam blok dengan post dan/atau langkah tertentu."""
+    tokens = []
+    if post_id is not None:
+        tokens.append((current_post, current_post.set(post_id)))
+    if step is not None:
+        tokens.append((current_step, current_step.set(step)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+def bind(func, step):
+    """Membungkus fungsi langkah agar pemakaian di dalamnya tercatat dengan nama langkah."""
+    def run():
+        with context(step=step):
+            return func()
+    return run
+
+class _Writer(threading.Thread):
+    """Thread latar belakang yang menyisipkan baris ke ledger per batch."""
+    def __init__(self, path):
+        super().__init__(name="usage-ledger-writer", daemon=True)
+        self.path = path
+        self.queue = queue.Queue()
+
+    def run(self):
+        conn = connect(self.path)
+        stop = False
+        while not stop:
+            batch, waiters = [], []
+            item = self.queue.get()
+            while True:
+                if item is None:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    batch.append(item)
+                if stop or len(batch) >= BATCH_SIZE:
+                    break
+                try:
+                    item = self.queue.get(timeout=BATCH_WAIT_SECONDS if not waiters else 0)
+                except queue.Empty:
+                    break
+            if batch:
+                try:
+                    with conn:
+                        conn.executemany(
+                            f"INSERT INTO usage ({', '.join(COLUMNS)}) VALUES ({', '.join('?' for _ in COLUMNS)})",
+                            [tuple(row.get(column) for column in COLUMNS) for row in batch])
+                except sqlite3.Error as e:
+                    print(f"⚠️ Gagal menulis {len(batch)} baris ke ledger pemakaian: {e}")
+            for waiter in waiters:
+                waiter.set()
+        conn.close()
+
+def _get_writer():
+    global _writer
+    with _writer_lock:
+        if _writer is None or not _writer.is_alive():
+            _writer = _Writer(_db_path)
+            _writer.start()
+        return _writer
+
+def record(**row):
+    """
+    Menambahkan satu baris pemakaian ke antrean penulisan (tidak blocking).
+    `post_id` dan `step` diambil dari context jika tidak diberikan.
+    """
+    row.setdefault("post_id", current_post.get())
+    row.setdefault("step", current_step.get())
+    row.setdefault("source", "api")
+    _get_writer().queue.put(row)
+
+def flush(timeout=10):
+    """Menunggu sampai semua baris yang sudah diantrekan tersimpan di database."""
+    with _writer_lock:
+        writer = _writer
+    if writer is None or not writer.is_alive():
+        return
+    done = threading.Event()
+    writer.queue.put(done)
+    done.wait(timeout)
+
+def close():
+    """Menyimpan sisa antrean dan menghentikan thread penulis."""
+    global _writer
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is not None and writer.is_alive():
+        writer.queue.put(None)
+        writer.join(timeout=10)
+
+atexit.register(close)
+
+# Header usage_log.csv dari versi sebelumnya (karakter saja, dan versi dengan kolom token)
+_CSV_COLUMNS = {
+    "Timestamp": "timestamp", "Model": "model", "Input Chars": "input_chars", "Output Chars": "output_chars",
+    "Images Generated": "images", "Prompt Tokens": "prompt_tokens", "Output Tokens": "output_tokens",
+    "Cached Tokens": "cached_tokens", "Thinking Tokens": "thinking_tokens", "Latency (s)": "latency",
+    "Estimated Cost ($)": "cost", "Pricing Version": "pricing_version",
+}
+_LEGACY_CSV_HEADER = "Timestamp,Model,Input Chars,Output Chars,Images Generated,Estimated Cost ($)"
+_INTEGER_COLUMNS = {"input_chars", "output_chars", "images", "prompt_tokens", "output_tokens", "cached_tokens",
+                    "thinking_tokens"}
+
+def import_csv(csv_path):
+    """
+    Mengimpor usage_log.csv ke ledger (sekali per isi file; impor ulang file yang
+    sama dilewati). Baris tanpa kolom token diberi perkiraan token dari karakter.
+
+    Returns:
+        int: Jumlah baris yang diimpor (0 jika file sudah pernah diimpor).
+    """
+    with open(csv_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    digest = hashlib.sha256(content.encode('utf-8')).hexdigest()
+    # Versi lama menulis header tanpa baris baru sebelum baris pertama
+    if content.startswith(_LEGACY_CSV_HEADER) and not content.startswith(_LEGACY_CSV_HEADER + "\n"):
+        content = _LEGACY_CSV_HEADER + "\n" + content[len(_LEGACY_CSV_HEADER):]
+
+    rows = []
+    for raw in csv.DictReader(content.splitlines()):
+        row = {"source": "csv"}
+        for header, column in _CSV_COLUMNS.items():
+            value = (raw.get(header) or "").strip()
+            if not value:
+                continue
+            try:
+                row[column] = int(float(value)) if column in _INTEGER_COLUMNS else (
+                    float(value) if column in ("latency", "cost") else value)
+            except ValueError:
+                continue
+        if not row.get("timestamp") or not row.get("model"):
+            continue
+        if not row.get("prompt_tokens") and row.get("input_chars"):
+            row["prompt_tokens"] = row["input_chars"] // 4 + 1
+        if not row.get("output_tokens") and row.get("output_chars"):
+            row["output_tokens"] = row["output_chars"] // 4 + 1
+        row.setdefault("pricing_version", "legacy-chars")
+        rows.append(row)
+
+    conn = connect()
+    try:
+        with conn:
+            if conn.execute("SELECT 1 FROM imports WHERE sha256 = ?", (digest,)).fetchone():
+                return 0
+            conn.executemany(
+                f"INSERT INTO usage ({', '.join(COLUMNS)}) VALUES ({', '.join('?' for _ in COLUMNS)})",
+                [tuple(row.get(column) for column in COLUMNS) for row in rows])
+            conn.execute("INSERT INTO imports (sha256, path, rows) VALUES (?, ?, ?)",
+                         (digest, os.path.abspath(csv_path), len(rows)))
+    finally:
+        conn.close()
+    return len(rows)
+
+_GROUPS = {
+    "day": "substr(timestamp, 1, 10)",
+    "model": "model",
+    "post": "COALESCE(post_id, '-')",
+    "step": "COALESCE(step, '-')",
+}
+
+def aggregate(by="day", since=None, until=None, model=None, post_id=None):
+    """
+    Agregasi pemakaian per hari/model/post/langkah.
+
+    Returns:
+        list: dict berisi key, calls, prompt_tokens, output_tokens, cached_tokens,
+              thinking_tokens, images, cost dan avg_latency.
+    """
+    if by not in _GROUPS:
+        raise ValueError(f"Pengelompokan tidak dikenal: {by} (pilih {', '.join(_GROUPS)})")
+    where, params = [], []
+    if since:
+        where.append("timestamp >= ?")
+        params.append(since)
+    if until:
+        # Tanggal saja berarti sampai akhir hari tersebut
+        where.append("timestamp <= ?")
+        params.append(until if len(until) > 10 else f"{until} 23:59:59")
+    if model:
+        where.append("model = ?")
+        params.append(model)
+    if post_id:
+        where.append("post_id = ?")
+        params.append(post_id)
+    flush()
+    query = f"""
+        SELECT {_GROUPS[by]} AS key, COUNT(*) AS calls,
+               SUM(prompt_tokens) AS prompt_tokens, SUM(output_tokens) AS output_tokens,
+               SUM(cached_tokens) AS cached_tokens, SUM(thinking_tokens) AS thinking_tokens,
+               SUM(images) AS images, SUM(cost) AS cost, AVG(latency) AS avg_latency
+        FROM usage {'WHERE ' + ' AND '.join(where) if where else ''}
+        GROUP BY key ORDER BY key
+    """
+    conn = connect()
+    try:
+        return [dict(row) for row in conn.execute(query, params)]
+    finally:
+        conn.close()
+
+def model_history():
+    """
+    Statistik per model (dan per langkah) untuk estimasi `--plan`.
+
+    Returns:
+        dict: {model: {"calls", "avg_output_tokens", "generation_seconds", "timed_output",
+                       "timed_calls", "latency", "steps": {step: avg_output_tokens}}}
+    """
+    flush()
+    conn = connect()
+    try:
+        history = {}
+        for row in conn.execute("""
+                SELECT model, COUNT(*) AS calls, AVG(output_tokens + thinking_tokens) AS avg_output,
+                       SUM(CASE WHEN latency > 0 THEN output_tokens + thinking_tokens ELSE 0 END) AS timed_output,
+                       SUM(CASE WHEN latency > 0 THEN latency ELSE 0 END) AS latency,
+                       SUM(CASE WHEN latency > 0 THEN 1 ELSE 0 END) AS timed_calls
+                FROM usage WHERE images = 0 GROUP BY model"""):
+            history[row["model"]] = {
+                "calls": row["calls"], "avg_output_tokens": row["avg_output"] or 0,
+                "timed_output": row["timed_output"] or 0, "latency": row["latency"] or 0.0,
+                "timed_calls": row["timed_calls"] or 0, "steps": {},
+            }
+        for row in conn.execute("""
+                SELECT model, step, AVG(output_tokens + thinking_tokens) AS avg_output
+                FROM usage WHERE step IS NOT NULL AND images = 0 GROUP BY model, step"""):
+            if row["model"] in history:
+                history[row["model"]]["steps"][row["step"]] = row["avg_output"] or 0
+        for row in conn.execute("""
+                SELECT model, AVG(latency) AS latency FROM usage
+                WHERE images > 0 AND latency > 0 GROUP BY model"""):
+            history.setdefault(row["model"], {"calls": 0, "avg_output_tokens": 0, "timed_output": 0, "latency": 0.0,
+                                              "timed_calls": 0, "steps": {}})["image_latency"] = row["latency"]
+        return history
+    finally:
+        conn.close()
@@ -1,53 +1,167 @@
 import os
 import re
+import threading
+import contextvars
+from contextlib import contextmanager
+from dataclasses import dataclass
 from datetime import datetime
+from . import model_registry, usage_ledger
 
-# Data harga berdasarkan dokumentasi resmi Google AI.
-# Ini digunakan untuk membuat estimasi biaya dan mencatatnya.
-MODEL_PRICING = {
-    "gemini-1.5-pro": {
-        "input_per_1k_chars": 0.0035, "output_per_1k_chars": 0.0105, "image_cost": 0.0180
-    },
-    "gemini-1.5-flash": {
-        "input_per_1k_chars": 0.00035, "output_per_1k_chars": 0.00105, "image_cost": 0.0
-    },
-    "gemini-1.0-pro": {
-        "input_per_1k_chars": 0.0005, "output_per_1k_chars": 0.0015, "image_cost": 0.0
-    },
-    # Model default jika tidak ditemukan
-    "default": {
-        "input_per_1k_chars": 0.0035, "output_per_1k_chars": 0.0105, "image_cost": 0.0180
-    }
-}
-
-def get_pricing(model_name):
-    """Mencari data harga untuk model tertentu, atau mengembalikan harga default."""
-    for key, value in MODEL_PRICING.items():
-        if key in model_name:
-            return value
-    return MODEL_PRICING["default"]
-
-def log_usage_and_cost(model_name, input_chars=0, output_chars=0, images_generated=0):
-    """Mencatat penggunaan API dan estimasi biaya ke file CSV."""
-    log_file = 'usage_log.csv'
-    
-    pricing = get_pricing(model_name)
-    input_cost = (input_chars / 1000) * pricing['input_per_1k_chars']
-    output_cost = (output_chars / 1000) * pricing['output_per_1k_chars']
-    image_cost = images_generated * pricing.get('image_cost', 0.0)
-    total_cost = input_cost + output_cost + image_cost
-
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    log_entry = f"{timestamp},{model_name},{input_chars},{output_chars},{images_generated},{total_cost:.6f}\n"
-
-    # Buat header jika file belum ada
-    if not os.path.exists(log_file):
-        with open(log_file, 'w', encoding='utf-8') as f:
-            f.write("Timestamp,Model,Input Chars,Output Chars,Images Generated,Estimated Cost ($)\n")
-
-    with open(log_file, 'a', encoding='utf-8') as f:
-        f.write(log_entry)
-    print(f"📝 Penggunaan dicatat. Estimasi biaya untuk panggilan ini: ${total_cost:.6f}")
+# Langkah alur kerja bisa berjalan paralel, jadi akumulator biaya harus diserialisasi
+_log_lock = threading.Lock()
+
+# Akumulator biaya untuk run yang sedang berjalan (lihat `track_usage`)
+_usage_tally = contextvars.ContextVar("usage_tally", default=None)
+
+@contextmanager
+def track_usage():
+    """
+    Mengakumulasi jumlah panggilan dan biaya dari semua `log_usage_and_cost`
+    di dalam blok ini, termasuk dari thread langkah yang menyalin context-nya.
+
+    Yields:
+        dict: {"calls": int, "cost": float}
+    """
+    tally = {"calls": 0, "cost": 0.0}
+    token = _usage_tally.set(tally)
+    try:
+        yield tally
+    finally:
+        _usage_tally.reset(token)
+
+@dataclass
+class Usage:
+    """
+    Pemakaian satu panggilan API, diambil dari `usage_metadata` respon.
+
+    `prompt_tokens` sudah termasuk `cached_tokens`; `thinking_tokens` ditagih
+    sebagai output. `from_cache` berarti respon berasal dari cache lokal (gratis).
+    `model` diisi jika panggilan memakai model lain dari yang diminta (downgrade anggaran).
+    """
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+    cached_tokens: int = 0
+    thinking_tokens: int = 0
+    latency: float = 0.0
+    input_chars: int = 0
+    output_chars: int = 0
+    from_cache: bool = False
+    model: str = ""
+
+    @classmethod
+    def from_response(cls, response, latency=0.0, input_text="", output_text=""):
+        """
+        Membuat `Usage` dari respon Gemini (google.generativeai maupun google.genai).
+        Jika respon tidak membawa metadata, token diperkirakan dari jumlah karakter.
+        """
+        metadata = getattr(response, "usage_metadata", None)
+        usage = cls(
+            prompt_tokens=getattr(metadata, "prompt_token_count", 0) or 0,
+            output_tokens=getattr(metadata, "candidates_token_count", 0) or 0,
+            cached_tokens=getattr(metadata, "cached_content_token_count", 0) or 0,
+            thinking_tokens=getattr(metadata, "thoughts_token_count", 0) or 0,
+            latency=latency,
+            input_chars=len(input_text or ""),
+            output_chars=len(output_text or ""),
+        )
+        if not usage.prompt_tokens and input_text:
+            usage.prompt_tokens = estimate_tokens(input_text)
+        if not usage.output_tokens and output_text:
+            usage.output_tokens = estimate_tokens(output_text)
+        return usage
+
+def estimate_tokens(text):
+    """Perkiraan kasar jumlah token (sekitar 4 karakter per token) tanpa memanggil API."""
+    return len(text or "") // 4 + 1
+
+def estimate_cost(model_name, usage=None, images_generated=0):
+    """
+    Menghitung biaya (USD) dari pemakaian token dengan tarif per token di registry model.
+
+    Args:
+        model_name (str): Nama model.
+        usage (Usage, optional): Pemakaian token panggilan.
+        images_generated (int): Jumlah gambar; untuk model gambar token output
+            sudah tercakup dalam harga per gambar.
+
+    Returns:
+        float: Estimasi biaya.
+    """
+    usage = usage or Usage()
+    if usage.from_cache:
+        return 0.0
+    pricing = model_registry.lookup(model_name).pricing
+    long_context = usage.prompt_tokens > pricing.get("long_context_threshold", float("inf"))
+    suffix = "_long" if long_context else ""
+    input_rate = pricing.get(f"input{suffix}", pricing["input"])
+    output_rate = pricing.get(f"output{suffix}", pricing["output"])
+    cached_rate = pricing.get(f"cached_input{suffix}", pricing.get("cached_input", input_rate))
+
+    cached = min(usage.cached_tokens, usage.prompt_tokens)
+    cost = ((usage.prompt_tokens - cached) * input_rate + cached * cached_rate) / 1_000_000
+    if images_generated:
+        cost += images_generated * pricing.get("per_image", model_registry.FALLBACK_ENTRY["per_image"])
+    else:
+        cost += (usage.output_tokens + usage.thinking_tokens) * output_rate / 1_000_000
+    return cost
+
+def log_usage_and_cost(model_name, input_chars=0, output_chars=0, images_generated=0, usage=None):
+    """
+    Mencatat penggunaan API dan estimasi biaya ke ledger SQLite (usage.db). Mengembalikan estimasi biaya.
+
+    Args:
+        model_name (str): Nama model.
+        input_chars, output_chars (int): Dipakai untuk memperkirakan token jika `usage` tidak ada.
+        images_generated (int): Jumlah gambar yang dibuat.
+        usage (Usage, optional): Pemakaian token dari respon API.
+    """
+    if usage is None:
+        usage = Usage(prompt_tokens=input_chars // 4 + 1 if input_chars else 0,
+                      output_tokens=output_chars // 4 + 1 if output_chars else 0,
+                      input_chars=input_chars, output_chars=output_chars)
+    if usage.from_cache or not (usage.prompt_tokens or usage.output_tokens or images_generated):
+        # Respon dari cache lokal tidak memakai kuota API
+        print("📝 Tidak ada penggunaan API baru (respon dari cache), tidak dicatat.")
+        return 0.0
+    model_name = usage.model or model_name
+
+    total_cost = estimate_cost(model_name, usage, images_generated)
+    pricing_version = model_registry.load().version
+
+    # Ditulis per batch oleh thread latar belakang (lihat lib/usage_ledger.py)
+    usage_ledger.record(
+        timestamp=datetime.now().strftime('%Y-%m-%d %H:%M:%S'), model=model_name,
+        prompt_tokens=usage.prompt_tokens, output_tokens=usage.output_tokens, cached_tokens=usage.cached_tokens,
+        thinking_tokens=usage.thinking_tokens, images=images_generated, input_chars=usage.input_chars,
+        output_chars=usage.output_chars, latency=round(usage.latency, 2), cost=total_cost,
+        pricing_version=pricing_version)
+
+    with _log_lock:
+        tally = _usage_tally.get()
+        if tally is not None:
+            tally["calls"] += 1
+            tally["cost"] += total_cost
+    cached_note = f" ({usage.cached_tokens} dari cache)" if usage.cached_tokens else ""
+    thinking_note = f" + {usage.thinking_tokens} thinking" if usage.thinking_tokens else ""
+    print(f"📝 Penggunaan dicatat: {usage.prompt_tokens} token input{cached_note}, "
+          f"{usage.output_tokens} token output{thinking_note}. Estimasi biaya untuk panggilan ini: ${total_cost:.6f}")
+    return total_cost
+
+def write_text_atomic(path, content, tmp_path=None):
+    """
+    Menulis file teks secara atomik: isi ditulis ke file sementara lalu
+    di-rename, sehingga pembaca tidak pernah melihat file yang setengah jadi.
+
+    Args:
+        path (str): Path file tujuan.
+        content (str): Isi file.
+        tmp_path (str, optional): Path file sementara (default: `<path>.tmp`).
+            Dipakai juga untuk memfinalisasi file `.partial` hasil streaming.
+    """
+    tmp_path = tmp_path or f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
 
 def sanitize_filename(text, extension):
     """
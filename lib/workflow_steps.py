@@ -1,15 +1,69 @@
 import os
+import re
 import sys
-from . import gemini_api, image_processing, utils
-import google.generativeai as genai
+import time
+from . import gemini_api, image_processing, markdown_html, seo_structured, utils
 
 # Dapatkan direktori root project (direktori parent dari lib)
 _current_dir = os.path.dirname(os.path.abspath(__file__))
 _project_root = os.path.dirname(_current_dir)
 PROMPT_DIR = os.path.join(_project_root, "prompt")
 
-def generate_draft_tutorial(input_path, blog_prompt_path, base_name, output_md_path, model_config):
-    """Langkah 1: Membuat draf tutorial dari file input."""
+# Judul bagian yang ditambahkan Langkah 4 ke file .seo.md
+SEO_METADATA_HEADER = "## SEO Metadata Lanjutan"
+
+def seo_keyphrase_section(seo_content):
+    """Mengembalikan bagian file .seo.md hasil Langkah 2 (sebelum metadata dari Langkah 4)."""
+    section = seo_content.split(SEO_METADATA_HEADER, 1)[0]
+    # Buang pemisah '---' yang ditulis Langkah 4 sebelum judul bagian metadata
+    return re.sub(r'\s*(---\s*)?$', '', section)
+
+def transcript_context_text(base_name, input_content):
+    """Teks transkrip yang diunggah sebagai context cache dan dipakai Langkah 1 dan 3."""
+    return f"CONTEXT FROM ORIGINAL TRANSCRIPT (`{base_name}`):\n\n{input_content}"
+
+def partial_path(output_path):
+    """Path file sementara tempat respon streaming ditulis sebelum difinalisasi."""
+    return f"{output_path}.partial"
+
+def _call_with_transcript(build_prompt, model_name, transcript_cache, stream_to=None):
+    """
+    Memanggil Gemini dengan transkrip dari context cache jika tersedia, dan
+    jatuh kembali ke transkrip inline hanya jika cache tidak bisa dipakai
+    (tidak didukung, terlalu pendek, kedaluwarsa atau tidak ditemukan). Error
+    API lain (yang sudah di-retry) tidak diulang dengan prompt inline.
+
+    Args:
+        build_prompt (callable): build_prompt(inline) -> prompt; inline=False berarti
+                                 transkrip dirujuk dari context cache.
+        stream_to (str, optional): File `.partial` untuk mode streaming. Jika
+                                   percobaan dengan cache meninggalkan respon
+                                   parsial, fallback di-stream ke file terpisah.
+    """
+    if transcript_cache is None:
+        return gemini_api.call_gemini(build_prompt(True), model_name, stream_to=stream_to)
+
+    result = gemini_api.call_gemini(build_prompt(False), model_name, context=transcript_cache, stream_to=stream_to)
+    if result[0] or not transcript_cache.unavailable(model_name):
+        return result
+    print("ℹ️  Memakai transkrip inline untuk langkah ini.")
+    if not (stream_to and os.path.exists(stream_to)):
+        return gemini_api.call_gemini(build_prompt(True), model_name, stream_to=stream_to)
+
+    # Respon parsial dari percobaan dengan cache dipertahankan sampai fallback berhasil
+    fallback_path = f"{stream_to}.inline"
+    result = gemini_api.call_gemini(build_prompt(True), model_name, stream_to=fallback_path)
+    if result[0] and os.path.exists(fallback_path):
+        os.replace(fallback_path, stream_to)
+    return result
+
+def generate_draft_tutorial(input_path, blog_prompt_path, base_name, output_md_path, model_config, transcript_cache=None,
+                            stream=False):
+    """
+    Langkah 1: Membuat draf tutorial dari file input.
+    Jika `transcript_cache` diberikan, transkrip dirujuk dari context cache Gemini.
+    Dengan `stream=True` respon ditulis bertahap ke `<output>.partial`.
+    """
     print("\n--- LANGKAH 1: Membuat Draf Tutorial ---")
     try:
         with open(input_path, 'r', encoding='utf-8') as f:
@@ -17,15 +71,19 @@ def generate_draft_tutorial(input_path, blog_prompt_path, base_name, output_md_p
         with open(blog_prompt_path, 'r', encoding='utf-8') as f:
             blog_prompt_content = f.read()
 
-        final_blog_prompt = f"{blog_prompt_content}\n\n---\n\nKonteks dari file `{base_name}`:\n\n{input_content}"
+        def build_prompt(inline):
+            if inline:
+                return f"{blog_prompt_content}\n\n---\n\nKonteks dari file `{base_name}`:\n\n{input_content}"
+            return (f"{blog_prompt_content}\n\n---\n\nKonteks dari file `{base_name}` adalah "
+                    f"CONTEXT FROM ORIGINAL TRANSCRIPT pada konteks yang sudah diberikan.")
         model_name = model_config.get('model_tutorial', 'gemini-1.5-flash-latest')
         
-        blog_content, in_chars, out_chars = gemini_api.call_gemini(final_blog_prompt, model_name)
+        stream_to = partial_path(output_md_path) if stream else None
+        blog_content, usage = _call_with_transcript(build_prompt, model_name, transcript_cache, stream_to)
 
         if blog_content:
-            utils.log_usage_and_cost(model_name, input_chars=in_chars, output_chars=out_chars)
-            with open(output_md_path, 'w', encoding='utf-8') as f:
-                f.write(blog_content)
+            utils.log_usage_and_cost(model_name, usage=usage)
+            utils.write_text_atomic(output_md_path, blog_content, tmp_path=stream_to)
             print(f"✅ Draf berhasil dibuat dan disimpan di: {output_md_path}")
             return True
         else:
@@ -52,10 +110,10 @@ def get_seo_keyphrases(output_md_path, output_seo_path, youtube_link, model_conf
         final_seo_prompt = f"{keyphrase_prompt_content}\n\n---\n\nKonteks dari file `{os.path.basename(output_md_path)}`:\n\n{blog_content}"
         model_name = model_config.get('model_seo', 'gemini-1.5-flash-latest')
         
-        seo_content, in_chars, out_chars = gemini_api.call_gemini(final_seo_prompt, model_name)
+        seo_content, usage = gemini_api.call_gemini(final_seo_prompt, model_name)
 
         if seo_content:
-            utils.log_usage_and_cost(model_name, input_chars=in_chars, output_chars=out_chars)
+            utils.log_usage_and_cost(model_name, usage=usage)
             content_to_write = seo_content
             if youtube_link:
                 content_to_write = f"**Sumber Video:** {youtube_link}\n\n---\n\n{seo_content}"
@@ -70,8 +128,60 @@ def get_seo_keyphrases(output_md_path, output_seo_path, youtube_link, model_conf
         print(f"❌ Error file tidak ditemukan di Langkah 2: {e}")
         return False
 
-def create_final_blog(selected_keyphrase, input_path, output_md_path, output_blog_path, base_name, youtube_link, model_config):
-    """Langkah 3: Membuat konten blog final berdasarkan keyphrase."""
+def get_seo_structured(output_md_path, output_seo_path, output_plan_path, youtube_link, model_config):
+    """
+    Langkah 2 (mode structured): satu panggilan Gemini dengan skema JSON yang
+    menghasilkan keyphrase berskor sekaligus metadata SEO untuk setiap keyphrase.
+    Daftar keyphrase ditulis ke .seo.md dengan format yang sama seperti mode biasa,
+    dan seluruh hasil disimpan ke `output_plan_path` untuk Langkah 4.
+    """
+    print("\n--- LANGKAH 2: Mendapatkan Keyphrase dan Metadata SEO (structured output) ---")
+    if not os.path.exists(output_md_path):
+        print(f"❌ Error: File draf '{output_md_path}' tidak ditemukan. Jalankan langkah 1 terlebih dahulu.")
+        return False
+
+    try:
+        prompt_path = os.path.join(PROMPT_DIR, "prompt_seo_structured.md")
+        with open(output_md_path, 'r', encoding='utf-8') as f:
+            blog_content = f.read()
+        with open(prompt_path, 'r', encoding='utf-8') as f:
+            prompt_content = f.read()
+
+        final_prompt = f"{prompt_content}\n\n---\n\nKonteks dari file `{os.path.basename(output_md_path)}`:\n\n{blog_content}"
+        model_name = model_config.get('model_seo', 'gemini-1.5-flash-latest')
+
+        response, usage = gemini_api.call_gemini(final_prompt, model_name,
+                                                 generation_config=seo_structured.GENERATION_CONFIG)
+        if not response:
+            print("❌ Gagal mendapatkan keyphrase SEO, proses dihentikan.")
+            return False
+        utils.log_usage_and_cost(model_name, usage=usage)
+
+        try:
+            plan = seo_structured.SeoPlan.from_json(response)
+        except ValueError as e:
+            print(f"❌ Respon structured output tidak valid: {e}")
+            return False
+
+        content_to_write = plan.keyphrase_markdown() + "\n"
+        if youtube_link:
+            content_to_write = f"**Sumber Video:** {youtube_link}\n\n---\n\n{content_to_write}"
+        plan.save(output_plan_path)
+        utils.write_text_atomic(output_seo_path, content_to_write)
+        print(f"✅ {len(plan.keyphrases)} keyphrase dan metadata SEO berhasil dibuat dan disimpan di: {output_seo_path}")
+        return True
+    except FileNotFoundError as e:
+        print(f"❌ Error file tidak ditemukan di Langkah 2: {e}")
+        return False
+
+def create_final_blog(selected_keyphrase, input_path, output_md_path, output_blog_path, base_name, youtube_link, model_config,
+                      transcript_cache=None, stream=False):
+    """
+    Langkah 3: Membuat konten blog final berdasarkan keyphrase.
+    Jika `transcript_cache` diberikan, transkrip dirujuk dari context cache Gemini.
+    Dengan `stream=True` respon ditulis bertahap ke `<output>.partial`; file
+    final baru muncul (lewat rename atomik) setelah respon lengkap.
+    """
     print("\n--- LANGKAH 3: Membuat Blog Final ---")
     if not selected_keyphrase:
         print("❌ Error: Langkah 3 memerlukan keyphrase. Jalankan langkah 2 terlebih dahulu.")
@@ -91,17 +201,24 @@ def create_final_blog(selected_keyphrase, input_path, output_md_path, output_blo
             create_blog_prompt_content = f.read()
         
         injected_create_blog_prompt = create_blog_prompt_content.format(selected_keyphrase)
-        final_blog_post_prompt = (
-            f"{injected_create_blog_prompt}\n\n---\n\n"
-            f"CONTEXT FROM ORIGINAL TRANSCRIPT (`{base_name}`):\n\n{input_content}\n\n"
-            f"---\n\n"
-            f"CONTEXT FROM DRAFT POST (`{os.path.basename(output_md_path)}`):\n\n{blog_content}"
-        )
+        def build_prompt(inline):
+            transcript_part = (
+                f"{transcript_context_text(base_name, input_content)}\n\n"
+                if inline else
+                f"CONTEXT FROM ORIGINAL TRANSCRIPT (`{base_name}`): see the cached context provided.\n\n"
+            )
+            return (
+                f"{injected_create_blog_prompt}\n\n---\n\n"
+                f"{transcript_part}"
+                f"---\n\n"
+                f"CONTEXT FROM DRAFT POST (`{os.path.basename(output_md_path)}`):\n\n{blog_content}"
+            )
         model_name = model_config.get('model_blog', 'gemini-1.5-pro-latest')
-        final_blog_post_content, in_chars, out_chars = gemini_api.call_gemini(final_blog_post_prompt, model_name)
+        stream_to = partial_path(output_blog_path) if stream else None
+        final_blog_post_content, usage = _call_with_transcript(build_prompt, model_name, transcript_cache, stream_to)
 
         if final_blog_post_content:
-            utils.log_usage_and_cost(model_name, input_chars=in_chars, output_chars=out_chars)
+            utils.log_usage_and_cost(model_name, usage=usage)
             content_to_write = final_blog_post_content
             if youtube_link:
                 lines = content_to_write.split('\n', 1)
@@ -109,8 +226,7 @@ def create_final_blog(selected_keyphrase, input_path, output_md_path, output_blo
                 body = lines[1] if len(lines) > 1 else ''
                 link_markdown = f"\n_Tonton video tutorial asli di YouTube_\n"
                 content_to_write = f"{title}\n{link_markdown}\n{body}"
-            with open(output_blog_path, 'w', encoding='utf-8') as f:
-                f.write(content_to_write)
+            utils.write_text_atomic(output_blog_path, content_to_write, tmp_path=stream_to)
             print(f"✅ Blog post final berhasil dibuat dan disimpan di: {output_blog_path}")
             return True
         else:
@@ -137,13 +253,19 @@ def update_seo_with_metadata(output_blog_path, output_seo_path, model_config):
 
         final_seo_meta_prompt = f"{seo_meta_prompt_content}\n\n---\n\nKonteks dari file `{os.path.basename(output_blog_path)}`:\n\n{final_blog_post_content}"
         model_name = model_config.get('model_seo', 'gemini-1.5-pro-latest')
-        seo_meta_content, in_chars, out_chars = gemini_api.call_gemini(final_seo_meta_prompt, model_name)
+        seo_meta_content, usage = gemini_api.call_gemini(final_seo_meta_prompt, model_name)
 
         if seo_meta_content:
-            utils.log_usage_and_cost(model_name, input_chars=in_chars, output_chars=out_chars)
-            with open(output_seo_path, 'a', encoding='utf-8') as f:
-                f.write("\n\n---\n\n## SEO Metadata Lanjutan\n\n")
-                f.write(seo_meta_content)
+            utils.log_usage_and_cost(model_name, usage=usage)
+            # Ganti blok metadata lama (jika Langkah 4 dijalankan ulang) agar tidak ada blok ganda
+            seo_content = ""
+            if os.path.exists(output_seo_path):
+                with open(output_seo_path, 'r', encoding='utf-8') as f:
+                    seo_content = seo_keyphrase_section(f.read())
+            utils.write_text_atomic(
+                output_seo_path,
+                f"{seo_content}\n\n---\n\n{SEO_METADATA_HEADER}\n\n{seo_meta_content}"
+            )
             print(f"✅ Metadata SEO lanjutan berhasil ditambahkan ke: {output_seo_path}")
             return True
         else:
@@ -153,8 +275,38 @@ def update_seo_with_metadata(output_blog_path, output_seo_path, model_config):
         print(f"❌ Error file tidak ditemukan di Langkah 4: {e}")
         return False
 
-def generate_blog_image(selected_keyphrase, dir_name, model_config, api_key):
-    """Langkah 5: Membuat gambar untuk blog."""
+def update_seo_from_plan(output_plan_path, output_seo_path, selected_keyphrase):
+    """
+    Langkah 4 (mode structured): menambahkan metadata SEO untuk keyphrase terpilih
+    dari hasil structured output Langkah 2, tanpa memanggil API.
+    """
+    print("\n--- LANGKAH 4: Memperbarui SEO dengan Metadata (dari structured output) ---")
+    try:
+        plan = seo_structured.SeoPlan.load(output_plan_path)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"❌ Error: Hasil structured output '{output_plan_path}' tidak bisa dibaca: {e}. Jalankan langkah 2 terlebih dahulu.")
+        return False
+
+    item = plan.find(selected_keyphrase)
+    if item is None:
+        print(f"❌ Keyphrase \"{selected_keyphrase}\" tidak ada di hasil structured output.")
+        return False
+
+    with open(output_seo_path, 'r', encoding='utf-8') as f:
+        seo_content = seo_keyphrase_section(f.read())
+    utils.write_text_atomic(
+        output_seo_path,
+        f"{seo_content}\n\n---\n\n{SEO_METADATA_HEADER}\n\n{seo_structured.metadata_markdown(item)}"
+    )
+    print(f"✅ Metadata SEO untuk \"{item.keyphrase}\" berhasil ditambahkan ke: {output_seo_path}")
+    return True
+
+def generate_blog_image(selected_keyphrase, dir_name, model_config, api_key, optimize=True):
+    """
+    Langkah 5: Membuat gambar untuk blog.
+    Dengan `optimize=False` gambar disimpan tanpa dikompres (mis. pipeline playlist
+    mengompresnya di tahap tersendiri).
+    """
     print("\n--- LANGKAH 5: Membuat Gambar ---")
     if not selected_keyphrase:
         print("⚠️ Keyphrase belum dipilih atau ditentukan.")
@@ -180,10 +332,10 @@ def generate_blog_image(selected_keyphrase, dir_name, model_config, api_key):
         image_model = model_config.get('model_image', 'gemini-1.5-pro-latest')
         print(f"ℹ️  Menggunakan keyphrase '{selected_keyphrase}' dan model '{image_model}' untuk pembuatan gambar.")
         
-        generated_image = gemini_api.generate_image(final_image_prompt, model_name=image_model, api_key=api_key)
+        generated_image, usage = gemini_api.generate_image(final_image_prompt, model_name=image_model, api_key=api_key)
 
         if generated_image:
-            utils.log_usage_and_cost(image_model, input_chars=len(final_image_prompt), images_generated=1)
+            utils.log_usage_and_cost(image_model, images_generated=1, usage=usage)
             
             image_filename = utils.sanitize_filename(selected_keyphrase, 'jpg')
             image_path = os.path.join(dir_name, image_filename)
@@ -194,7 +346,8 @@ def generate_blog_image(selected_keyphrase, dir_name, model_config, api_key):
 
             generated_image.save(image_path, 'JPEG', quality=95)
             print(f"✅ Gambar berhasil dibuat dan disimpan di: {image_path}")
-            image_processing.resize_image(image_path, target_kb=100)
+            if optimize:
+                image_processing.resize_image(image_path, target_kb=100)
             return True
         else:
             print("❌ Gagal membuat gambar.")
@@ -203,16 +356,22 @@ def generate_blog_image(selected_keyphrase, dir_name, model_config, api_key):
         print(f"❌ Error file tidak ditemukan di Langkah 5: {e}")
         return False
 
-def convert_md_to_html(blog_md_path, output_dir, prompt_path, model_name, api_key):
+def convert_md_to_html(blog_md_path, output_dir, prompt_path, model_name, api_key, youtube_link=None, use_llm=False):
     """
-    Mengubah file Markdown blog menjadi file HTML menggunakan Gemini API.
+    Mengubah file Markdown blog menjadi file HTML.
+
+    Secara default memakai renderer lokal (`markdown_html`) yang deterministik
+    dan tidak memanggil API. Dengan `use_llm=True` konversi dilakukan oleh Gemini
+    memakai `prompt_path`.
 
     Args:
         blog_md_path (str): Path ke file .blog.md.
         output_dir (str): Direktori untuk menyimpan file .html.
-        prompt_path (str): Path ke file prompt konversi.
-        model_name (str): Nama model Gemini yang akan digunakan.
+        prompt_path (str): Path ke file prompt konversi (hanya untuk mode LLM).
+        model_name (str): Nama model Gemini yang akan digunakan (hanya untuk mode LLM).
         api_key (str): Google API Key Anda.
+        youtube_link (str, optional): URL video yang di-embed setelah judul (renderer lokal).
+        use_llm (bool): Gunakan Gemini alih-alih renderer lokal.
     """
     if not os.path.exists(blog_md_path):
         print(f"❌ Error: File blog Markdown tidak ditemukan di {blog_md_path}")
@@ -221,13 +380,24 @@ def convert_md_to_html(blog_md_path, output_dir, prompt_path, model_name, api_ke
     print("🚀 Langkah 6: Mengubah Markdown menjadi HTML...")
 
     try:
-        # Konfigurasi API
-        genai.configure(api_key=api_key)
-
         # Baca konten markdown
         with open(blog_md_path, 'r', encoding='utf-8') as f:
             markdown_content = f.read()
 
+        base_name = os.path.splitext(os.path.basename(blog_md_path))[0].replace('.blog', '')
+        html_file_path = os.path.join(output_dir, f"{base_name}.html")
+
+        if not use_llm:
+            start = time.perf_counter()
+            html_content = markdown_html.render_blog_post(markdown_content, youtube_link)
+            utils.write_text_atomic(html_file_path, html_content)
+            print(f"✅ Berhasil membuat file HTML dengan renderer lokal "
+                  f"({(time.perf_counter() - start) * 1000:.0f} ms): {html_file_path}")
+            return True
+
+        # Konfigurasi API
+        gemini_api.configure(api_key)
+
         # Baca prompt
         with open(prompt_path, 'r', encoding='utf-8') as f:
             prompt_text = f.read()
@@ -235,21 +405,18 @@ def convert_md_to_html(blog_md_path, output_dir, prompt_path, model_name, api_ke
         # Gabungkan prompt dan konten sebagai konteks
         full_prompt = f"{prompt_text}\n\n{markdown_content}"
         
-        # Panggil Gemini API
-        model = genai.GenerativeModel(model_name)
-        response = model.generate_content(full_prompt)
-        html_content = response.text
+        # Panggil Gemini API (melalui cache respon)
+        html_content, usage = gemini_api.call_gemini(full_prompt, model_name)
+        if not html_content:
+            return False
+        utils.log_usage_and_cost(model_name, usage=usage)
 
         # Simpan file HTML
-        base_name = os.path.splitext(os.path.basename(blog_md_path))[0].replace('.blog', '')
-        html_file_path = os.path.join(output_dir, f"{base_name}.html")
-        
         with open(html_file_path, 'w', encoding='utf-8') as f:
             f.write(html_content)
             
         print(f"✅ Berhasil membuat file HTML: {html_file_path}")
-        # Anda bisa menambahkan tracking biaya di sini jika perlu
         return True
     except Exception as e:
         print(f"❌ Terjadi kesalahan saat konversi HTML: {e}")
-        return False
\ No newline at end of file
+        return False
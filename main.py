@@ -4,11 +4,21 @@ import os
 import sys
 import re
 import json
-import google.generativeai as genai
+import glob
+import time
+import atexit
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
 # Impor modul dari direktori lib
-from lib import workflow_steps, utils
+from lib import workflow_steps, utils, gemini_api, response_cache, scheduler, manifest, rate_limit, retry, markdown_html, seo_metadata, planner, usage_ledger, budget, model_registry, post_index, job_queue, tracing
+
+# Model teks yang boleh saling menggantikan saat anggaran hampir habis
+TEXT_MODEL_KEYS = ("model_tutorial", "model_seo", "model_blog", "model_html", "model_seo_json")
+
+class WorkflowError(Exception):
+    """Dilempar oleh `run_workflow` jika alur kerja tidak bisa dilanjutkan."""
 
 def clean_html_code_blocks(html_file_path):
     """
@@ -44,7 +54,9 @@ def clean_html_code_blocks(html_file_path):
 
 def generate_seo_json(seo_md_path, output_dir, model_config):
     """
-    Membuat file seo.json berdasarkan file *.seo.md menggunakan prompt_seo_json.md
+    Membuat file seo.json berdasarkan file *.seo.md. Field diambil langsung dari
+    file dengan parser lokal; model (prompt_seo_json.md) hanya dipakai jika
+    parsing gagal.
     """
     # Dapatkan direktori script
     script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -61,17 +73,26 @@ def generate_seo_json(seo_md_path, output_dir, model_config):
             seo_content = f.read()
         
         print(f"📝 Membuat seo.json dari {os.path.basename(seo_md_path)}")
+
+        seo_data = seo_metadata.build_seo_json(seo_content, workflow_steps.SEO_METADATA_HEADER)
+        if seo_data:
+            for warning in seo_metadata.check_lengths(seo_data):
+                print(f"⚠️ {warning}")
+            utils.write_text_atomic(output_json_path, json.dumps(seo_data, indent=2, ensure_ascii=False) + "\n")
+            print(f"✅ File seo.json berhasil dibuat dengan parser lokal di {output_json_path}")
+            return True
+        print("ℹ️  Field SEO tidak lengkap untuk parser lokal, memakai model untuk membuat seo.json.")
         
         # Gabungkan prompt dengan konten SEO
         full_prompt = f"{prompt_content}\n\n__INPUT_DATA__\n{seo_content}"
         
-        # Inisialisasi model
+        # Generate JSON (melalui cache respon)
         model_name = model_config.get("model_seo_json", "gemini-1.5-flash")
-        model = genai.GenerativeModel(model_name)
-        
-        # Generate JSON
-        response = model.generate_content(full_prompt)
-        json_response = response.text.strip()
+        json_response, usage = gemini_api.call_gemini(full_prompt, model_name)
+        if not json_response:
+            return False
+        utils.log_usage_and_cost(model_name, usage=usage)
+        json_response = json_response.strip()
         
         # Clean JSON response (hapus code blocks jika ada)
         if json_response.startswith('```json'):
@@ -102,11 +123,34 @@ def generate_seo_json(seo_md_path, output_dir, model_config):
         print(f"❌ Error membuat seo.json: {e}")
         return False
 
-def run_workflow(input_path, blog_prompt_path, model_config_path, steps_to_run, seo_keyphrase_choice=None):
+def run_workflow(input_path, blog_prompt_path, model_config_path, steps_to_run, seo_keyphrase_choice=None,
+                 use_cache=True, refresh_cache=False, max_concurrency=gemini_api.DEFAULT_MAX_CONCURRENCY,
+                 force=False, context_cache=False, stream=False, llm_html=False, structured_seo=False,
+                 preflight=False, daily_budget=None, run_budget=None, optimize_images=True, on_step_done=None):
     """
     Mengorkestrasi alur kerja pembuatan blog dengan memanggil fungsi dari modul.
+    Langkah yang input-nya tidak berubah sejak run terakhir dilewati kecuali `force=True`.
+    Dengan `context_cache=True` transkrip diunggah sekali sebagai cached content Gemini.
+    Dengan `stream=True` Langkah 1 dan 3 menulis respon secara bertahap ke file `.partial`.
+    Langkah 6 memakai renderer Markdown lokal, kecuali `llm_html=True`.
+    Dengan `structured_seo=True` Langkah 2 memakai satu panggilan structured output
+    untuk keyphrase dan metadata SEO, sehingga Langkah 4 dan 7 tidak memanggil API.
+    `daily_budget`/`run_budget` (USD) menimpa bagian "budget" di konfigurasi model;
+    panggilan yang akan melampaui batas memakai model yang lebih murah atau ditolak.
+    Dengan `optimize_images=False` gambar Langkah 5 tidak dikompres di sini.
+    `on_step_done(step_id, status, seconds)` dipanggil setiap langkah selesai
+    (dipakai worker.py untuk checkpoint per langkah).
+
+    Returns:
+        dict: {"output_dir": str, "steps": hasil `scheduler.run_steps`}
+
+    Raises:
+        WorkflowError: Jika konfigurasi tidak valid atau langkah wajib (1-3) gagal.
     """
     print(f"🚀 Memulai alur kerja untuk '{input_path}' dengan langkah: {steps_to_run}")
+    response_cache.configure(enabled=use_cache, refresh=refresh_cache)
+    gemini_api.set_max_concurrency(max_concurrency)
+    gemini_api.set_preflight(preflight)
 
     # Langkah 0: Konfigurasi awal dan validasi path
     load_dotenv()
@@ -120,13 +164,25 @@ def run_workflow(input_path, blog_prompt_path, model_config_path, steps_to_run,
         print(f"✅ Konfigurasi model berhasil dimuat dari {model_config_path}")
     except (FileNotFoundError, json.JSONDecodeError) as e:
         print(f"❌ Error memuat atau mem-parsing file konfigurasi model: {e}")
-        sys.exit(1)
+        raise WorkflowError(f"Konfigurasi model tidak valid: {e}")
+
+    rate_limit.configure(model_config.get("rate_limits", {}))
+    retry.configure(**model_config.get("retry", {}))
+    budget_config = model_config.get("budget", {})
+    budget.configure(
+        daily_limit=daily_budget if daily_budget is not None else budget_config.get("daily_usd"),
+        run_limit=run_budget if run_budget is not None else budget_config.get("run_usd"),
+        # Default pengganti: semua model teks di konfigurasi ini
+        fallback_models=budget_config.get("fallback_models") or [
+            model_config[key] for key in TEXT_MODEL_KEYS if model_config.get(key)],
+        on_exceed=budget_config.get("on_exceed", "downgrade"))
 
     api_key = os.getenv("GANAI_API_KEY")
-    if not api_key:
+    # Backend offline (GEMINI_BACKEND=fake) tidak memerlukan API key
+    if not api_key and gemini_api.backend().requires_api_key:
         print("❌ Error: Variabel GANAI_API_KEY tidak ditemukan di file .env Anda.")
-        sys.exit(1)
-    genai.configure(api_key=api_key)
+        raise WorkflowError("GANAI_API_KEY tidak ditemukan")
+    gemini_api.configure(api_key)
 
     base_name = os.path.basename(input_path)
     youtube_code_match = re.search(r'\[([a-zA-Z0-9_-]+)\]', base_name)
@@ -138,7 +194,7 @@ def run_workflow(input_path, blog_prompt_path, model_config_path, steps_to_run,
     dir_name, _ = os.path.splitext(base_name)
     if not dir_name:
         print(f"❌ Error: Nama file tidak valid untuk membuat direktori dari '{input_path}'")
-        sys.exit(1)
+        raise WorkflowError(f"Nama file tidak valid: {input_path}")
 
     output_md_path = os.path.join(dir_name, f"{dir_name}.md")
     output_seo_path = os.path.join(dir_name, f"{dir_name}.seo.md")
@@ -147,66 +203,416 @@ def run_workflow(input_path, blog_prompt_path, model_config_path, steps_to_run,
     os.makedirs(dir_name, exist_ok=True)
     print(f"✅ Direktori '{dir_name}' berhasil disiapkan.")
 
-    # --- Eksekusi Alur Kerja Berdasarkan Langkah ---
-    if 1 in steps_to_run:
-        if not workflow_steps.generate_draft_tutorial(input_path, blog_prompt_path, base_name, output_md_path, model_config):
-            sys.exit(1)
-
-    if 2 in steps_to_run:
-        if not workflow_steps.get_seo_keyphrases(output_md_path, output_seo_path, youtube_link, model_config):
-            sys.exit(1)
-
-    # Persiapan untuk langkah-langkah yang memerlukan keyphrase (3, 4, 5)
-    selected_keyphrase = None
-    if any(step in steps_to_run for step in [3, 4, 5]):
-        if os.path.exists(output_seo_path):
+    # --- Eksekusi Alur Kerja sebagai Graf Dependensi ---
+    # Setiap langkah dijalankan segera setelah input-nya tersedia, sehingga
+    # langkah 4, 5 dan 6 bisa berjalan bersamaan.
+    html_file_path = os.path.join(dir_name, f"{dir_name}.html")
+    seo_json_path = os.path.join(dir_name, "seo.json")
+    seo_plan_path = os.path.join(dir_name, "seo_plan.json")
+    structured_seo = structured_seo or model_config.get("structured_seo", False)
+    model_seo = model_config.get('model_seo', 'gemini-1.5-flash-latest')
+    if structured_seo and not model_registry.lookup(model_seo).supports("structured_output"):
+        print(f"⚠️ Model SEO '{model_seo}' tidak mendukung structured output, memakai Langkah 2 dan 4 biasa.")
+        structured_seo = False
+    prompt_convert_path = os.path.join(script_dir, "prompt", "prompt_convert_md_to_html.md")
+    state = {"keyphrase": None}
+
+    # Manifest mencatat hash input setiap langkah; langkah yang input-nya tidak
+    # berubah (dan output-nya masih ada) dilewati seperti `make`.
+    build = manifest.Manifest(dir_name)
+
+    def prompt_file(name):
+        return os.path.join(workflow_steps.PROMPT_DIR, name)
+
+    def read_seo_section():
+        try:
             with open(output_seo_path, 'r', encoding='utf-8') as f:
-                seo_content_for_selection = f.read()
-            selected_keyphrase = utils.parse_and_select_keyphrase(seo_content_for_selection, seo_keyphrase_choice)
+                return workflow_steps.seo_keyphrase_section(f.read())
+        except FileNotFoundError:
+            return None
+
+    def image_path():
+        if not state["keyphrase"]:
+            return None
+        return os.path.join(dir_name, utils.sanitize_filename(state["keyphrase"], 'jpg'))
+
+    def incremental(step_key, func, inputs, outputs, is_complete=None):
+        """
+        Membungkus fungsi langkah agar dilewati jika hash input-nya sama dengan
+        run terakhir yang berhasil dan semua output-nya masih ada.
+
+        Args:
+            inputs (callable): Mengembalikan (files, values) untuk fingerprint.
+            outputs (callable): Mengembalikan daftar path output.
+            is_complete (callable, optional): Pemeriksaan tambahan terhadap output.
+        """
+        def run():
+            files, values = inputs()
+            fingerprint = build.fingerprint(files, values)
+            output_paths = [path for path in outputs() if path]
+            if (not force and output_paths and build.is_current(step_key, fingerprint, output_paths)
+                    and (is_complete is None or is_complete())):
+                print(f"💤 Langkah {step_key}: input tidak berubah, output masih terkini. Dilewati.")
+                return scheduler.UP_TO_DATE
+            build.invalidate(step_key)
+            if not func():
+                return False
+            build.record(step_key, fingerprint, [path for path in outputs() if path])
+            return True
+        return run
+
+    # Context caching: transkrip diunggah sekali dan dirujuk oleh Langkah 1 dan 3.
+    # Hanya berguna jika kedua langkah memakai model yang sama (cache terikat ke satu model).
+    transcript_cache = None
+    cache_settings = model_config.get("context_cache", {})
+    if (context_cache or cache_settings.get("enabled")) and (1 in steps_to_run or 3 in steps_to_run):
+        model_tutorial = model_config.get('model_tutorial', 'gemini-1.5-flash-latest')
+        model_blog = model_config.get('model_blog', 'gemini-1.5-pro-latest')
+        if model_tutorial != model_blog:
+            print(f"ℹ️  Context caching dilewati: Langkah 1 ('{model_tutorial}') dan Langkah 3 ('{model_blog}') memakai model berbeda.")
         else:
+            with open(input_path, 'r', encoding='utf-8') as f:
+                transcript_text = workflow_steps.transcript_context_text(base_name, f.read())
+            transcript_cache = gemini_api.ContextCache(
+                transcript_text, display_name=dir_name,
+                ttl_seconds=cache_settings.get("ttl_seconds", 3600),
+                min_tokens=cache_settings.get("min_tokens", 1024),
+            )
+
+    def step_draft():
+        return workflow_steps.generate_draft_tutorial(input_path, blog_prompt_path, base_name, output_md_path, model_config,
+                                                      transcript_cache=transcript_cache, stream=stream)
+
+    def step_keyphrases():
+        if structured_seo:
+            return workflow_steps.get_seo_structured(output_md_path, output_seo_path, seo_plan_path, youtube_link,
+                                                     model_config)
+        return workflow_steps.get_seo_keyphrases(output_md_path, output_seo_path, youtube_link, model_config)
+
+    def step_select_keyphrase():
+        # Hanya bagian hasil Langkah 2 yang dipakai, sehingga metadata yang
+        # ditambahkan Langkah 4 tidak mengubah pilihan keyphrase.
+        section = read_seo_section()
+        if section is None:
             print(f"ℹ️  File SEO '{output_seo_path}' tidak ditemukan. Keyphrase perlu diinput manual jika diperlukan.")
+            return True
 
-    if 3 in steps_to_run:
-        if not selected_keyphrase:
+        fingerprint = build.fingerprint(values={"section": section, "choice": seo_keyphrase_choice})
+        if not force and build.is_current("keyphrase", fingerprint, []):
+            state["keyphrase"] = build.get("keyphrase", "selected")
+            print(f"🎯 Keyphrase dari run sebelumnya dipakai ulang: \"{state['keyphrase']}\"")
+            return True
+
+        state["keyphrase"] = utils.parse_and_select_keyphrase(section, seo_keyphrase_choice)
+        if state["keyphrase"]:
+            build.record("keyphrase", fingerprint, [], selected=state["keyphrase"])
+        return True
+
+    def step_blog():
+        if not state["keyphrase"]:
             print("❌ Error: Langkah 3 memerlukan keyphrase. Jalankan langkah 2 terlebih dahulu.")
-            sys.exit(1)
-        if not workflow_steps.create_final_blog(selected_keyphrase, input_path, output_md_path, output_blog_path, base_name, youtube_link, model_config):
-            sys.exit(1)
+            return False
+        return workflow_steps.create_final_blog(state["keyphrase"], input_path, output_md_path, output_blog_path, base_name, youtube_link, model_config,
+                                                transcript_cache=transcript_cache, stream=stream)
 
-    if 4 in steps_to_run:
+    def step_update_seo():
+        if structured_seo:
+            return workflow_steps.update_seo_from_plan(seo_plan_path, output_seo_path, state["keyphrase"])
         if not workflow_steps.update_seo_with_metadata(output_blog_path, output_seo_path, model_config):
             print("⚠️ Peringatan: Gagal memperbarui metadata SEO, melanjutkan proses...")
+            return False
+        return True
 
-    if 5 in steps_to_run:
-        if not workflow_steps.generate_blog_image(selected_keyphrase, dir_name, model_config, api_key):
+    def seo_has_metadata():
+        try:
+            with open(output_seo_path, 'r', encoding='utf-8') as f:
+                return workflow_steps.SEO_METADATA_HEADER in f.read()
+        except FileNotFoundError:
+            return False
+
+    def step_image():
+        if not workflow_steps.generate_blog_image(state["keyphrase"], dir_name, model_config, api_key,
+                                                  optimize=optimize_images):
             print("⚠️ Peringatan: Gagal membuat gambar, melanjutkan proses...")
+            return False
+        return True
 
-    if 6 in steps_to_run:
-        blog_md_file = os.path.join(dir_name, f"{dir_name}.blog.md")
-        prompt_convert_path = os.path.join(script_dir, "prompt", "prompt_convert_md_to_html.md")
+    def step_html():
         if workflow_steps.convert_md_to_html(
-            blog_md_path=blog_md_file, output_dir=dir_name,
+            blog_md_path=output_blog_path, output_dir=dir_name,
             prompt_path=prompt_convert_path,
             model_name=model_config.get("model_html", "gemini-1.5-flash"), # Ambil dari config model
-            api_key=os.getenv("GANAI_API_KEY")):
-            
+            api_key=api_key, youtube_link=youtube_link, use_llm=llm_html):
+
+            if not llm_html:
+                return True
             # Bersihkan HTML code blocks setelah konversi berhasil
-            html_file_path = os.path.join(dir_name, f"{dir_name}.html")
             if os.path.exists(html_file_path):
-                clean_html_code_blocks(html_file_path)
-            else:
-                print(f"⚠️ File HTML tidak ditemukan di {html_file_path}")
-        else:
-            print("⚠️ Peringatan: Gagal membuat html, melanjutkan proses...")
+                return clean_html_code_blocks(html_file_path)
+            print(f"⚠️ File HTML tidak ditemukan di {html_file_path}")
+            return False
+        print("⚠️ Peringatan: Gagal membuat html, melanjutkan proses...")
+        return False
 
-    if 7 in steps_to_run:
-        if os.path.exists(output_seo_path):
-            if not generate_seo_json(output_seo_path, dir_name, model_config):
-                print("⚠️ Peringatan: Gagal membuat seo.json, melanjutkan proses...")
-        else:
+    def step_seo_json():
+        if not os.path.exists(output_seo_path):
             print(f"⚠️ File SEO tidak ditemukan di {output_seo_path}, melewati pembuatan seo.json")
+            return False
+        if not generate_seo_json(output_seo_path, dir_name, model_config):
+            print("⚠️ Peringatan: Gagal membuat seo.json, melanjutkan proses...")
+            return False
+        return True
 
+    draft_inputs = lambda: (
+        {"transcript": input_path, "prompt": blog_prompt_path},
+        {"model": model_config.get('model_tutorial', 'gemini-1.5-flash-latest'), "base_name": base_name})
+    keyphrase_inputs = lambda: (
+        {"draft": output_md_path,
+         "prompt": prompt_file("prompt_seo_structured.md" if structured_seo else "prompt_add_seo.md")},
+        {"model": model_config.get('model_seo', 'gemini-1.5-flash-latest'), "youtube_link": youtube_link,
+         "structured": structured_seo})
+    keyphrase_outputs = lambda: [output_seo_path] + ([seo_plan_path] if structured_seo else [])
+    blog_inputs = lambda: (
+        {"transcript": input_path, "draft": output_md_path, "prompt": prompt_file("prompt_create_blog.md")},
+        {"model": model_config.get('model_blog', 'gemini-1.5-pro-latest'), "keyphrase": state["keyphrase"],
+         "base_name": base_name, "youtube_link": youtube_link})
+    update_seo_inputs = lambda: (
+        ({"plan": seo_plan_path}, {"keyphrase": state["keyphrase"], "seo_section": read_seo_section()})
+        if structured_seo else
+        ({"blog": output_blog_path, "prompt": prompt_file("prompt_create_seo.md")},
+         {"model": model_config.get('model_seo', 'gemini-1.5-pro-latest'), "seo_section": read_seo_section()}))
+    image_inputs = lambda: (
+        {"prompt": prompt_file("prompt_create_picture.md")},
+        {"model": model_config.get('model_image', 'gemini-1.5-pro-latest'), "keyphrase": state["keyphrase"]})
+    html_inputs = lambda: (
+        ({"blog": output_blog_path, "prompt": prompt_convert_path},
+         {"model": model_config.get("model_html", "gemini-1.5-flash")})
+        if llm_html else
+        ({"blog": output_blog_path},
+         {"renderer": f"local-v{markdown_html.RENDERER_VERSION}", "youtube_link": youtube_link}))
+    seo_json_inputs = lambda: (
+        {"seo": output_seo_path, "prompt": prompt_file("prompt_seo_json.md")},
+        {"model": model_config.get("model_seo_json", "gemini-1.5-flash"), "parser": seo_metadata.PARSER_VERSION})
+
+    graph = [
+        scheduler.Step(1, "1.Draft", incremental(1, step_draft, draft_inputs, lambda: [output_md_path]),
+                       inputs=[input_path, blog_prompt_path], outputs=[output_md_path], required=True),
+        # Output Langkah 2 hanya dicek keberadaannya karena Langkah 4 menambahkan isi ke file yang sama
+        scheduler.Step(2, "2.Keyphrases", incremental(2, step_keyphrases, keyphrase_inputs, keyphrase_outputs),
+                       depends_on=[1], inputs=[output_md_path], outputs=[output_seo_path], required=True),
+        scheduler.Step("keyphrase", "Pilih keyphrase", step_select_keyphrase, depends_on=[2],
+                       inputs=[output_seo_path]),
+        scheduler.Step(3, "3.Blog", incremental(3, step_blog, blog_inputs, lambda: [output_blog_path]),
+                       depends_on=[1, "keyphrase"], inputs=[input_path, output_md_path], outputs=[output_blog_path],
+                       required=True),
+        scheduler.Step(4, "4.Update SEO", incremental(4, step_update_seo, update_seo_inputs, lambda: [output_seo_path],
+                                                      is_complete=seo_has_metadata),
+                       # Dalam mode structured metadata sudah ada di hasil Langkah 2, tidak perlu menunggu blog
+                       depends_on=["keyphrase"] if structured_seo else [3, "keyphrase"],
+                       inputs=[seo_plan_path] if structured_seo else [output_blog_path], outputs=[output_seo_path]),
+        scheduler.Step(5, "5.Image", incremental(5, step_image, image_inputs, lambda: [image_path()]),
+                       depends_on=["keyphrase"], inputs=[output_seo_path], outputs=[dir_name]),
+        scheduler.Step(6, "6.HTML", incremental(6, step_html, html_inputs, lambda: [html_file_path]),
+                       depends_on=[3], inputs=[output_blog_path], outputs=[html_file_path]),
+        scheduler.Step(7, "7.SEO JSON", incremental(7, step_seo_json, seo_json_inputs, lambda: [seo_json_path]),
+                       depends_on=[2, 4], inputs=[output_seo_path], outputs=[seo_json_path]),
+    ]
+    needs_keyphrase = any(step in steps_to_run for step in [3, 4, 5])
+    selected_steps = [
+        step for step in graph
+        if step.step_id in steps_to_run or (step.step_id == "keyphrase" and needs_keyphrase)
+    ]
+
+    # Pemakaian API di ledger ditandai dengan post dan langkah asalnya
+    for step in selected_steps:
+        step.func = usage_ledger.bind(step.func, step.name)
+
+    # Satu span root per post; span langkah dan panggilan API menjadi anaknya
+    with tracing.span("workflow", kind="run", post=dir_name, steps=",".join(map(str, steps_to_run))) as run_span:
+        try:
+            with usage_ledger.context(post_id=dir_name):
+                results = scheduler.run_steps(selected_steps, on_step_done=on_step_done)
+        finally:
+            if transcript_cache:
+                transcript_cache.close()
+        failed = [step.name for step in selected_steps
+                  if results[step.step_id]["status"] == "failed" and step.required]
+        if failed:
+            run_span.fail(f"Langkah wajib gagal: {', '.join(failed)}")
+    scheduler.print_summary(selected_steps, results)
+    # Indeks post diperbarui agar pencarian transkrip/folder tidak perlu glob di direktori kerja
+    post_index.record_outputs(post_index.record_transcript(input_path), dir_name)
+
+    if failed:
+        raise WorkflowError(f"Langkah wajib gagal: {', '.join(failed)}")
+
+    response_cache.print_stats()
+    if budget.enabled():
+        spent = budget.spent()
+        print(f"💰 Anggaran terpakai: hari ini ${spent['today']:.4f}, run ini ${spent['run']:.4f}")
     print("\n🎉 Alur kerja selesai.")
+    return {"output_dir": dir_name, "steps": results}
+
+def select_prompt(input_path, prompt_choices):
+    """
+    Memilih file prompt otomatis berdasarkan isi file input.
+
+    Raises:
+        WorkflowError: Jika file input tidak bisa dibaca atau prompt tidak tersedia.
+    """
+    try:
+        with open(input_path, 'r', encoding='utf-8') as f:
+            file_content = f.read().lower()
+    except Exception as e:
+        print(f"❌ Error membaca file input untuk auto-select prompt: {e}")
+        raise WorkflowError(f"Gagal membaca {input_path}: {e}")
+
+    if 'odoo' in file_content:
+        selected_prompt = "prompt_tutorial_odoo18.md"
+        print(f"🎯 Auto-selected prompt: {selected_prompt} (detected 'odoo' in input file)")
+    else:
+        selected_prompt = "prompt_tutorial_subs.md"
+        print(f"🎯 Auto-selected prompt: {selected_prompt} (default for non-odoo content)")
+
+    # Validate that the selected prompt exists
+    if selected_prompt not in prompt_choices:
+        print(f"❌ Error: Auto-selected prompt '{selected_prompt}' tidak ditemukan di direktori prompt.")
+        raise WorkflowError(f"Prompt {selected_prompt} tidak ditemukan")
+    return selected_prompt
+
+def discover_transcripts(pattern):
+    """
+    Mencari file transkrip .txt dari sebuah direktori atau pola glob.
+
+    Args:
+        pattern (str): Path direktori (semua *.txt di dalamnya) atau pola glob.
+
+    Returns:
+        list: Path file .txt yang ditemukan, terurut.
+    """
+    if os.path.isdir(pattern):
+        matches = glob.glob(os.path.join(glob.escape(pattern), "*.txt"))
+    else:
+        matches = glob.glob(pattern)
+    return sorted(path for path in matches if path.lower().endswith('.txt') and os.path.isfile(path))
+
+def run_batch(input_paths, prompt_dir, prompt_choices, prompt_name, model_config_path, steps_to_run,
+              seo_keyphrase_choice=None, workers=2, **workflow_kwargs):
+    """
+    Menjalankan alur kerja penuh untuk banyak transkrip dalam satu proses
+    dengan pool thread terbatas. Kegagalan satu item tidak menghentikan batch.
+    Pemilihan keyphrase manual (`seo_keyphrase_choice=0`) membaca stdin, jadi
+    batch dijalankan dengan satu worker agar prompt tidak saling bertumpuk.
+
+    Returns:
+        list: Satu dict per item berisi input, status, detik, biaya dan pesan error.
+    """
+    if seo_keyphrase_choice == 0 and workers > 1:
+        print("ℹ️  Pemilihan keyphrase manual (--seo-keyphrase 0): batch dijalankan dengan 1 worker.")
+        workers = 1
+
+    def process(input_path):
+        start = time.perf_counter()
+        with utils.track_usage() as tally:
+            try:
+                prompt = prompt_name or select_prompt(input_path, prompt_choices)
+                run_workflow(input_path, os.path.join(prompt_dir, prompt), model_config_path, steps_to_run,
+                             seo_keyphrase_choice, **workflow_kwargs)
+                status, error = "ok", ""
+            except WorkflowError as e:
+                status, error = "failed", str(e)
+            except Exception as e:
+                print(f"❌ Error tak terduga saat memproses '{input_path}': {e}")
+                status, error = "failed", str(e)
+        return {
+            "input": input_path, "status": status, "seconds": time.perf_counter() - start,
+            "calls": tally["calls"], "cost": tally["cost"], "error": error,
+        }
+
+    print(f"📚 Mode batch: {len(input_paths)} transkrip dengan {workers} worker")
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = [executor.submit(contextvars.copy_context().run, process, path) for path in input_paths]
+        return [future.result() for future in futures]
+
+def enqueue_inputs(input_paths, prompt_dir, prompt_choices, prompt_name, model_config_path, steps_to_run,
+                   seo_keyphrase_choice=None, **workflow_kwargs):
+    """
+    Memasukkan satu job "workflow" per transkrip ke antrean (lib/job_queue)
+    untuk diproses worker.py. Prompt dipilih saat enqueue agar job tidak
+    bergantung pada isi direktori prompt di sisi worker.
+
+    Returns:
+        list: ID job yang dibuat.
+
+    Raises:
+        WorkflowError: Jika prompt tidak bisa dipilih untuk salah satu input.
+    """
+    job_ids = []
+    for input_path in input_paths:
+        prompt = prompt_name or select_prompt(input_path, prompt_choices)
+        job_id = job_queue.enqueue("workflow", {
+            "input_path": os.path.abspath(input_path), "prompt_path": os.path.join(prompt_dir, prompt),
+            "model_config_path": os.path.abspath(model_config_path), "steps": steps_to_run,
+            "seo_keyphrase_choice": seo_keyphrase_choice, "options": workflow_kwargs,
+        })
+        print(f"📥 Job {job_id}: {input_path}")
+        job_ids.append(job_id)
+    print(f"✅ {len(job_ids)} job masuk antrean {job_queue.db_path()}. Jalankan: python worker.py --slots N")
+    return job_ids
+
+def plan_inputs(input_paths, prompt_dir, prompt_choices, prompt_name, model_config_path, steps_to_run,
+                max_post_cost=None, workers=1, structured_seo=False, llm_html=False, preflight=False):
+    """
+    Mode --plan: memperkirakan token, biaya dan latensi setiap langkah untuk
+    transkrip yang diberikan tanpa memanggil endpoint generasi.
+
+    Raises:
+        WorkflowError: Jika konfigurasi model tidak valid.
+    """
+    try:
+        with open(model_config_path, 'r') as f:
+            model_config = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        print(f"❌ Error memuat atau mem-parsing file konfigurasi model: {e}")
+        raise WorkflowError(f"Konfigurasi model tidak valid: {e}")
+
+    token_counter = None
+    if preflight:
+        # count_tokens tidak memakai kuota generasi, tapi tetap butuh API key
+        load_dotenv()
+        api_key = os.getenv("GANAI_API_KEY")
+        if api_key:
+            gemini_api.configure(api_key)
+            token_counter = gemini_api.count_tokens
+        else:
+            print("⚠️ GANAI_API_KEY tidak ditemukan, token diperkirakan tanpa count_tokens.")
+
+    history = planner.load_history()
+    print(f"🧮 Riwayat pemakaian: {sum(entry['calls'] for entry in history.values())} panggilan dari "
+          f"{len(history)} model di ledger pemakaian")
+    plans = []
+    for input_path in input_paths:
+        prompt = prompt_name or select_prompt(input_path, prompt_choices)
+        plans.append(planner.plan_post(input_path, os.path.join(prompt_dir, prompt), model_config, steps_to_run, history,
+                                       structured_seo=structured_seo or model_config.get("structured_seo", False),
+                                       llm_html=llm_html, token_counter=token_counter))
+    planner.print_plan(plans, max_post_cost=max_post_cost, workers=workers)
+    return plans
+
+def print_batch_summary(rows):
+    """Mencetak tabel ringkasan status, latensi dan biaya per item batch."""
+    name_width = min(60, max([len(os.path.basename(row["input"])) for row in rows] + [10]))
+    print("\n📊 Ringkasan batch:")
+    print(f"   {'Status':<8} {'Detik':>8} {'Panggilan':>9} {'Biaya ($)':>10}  {'File':<{name_width}}")
+    for row in rows:
+        icon = "✅" if row["status"] == "ok" else "❌"
+        name = os.path.basename(row["input"])[:name_width]
+        print(f"   {icon} {row['status']:<5} {row['seconds']:8.1f} {row['calls']:9d} {row['cost']:10.6f}  {name}")
+        if row["error"]:
+            print(f"      ↳ {row['error']}")
+    ok = sum(1 for row in rows if row["status"] == "ok")
+    total_cost = sum(row["cost"] for row in rows)
+    print(f"   Total: {ok}/{len(rows)} berhasil, estimasi biaya ${total_cost:.6f}")
 
 def main():
     """Fungsi utama untuk parsing argumen dan menjalankan skrip."""
@@ -241,46 +647,100 @@ def main():
         epilog=f"Contoh: python {sys.argv[0]} nama_file.txt -m {default_model_choice} --step 1 2"
     )
 
-    parser.add_argument("input", help="Path ke file input (.txt).", metavar="FILE_INPUT")
+    parser.add_argument("input", nargs='?', help="Path ke file input (.txt).", metavar="FILE_INPUT")
+    parser.add_argument("--batch", metavar="DIR_ATAU_GLOB", help="Proses semua transkrip .txt dalam direktori atau pola glob (mis. 'video/*.txt').")
+    parser.add_argument("--workers", type=int, default=2, metavar='N', help="Jumlah transkrip yang diproses bersamaan dalam mode batch. (Default: %(default)s)")
     parser.add_argument("-p", "--prompt", choices=prompt_choices, help=f"Pilih file prompt dari '{PROMPT_DIR}/'. (Default: auto-select berdasarkan konten)")
     parser.add_argument("-m", "--model-config", default=default_model_choice, choices=model_choices, help=f"Pilih file konfigurasi model dari '{MODEL_DIR}/'. (Default: %(default)s)")
     parser.add_argument("--step", nargs='+', type=int, default=list(range(1, 8)), choices=range(1, 8), metavar='N', help="Langkah yang akan dijalankan: 1.Draft, 2.Keyphrases, 3.Blog, 4.Update SEO, 5.Image, 6.HTML, 7.SEO JSON (Default: semua)")
     parser.add_argument("-sk", "--seo-keyphrase", type=int, choices=range(0, 6), metavar='N', help="Pilih keyphrase SEO: 1-5 untuk memilih langsung, 0 untuk pemilihan manual (Default: auto-select skor tertinggi)")
+    parser.add_argument("--no-cache", action="store_true", help="Nonaktifkan cache respon Gemini (tidak membaca maupun menyimpan).")
+    parser.add_argument("--refresh", action="store_true", help="Abaikan respon di cache dan panggil ulang Gemini, lalu perbarui cache.")
+    parser.add_argument("--max-concurrency", type=int, default=gemini_api.DEFAULT_MAX_CONCURRENCY, metavar='N', help="Jumlah maksimum request Gemini yang berjalan bersamaan. (Default: %(default)s)")
+    parser.add_argument("--force", action="store_true", help="Jalankan ulang semua langkah yang dipilih walaupun artefaknya masih terkini.")
+    parser.add_argument("--context-cache", action="store_true", help="Unggah transkrip sekali sebagai context cache Gemini untuk Langkah 1 dan 3 (butuh model yang sama).")
+    parser.add_argument("--llm-html", action="store_true", help="Gunakan Gemini untuk Langkah 6 (Markdown ke HTML) alih-alih renderer lokal.")
+    parser.add_argument("--structured-seo", action="store_true", help="Ambil keyphrase dan metadata SEO dalam satu panggilan structured output (JSON schema); Langkah 4 dan 7 tidak memanggil API.")
+    parser.add_argument("--preflight", action="store_true", help="Hitung token prompt dengan count_tokens dan tampilkan estimasi biaya sebelum setiap panggilan generasi.")
+    parser.add_argument("--plan", action="store_true", help="Tampilkan estimasi token, biaya dan latensi per langkah tanpa menjalankan alur kerja.")
+    parser.add_argument("--max-post-cost", type=float, metavar='USD', help="Dengan --plan: tandai transkrip yang estimasi biayanya melebihi batas ini.")
+    parser.add_argument("--daily-budget", type=float, metavar='USD', help="Batas biaya API per hari untuk semua proses (menimpa budget.daily_usd di konfigurasi model).")
+    parser.add_argument("--run-budget", type=float, metavar='USD', help="Batas biaya API untuk run ini (menimpa budget.run_usd di konfigurasi model).")
+    parser.add_argument("--enqueue", action="store_true", help="Masukkan input ke antrean job (jobs.db) alih-alih menjalankannya; jalankan worker.py di direktori ini untuk memprosesnya.")
+    parser.add_argument("--stream", action="store_true", help="Stream respon Langkah 1 dan 3 ke file .partial agar progres terlihat dan respon parsial tersimpan jika terputus.")
+    parser.add_argument("--trace", action="store_true", help="Catat span per langkah, panggilan API dan upload, lalu tampilkan ringkasan flame di akhir run.")
+    parser.add_argument("--trace-log", metavar="PATH", help="Tulis setiap span sebagai satu baris JSON ke file ini (default: GEMINI_TRACE_LOG).")
+    parser.add_argument("--otlp-endpoint", metavar="URL", help="Kirim span ke collector OpenTelemetry (OTLP/HTTP), mis. http://localhost:4318 (default: GEMINI_TRACE_OTLP).")
     args = parser.parse_args()
 
-    if not args.input.lower().endswith('.txt'):
-        parser.error("File input harus berupa file .txt untuk menghemat kuota API.")
+    if bool(args.input) == bool(args.batch):
+        parser.error("Berikan tepat satu: FILE_INPUT atau --batch.")
 
-    if not os.path.exists(args.input):
-        parser.error(f"File input tidak ditemukan: {args.input}")
+    full_model_config_path = os.path.join(MODEL_DIR, args.model_config)
+    steps_to_run = sorted(list(set(args.step)))
+    tracing.configure(log_path=args.trace_log, otlp_endpoint=args.otlp_endpoint, summary=args.trace)
+    if args.trace and not (args.plan or args.enqueue):
+        # Dicetak juga saat run berakhir dengan sys.exit(1)
+        atexit.register(tracing.print_summary)
+    workflow_kwargs = dict(
+        use_cache=not args.no_cache, refresh_cache=args.refresh, max_concurrency=args.max_concurrency,
+        force=args.force or args.refresh, context_cache=args.context_cache, stream=args.stream,
+        llm_html=args.llm_html, structured_seo=args.structured_seo,
+        preflight=args.preflight, daily_budget=args.daily_budget, run_budget=args.run_budget,
+    )
 
-    # Auto-select prompt based on input file content if not specified
-    if args.prompt is None:
+    if args.plan:
+        input_paths = discover_transcripts(args.batch) if args.batch else [args.input]
+        if not input_paths or not all(os.path.exists(path) for path in input_paths):
+            parser.error(f"File input tidak ditemukan: {args.batch or args.input}")
         try:
-            with open(args.input, 'r', encoding='utf-8') as f:
-                file_content = f.read().lower()
-            
-            if 'odoo' in file_content:
-                selected_prompt = "prompt_tutorial_odoo18.md"
-                print(f"🎯 Auto-selected prompt: {selected_prompt} (detected 'odoo' in input file)")
-            else:
-                selected_prompt = "prompt_tutorial_subs.md"
-                print(f"🎯 Auto-selected prompt: {selected_prompt} (default for non-odoo content)")
-                
-            # Validate that the selected prompt exists
-            if selected_prompt not in prompt_choices:
-                print(f"❌ Error: Auto-selected prompt '{selected_prompt}' tidak ditemukan di direktori '{PROMPT_DIR}/'.")
-                sys.exit(1)
-                
-            args.prompt = selected_prompt
-        except Exception as e:
-            print(f"❌ Error membaca file input untuk auto-select prompt: {e}")
+            plan_inputs(input_paths, PROMPT_DIR, prompt_choices, args.prompt, full_model_config_path, steps_to_run,
+                        max_post_cost=args.max_post_cost, workers=args.workers if args.batch else 1,
+                        structured_seo=args.structured_seo, llm_html=args.llm_html, preflight=args.preflight)
+        except WorkflowError:
             sys.exit(1)
+        return
+
+    if args.enqueue:
+        input_paths = discover_transcripts(args.batch) if args.batch else [args.input]
+        if not input_paths or not all(os.path.exists(path) for path in input_paths):
+            parser.error(f"File input tidak ditemukan: {args.batch or args.input}")
+        if args.seo_keyphrase == 0:
+            parser.error("--seo-keyphrase 0 (pemilihan manual) tidak bisa dipakai dengan --enqueue.")
+        try:
+            enqueue_inputs(input_paths, PROMPT_DIR, prompt_choices, args.prompt, full_model_config_path, steps_to_run,
+                           args.seo_keyphrase, **workflow_kwargs)
+        except WorkflowError:
+            sys.exit(1)
+        return
+
+    if args.batch:
+        input_paths = discover_transcripts(args.batch)
+        if not input_paths:
+            parser.error(f"Tidak ada file .txt yang cocok dengan: {args.batch}")
+        rows = run_batch(input_paths, PROMPT_DIR, prompt_choices, args.prompt, full_model_config_path, steps_to_run,
+                         args.seo_keyphrase, workers=args.workers, **workflow_kwargs)
+        print_batch_summary(rows)
+        if any(row["status"] != "ok" for row in rows):
+            sys.exit(1)
+        return
 
-    full_prompt_path = os.path.join(PROMPT_DIR, args.prompt)
-    full_model_config_path = os.path.join(MODEL_DIR, args.model_config)
+    if not args.input.lower().endswith('.txt'):
+        parser.error("File input harus berupa file .txt untuk menghemat kuota API.")
 
-    run_workflow(args.input, full_prompt_path, full_model_config_path, sorted(list(set(args.step))), args.seo_keyphrase)
+    if not os.path.exists(args.input):
+        parser.error(f"File input tidak ditemukan: {args.input}")
+
+    try:
+        # Auto-select prompt based on input file content if not specified
+        if args.prompt is None:
+            args.prompt = select_prompt(args.input, prompt_choices)
+
+        full_prompt_path = os.path.join(PROMPT_DIR, args.prompt)
+        run_workflow(args.input, full_prompt_path, full_model_config_path, steps_to_run, args.seo_keyphrase,
+                     **workflow_kwargs)
+    except WorkflowError:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Blog Pipeline HTTP Server
+Server HTTP lokal (asyncio, tanpa dependency tambahan) untuk mengirim transkrip,
+memantau status job, mengambil artefak (HTML, seo.json, gambar) dan
+men-stream progres. Job disimpan di antrean SQLite (lib/job_queue) dan
+dijalankan worker di dalam proses ini, sehingga klien Gemini dipakai bersama.
+"""
+
+import os
+import re
+import sys
+import json
+import asyncio
+import argparse
+import mimetypes
+import threading
+from urllib.parse import urlsplit, parse_qs, unquote
+
+import main as blog_workflow
+import worker as job_worker
+from lib import job_queue
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROMPT_DIR = os.path.join(SCRIPT_DIR, "prompt")
+MODEL_DIR = os.path.join(SCRIPT_DIR, "model")
+
+MAX_BODY_BYTES = 5 * 1024 * 1024
+EVENT_POLL_SECONDS = 0.5
+# Opsi run_workflow yang boleh diatur lewat request
+REQUEST_OPTIONS = ("structured_seo", "llm_html", "force")
+# Nilai opsi dari query string (submit teks mentah) selalu berupa string
+TRUE_VALUES = ("1", "true", "yes", "on")
+FALSE_VALUES = ("0", "false", "no", "off")
+
+STATUS_TEXT = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+class HttpError(Exception):
+    """Dilempar handler untuk mengirim respon error JSON."""
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+def parse_flag(key, value):
+    """
+    Mengubah nilai opsi request menjadi bool: boolean JSON apa adanya, string
+    "1/true/yes/on" atau "0/false/no/off" (tanpa membedakan huruf besar).
+
+    Raises:
+        HttpError: 400 jika nilai tidak dikenali.
+    """
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        normalized = value.strip().lower()
+        if normalized in TRUE_VALUES:
+            return True
+        if normalized in FALSE_VALUES:
+            return False
+    raise HttpError(400, f"{key} harus true/false (atau 1/0, yes/no, on/off), bukan {value!r}")
+
+def job_output_dir(job):
+    """Folder output job: dari hasil run_workflow, atau diturunkan dari nama transkrip."""
+    if job.result and job.result.get("output_dir"):
+        return job.result["output_dir"]
+    source = job.payload.get("input_path") or job.payload.get("nama_file", "")
+    return os.path.splitext(os.path.basename(source))[0]
+
+def list_artifacts(job):
+    """Nama file di folder output job (hanya file langsung di folder, tanpa file tersembunyi)."""
+    folder = os.path.join(job.cwd, job_output_dir(job))
+    if not os.path.isdir(folder):
+        return []
+    return sorted(entry.name for entry in os.scandir(folder) if entry.is_file() and not entry.name.startswith('.'))
+
+def job_to_dict(job):
+    return {
+        "id": job.id, "kind": job.kind, "status": job.status, "attempts": job.attempts,
+        "max_attempts": job.max_attempts, "checkpoint": job.checkpoint, "error": job.error,
+        "result": job.result, "created_at": job.created_at, "started_at": job.started_at,
+        "finished_at": job.finished_at, "output_dir": job_output_dir(job), "artifacts": list_artifacts(job),
+        "links": {"self": f"/jobs/{job.id}", "events": f"/jobs/{job.id}/events",
+                  "artifacts": f"/jobs/{job.id}/artifacts"},
+    }
+
+class BlogServer:
+    """
+    Endpoint:
+        POST /jobs                      Kirim transkrip (JSON atau teks mentah), balas 202 + ID job
+        GET  /jobs/{id}                 Status job, checkpoint per langkah, daftar artefak
+        GET  /jobs/{id}/artifacts/{f}   Unduh artefak (mis. .html, seo.json, .jpg)
+        GET  /jobs/{id}/events          Progres sebagai Server-Sent Events
+        GET  /health                    Jumlah job per status
+    """
+    def __init__(self, model_config="model.json", max_queue=20, default_steps=None):
+        self.model_config = model_config
+        self.max_queue = max_queue
+        self.default_steps = default_steps or list(range(1, 8))
+        self.prompt_choices = [f for f in os.listdir(PROMPT_DIR) if f.endswith('.md')]
+        self.model_choices = [f for f in os.listdir(MODEL_DIR) if f.endswith('.json')]
+        # Cek antrean dan job aktif, tulis transkrip dan enqueue dilakukan atomik antar-request
+        self._submit_lock = threading.Lock()
+
+    # --- HTTP ---
+
+    async def handle(self, reader, writer):
+        try:
+            try:
+                method, path, query, headers, body = await self.read_request(reader)
+                await self.route(method, path, query, headers, body, writer)
+            except HttpError as e:
+                await self.send_json(writer, e.status, {"error": str(e)}, e.headers)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                pass
+            except Exception as e:
+                print(f"❌ Error tak terduga di server: {e}")
+                await self.send_json(writer, 500, {"error": str(e)})
+        finally:
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def read_request(self, reader):
+        request_line = (await reader.readline()).decode('latin-1').strip()
+        if not request_line:
+            raise ConnectionError("Koneksi ditutup klien")
+        try:
+            method, target, _ = request_line.split(" ", 2)
+        except ValueError:
+            raise HttpError(400, "Request line tidak valid")
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode('latin-1')
+            if line in ("\r\n", "\n", ""):
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        raw_length = headers.get("content-length") or "0"
+        if not raw_length.isdigit():
+            raise HttpError(400, f"Content-Length tidak valid: {raw_length!r}")
+        length = int(raw_length)
+        if length > MAX_BODY_BYTES:
+            raise HttpError(413, f"Body melebihi {MAX_BODY_BYTES} byte")
+        body = await reader.readexactly(length) if length else b""
+        url = urlsplit(target)
+        return method.upper(), unquote(url.path), parse_qs(url.query), headers, body
+
+    async def send(self, writer, status, body, content_type, headers=None):
+        head = [f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}", f"Content-Type: {content_type}",
+                f"Content-Length: {len(body)}", "Connection: close"]
+        head += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode('latin-1') + body)
+        await writer.drain()
+
+    async def send_json(self, writer, status, data, headers=None):
+        body = json.dumps(data, ensure_ascii=False, indent=2, default=str).encode('utf-8')
+        await self.send(writer, status, body, "application/json; charset=utf-8", headers)
+
+    async def route(self, method, path, query, headers, body, writer):
+        parts = [part for part in path.split("/") if part]
+        if parts == ["health"]:
+            return await self.send_json(writer, 200, await asyncio.to_thread(job_queue.counts, os.getcwd()))
+        if parts == ["jobs"]:
+            if method != "POST":
+                raise HttpError(405, "Gunakan POST untuk mengirim transkrip")
+            return await self.submit(query, headers, body, writer)
+        if len(parts) >= 2 and parts[0] == "jobs" and parts[1].isdigit():
+            if method != "GET":
+                raise HttpError(405, "Gunakan GET")
+            job = await asyncio.to_thread(job_queue.get, int(parts[1]))
+            if job is None or job.cwd != os.getcwd():
+                raise HttpError(404, f"Job {parts[1]} tidak ditemukan")
+            if len(parts) == 2:
+                return await self.send_json(writer, 200, job_to_dict(job))
+            if parts[2:] == ["artifacts"]:
+                return await self.send_json(writer, 200, {"artifacts": list_artifacts(job)})
+            if len(parts) == 4 and parts[2] == "artifacts":
+                return await self.send_artifact(job, parts[3], writer)
+            if parts[2:] == ["events"]:
+                return await self.stream_events(job.id, writer)
+        raise HttpError(404, f"Path tidak dikenal: {path}")
+
+    # --- Endpoint ---
+
+    def parse_submission(self, query, headers, body):
+        """Body JSON {"name", "transcript", ...} atau teks mentah dengan ?name=."""
+        if headers.get("content-type", "").startswith("application/json"):
+            try:
+                data = json.loads(body.decode('utf-8'))
+            except (UnicodeDecodeError, json.JSONDecodeError) as e:
+                raise HttpError(400, f"JSON tidak valid: {e}")
+            if not isinstance(data, dict):
+                raise HttpError(400, "Body JSON harus berupa object")
+        else:
+            data = {key: values[-1] for key, values in query.items()}
+            data["transcript"] = body.decode('utf-8', errors='replace')
+        name = data.get("name") or ""
+        transcript = data.get("transcript") or ""
+        if not isinstance(name, str) or not isinstance(transcript, str):
+            raise HttpError(400, "Field 'name' dan 'transcript' harus berupa string")
+        name = name.strip()
+        # Nama dipakai sebagai nama file dan folder output; [kode video] dipertahankan
+        name = re.sub(r'[\\/:*?"<>|\x00-\x1f]', '', name).strip(' .')
+        if name.lower().endswith('.txt'):
+            name = name[:-4]
+        if not name or not transcript.strip():
+            raise HttpError(400, "Field 'name' dan 'transcript' wajib diisi")
+        return name, transcript, data
+
+    async def submit(self, query, headers, body, writer):
+        name, transcript, data = self.parse_submission(query, headers, body)
+        model_config = data.get("model_config", self.model_config)
+        if model_config not in self.model_choices:
+            raise HttpError(400, f"model_config tidak dikenal: {model_config}")
+        prompt = data.get("prompt")
+        if prompt is not None and prompt not in self.prompt_choices:
+            raise HttpError(400, f"prompt tidak dikenal: {prompt}")
+        try:
+            steps = data.get("steps", self.default_steps)
+            if isinstance(steps, str):
+                steps = [int(step) for step in steps.split(",") if step.strip()]
+            keyphrase = data.get("seo_keyphrase")
+            keyphrase = int(keyphrase) if keyphrase is not None else None
+        except (TypeError, ValueError):
+            raise HttpError(400, "steps dan seo_keyphrase harus berupa angka")
+        if not steps or any(step not in range(1, 8) for step in steps):
+            raise HttpError(400, "steps harus berisi angka 1-7")
+        if keyphrase is not None and keyphrase not in range(1, 6):
+            raise HttpError(400, "seo_keyphrase harus 1-5 (pemilihan manual tidak didukung)")
+        options = {key: parse_flag(key, data[key]) for key in REQUEST_OPTIONS if key in data}
+
+        input_path = os.path.join(os.getcwd(), f"{name}.txt")
+
+        def write_and_enqueue():
+            with self._submit_lock:
+                counts = job_queue.counts(os.getcwd())
+                pending = counts["queued"] + counts["running"]
+                if pending >= self.max_queue:
+                    # Backpressure: klien diminta mencoba lagi alih-alih menumpuk job
+                    raise HttpError(503, f"Antrean penuh ({pending}/{self.max_queue} job), coba lagi nanti",
+                                    {"Retry-After": "30"})
+                # Transkrip job yang masih antre/berjalan tidak boleh ditimpa (worker bisa sedang membacanya)
+                for job in job_queue.active(os.getcwd()):
+                    if job.payload.get("input_path") == os.path.abspath(input_path):
+                        raise HttpError(409, f"Job {job.id} untuk '{name}' masih {job.status}; tunggu selesai "
+                                             f"atau kirim dengan nama lain", {"Location": f"/jobs/{job.id}"})
+                with open(input_path, 'w', encoding='utf-8') as f:
+                    f.write(transcript)
+                return blog_workflow.enqueue_inputs(
+                    [input_path], PROMPT_DIR, self.prompt_choices, prompt, os.path.join(MODEL_DIR, model_config),
+                    sorted(set(steps)), keyphrase, **options)[0]
+
+        try:
+            job_id = await asyncio.to_thread(write_and_enqueue)
+        except blog_workflow.WorkflowError as e:
+            raise HttpError(400, str(e))
+        job = await asyncio.to_thread(job_queue.get, job_id)
+        await self.send_json(writer, 202, job_to_dict(job), {"Location": f"/jobs/{job_id}"})
+
+    async def send_artifact(self, job, name, writer):
+        folder = os.path.join(job.cwd, job_output_dir(job))
+        # Hanya file langsung di folder output yang boleh diambil
+        if name != os.path.basename(name) or name.startswith('.') or name not in list_artifacts(job):
+            raise HttpError(404, f"Artefak tidak ditemukan: {name}")
+        with open(os.path.join(folder, name), 'rb') as f:
+            content = f.read()
+        content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        if content_type.startswith("text/") or content_type == "application/json":
+            content_type += "; charset=utf-8"
+        await self.send(writer, 200, content, content_type)
+
+    async def stream_events(self, job_id, writer):
+        """
+        Server-Sent Events: `status` saat status job berubah, `step` untuk setiap
+        checkpoint langkah baru, lalu `end` setelah job selesai atau gagal.
+        """
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n"
+                     b"Connection: close\r\n\r\n")
+        await writer.drain()
+
+        async def emit(event, data):
+            writer.write(f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n".encode('utf-8'))
+            await writer.drain()
+
+        last_status, seen_steps = None, set()
+        while True:
+            job = await asyncio.to_thread(job_queue.get, job_id)
+            if job.status != last_status:
+                last_status = job.status
+                await emit("status", {"id": job.id, "status": job.status, "attempts": job.attempts,
+                                      "error": job.error})
+            for step, info in job.checkpoint.items():
+                if (step, info.get("at")) not in seen_steps:
+                    seen_steps.add((step, info.get("at")))
+                    await emit("step", dict(info, step=step))
+            if job.status in ("done", "failed"):
+                await emit("end", job_to_dict(job))
+                return
+            await asyncio.sleep(EVENT_POLL_SECONDS)
+
+async def serve(host, port, server):
+    listener = await asyncio.start_server(server.handle, host, port)
+    addresses = ", ".join(f"http://{sock.getsockname()[0]}:{sock.getsockname()[1]}" for sock in listener.sockets)
+    print(f"🌐 Server berjalan di {addresses} (antrean maks {server.max_queue} job, cwd {os.getcwd()})")
+    async with listener:
+        await listener.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="Server HTTP lokal untuk pipeline blog (submit, status, artefak, events).")
+    parser.add_argument("--host", default="127.0.0.1", help="Alamat bind (default: 127.0.0.1).")
+    parser.add_argument("--port", type=int, default=8765, help="Port (default: 8765).")
+    parser.add_argument("-m", "--model-config", default="model.json", help="Konfigurasi model default di model/ (default: model.json).")
+    parser.add_argument("--slots", type=int, default=2, help="Job yang dijalankan bersamaan oleh worker internal (default: 2).")
+    parser.add_argument("--max-queue", type=int, default=20,
+                        help="Batas job queued+running; submit di atas batas ini dibalas 503 (default: 20).")
+    parser.add_argument("--no-worker", action="store_true",
+                        help="Jangan jalankan worker internal; job diproses oleh proses worker.py terpisah.")
+    args = parser.parse_args()
+
+    server = BlogServer(args.model_config, args.max_queue)
+    if args.model_config not in server.model_choices:
+        parser.error(f"Konfigurasi model tidak ditemukan di model/: {args.model_config}")
+
+    worker, worker_thread = None, None
+    if not args.no_worker:
+        # Worker di proses yang sama: model Gemini dan session HTTP dipakai bersama semua request
+        worker = job_worker.Worker(slots=args.slots)
+        worker_thread = threading.Thread(target=worker.run, name="worker", daemon=True)
+        worker_thread.start()
+
+    try:
+        asyncio.run(serve(args.host, args.port, server))
+    except KeyboardInterrupt:
+        print("\n🛑 Server dihentikan.")
+    finally:
+        if worker:
+            print("⏳ Menunggu job yang sedang berjalan selesai (Ctrl+C lagi untuk keluar paksa)...")
+            worker.stop.set()
+            try:
+                worker_thread.join()
+            except KeyboardInterrupt:
+                sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -4,113 +4,83 @@ YouTube Subtitle to WordPress Blog Automation
 Download YouTube subtitles, generate blog post, and upload to WordPress
 """
 
-import subprocess
 import sys
 import os
 import argparse
 import glob
-import re
+import atexit
+from dataclasses import dataclass
+
+import get_subs_youtube
+import main as blog_workflow
+from lib import post_index, tracing
+from wordpress_uploader import WordPressUploader
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROMPT_DIR = os.path.join(SCRIPT_DIR, "prompt")
+MODEL_DIR = os.path.join(SCRIPT_DIR, "model")
+ALL_STEPS = list(range(1, 8))
+IMAGE_PATTERNS = ['*.jpg', '*.jpeg', '*.png', '*.webp']
+# Status per video untuk mode pipeline (--list/--playlist)
+PIPELINE_STATE_FILE = "pipeline_state.json"
+
+class AutomationError(Exception):
+    """Dilempar jika salah satu tahap otomasi (download, generate, upload) gagal."""
+
+@dataclass
+class AutomationResult:
+    """Hasil `process` untuk satu video."""
+    identifier: str
+    subtitle_file: str
+    output_folder: str
+    workflow: dict = None   # hasil `run_workflow`, None jika generate dilewati
+    upload: object = None   # `UploadResult` dari WordPressUploader.process_folder
 
 
 def extract_code_or_keywords(nama_file):
     """
-    Ekstrak kode dari [kode] atau ambil 3 kata pertama dari nama_file
+    Ekstrak kode dari [kode] atau nama_file yang dinormalisasi (lihat `post_index.identifier_for`)
     Returns: (identifier, is_code)
     """
-    # Cari pattern [kode] dalam nama_file
-    code_pattern = r'\[([a-zA-Z0-9_-]{8,})\]'
-    match = re.search(code_pattern, nama_file)
-    
-    if match:
-        code = match.group(1)
-        print(f"🔍 Kode ditemukan: {code}")
-        return code, True
+    identifier, is_code = post_index.identifier_for(nama_file)
+    if is_code:
+        print(f"🔍 Kode ditemukan: {identifier}")
     else:
-        # Ambil 3 kata pertama, hilangkan karakter khusus
-        words = re.findall(r'\w+', nama_file)
-        if len(words) >= 3:
-            keywords = '-'.join(words[:3]).lower()
-        elif len(words) > 0:
-            keywords = '-'.join(words).lower()
-        else:
-            keywords = nama_file.lower()
-        
-        print(f"🔍 Menggunakan keywords: {keywords}")
-        return keywords, False
+        print(f"🔍 Menggunakan keywords: {identifier}")
+    return identifier, is_code
 
 def find_subtitle_file(identifier):
     """
-    Cari file subtitle .txt yang sudah ada berdasarkan identifier (kode atau keywords)
+    Cari file subtitle .txt yang sudah ada berdasarkan identifier (kode atau keywords).
+    Indeks post dicek lebih dulu (kunci lengkap, lalu 3 kata pertama jika tidak
+    ambigu); glob di direktori kerja hanya dipakai jika identifier belum
+    terindeks, dan hasilnya langsung dicatat ke indeks.
     Returns: path file subtitle atau None
     """
-    # Hanya cari file .txt saja
-    pattern = f"*{identifier}*.txt"
-    
-    files = glob.glob(pattern)
+    entry = post_index.lookup(identifier)
+    if entry and entry["transcript"] and os.path.exists(entry["transcript"]):
+        print(f"✅ File subtitle .txt ditemukan (indeks): {entry['transcript']}")
+        return entry["transcript"]
+
+    # Hanya cari file .txt saja; diurutkan agar hasilnya selalu sama
+    files = sorted(glob.glob(f"*{glob.escape(identifier)}*.txt"))
     if files:
-        subtitle_file = files[0]  # Ambil file pertama
+        subtitle_file = files[0]
         print(f"✅ File subtitle .txt ditemukan: {subtitle_file}")
+        post_index.record_transcript(subtitle_file)
         return subtitle_file
     
     print(f"⚠️ File subtitle .txt tidak ditemukan untuk: {identifier}")
     return None
 
-def find_output_folder(identifier, original_filename=None):
-    """
-    Cari folder output berdasarkan identifier atau nama file asli
-    Returns: path folder atau None
-    """
-    # Pattern 1: Cari berdasarkan identifier yang dinormalisasi
-    possible_folders = glob.glob(f"*{identifier}*")
-    folders = [f for f in possible_folders if os.path.isdir(f)]
-    
-    if folders:
-        output_folder = folders[0]
-        print(f"✅ Folder output ditemukan (identifier): {output_folder}")
-        return output_folder
-    
-    # Pattern 2: Jika ada original filename, cari berdasarkan nama asli
-    if original_filename:
-        # Hapus ekstensi dari nama file asli
-        base_name = os.path.splitext(os.path.basename(original_filename))[0]
-        possible_folders = glob.glob(f"*{base_name}*")
-        folders = [f for f in possible_folders if os.path.isdir(f)]
-        
-        if folders:
-            output_folder = folders[0]
-            print(f"✅ Folder output ditemukan (nama asli): {output_folder}")
-            return output_folder
-    
-    # Pattern 3: Cari folder yang mengandung kata-kata dari identifier
-    if '-' in identifier:
-        words = identifier.split('-')
-        for word in words:
-            if len(word) > 2:  # Skip kata pendek
-                possible_folders = glob.glob(f"*{word}*")
-                folders = [f for f in possible_folders if os.path.isdir(f)]
-                if folders:
-                    output_folder = folders[0]
-                    print(f"✅ Folder output ditemukan (kata kunci '{word}'): {output_folder}")
-                    return output_folder
-    
-    print(f"⚠️ Folder output tidak ditemukan untuk: {identifier}")
-    return None
-
 def check_folder_contents(folder_path):
     """
     Periksa apakah folder sudah berisi seo.json dan file .html
     Returns: (has_seo_json, has_html, html_file_path)
     """
+    has_seo_json, has_html, html_file_path = post_index.folder_status(folder_path)
     if not os.path.exists(folder_path):
-        return False, False, None
-    
-    seo_json_path = os.path.join(folder_path, 'seo.json')
-    has_seo_json = os.path.exists(seo_json_path)
-    
-    # Cari file .html dalam folder
-    html_files = glob.glob(os.path.join(folder_path, '*.html'))
-    has_html = len(html_files) > 0
-    html_file_path = html_files[0] if html_files else None
+        return has_seo_json, has_html, html_file_path
     
     print(f"📋 Status folder {folder_path}:")
     print(f"   {'✅' if has_seo_json else '❌'} seo.json: {'Ada' if has_seo_json else 'Tidak ada'}")
@@ -118,29 +88,307 @@ def check_folder_contents(folder_path):
     
     return has_seo_json, has_html, html_file_path
 
-def run_command(command, description):
-    """Jalankan command dan tampilkan hasilnya"""
-    print(f"🔄 {description}")
-    print(f"📝 Menjalankan: {' '.join(command)}")
-    
+def download_subtitle(nama_file):
+    """
+    Download subtitle .txt langsung lewat `get_subs_youtube.download_subtitles`.
+
+    Returns:
+        str: Path file .txt yang ditulis.
+    """
+    video_id = (get_subs_youtube.extract_video_id_from_filename(nama_file)
+                or get_subs_youtube.extract_video_id(nama_file))
+    if not video_id:
+        raise AutomationError(f"Kode video YouTube tidak ditemukan di: {nama_file}")
+    files = get_subs_youtube.download_subtitles(video_id, ['txt'])
+    if not files:
+        raise AutomationError(f"Gagal download subtitle untuk video {video_id}")
+    post_index.record_transcript(files[0])
+    return files[0]
+
+def generate_blog(subtitle_file, model_config='model.json', optimize_images=True, on_step_done=None):
+    """
+    Jalankan seluruh langkah `main.run_workflow` di proses ini.
+    Dengan `optimize_images=False` gambar dikompres terpisah (mode pipeline).
+    `on_step_done` diteruskan ke `run_workflow` (checkpoint job di worker.py).
+
+    Returns:
+        dict: Hasil `run_workflow` ({"output_dir", "steps"}).
+    """
+    prompt_choices = [f for f in os.listdir(PROMPT_DIR) if f.endswith('.md')]
+    try:
+        prompt = blog_workflow.select_prompt(subtitle_file, prompt_choices)
+        return blog_workflow.run_workflow(subtitle_file, os.path.join(PROMPT_DIR, prompt),
+                                          os.path.join(MODEL_DIR, model_config), ALL_STEPS,
+                                          optimize_images=optimize_images, on_step_done=on_step_done)
+    except blog_workflow.WorkflowError as e:
+        raise AutomationError(f"Gagal generate blog post: {e}")
+
+def resolve_subtitle(nama_file):
+    """
+    Cari file subtitle .txt untuk input, download jika belum ada.
+
+    Returns:
+        tuple: (identifier, subtitle_file)
+
+    Raises:
+        AutomationError: Jika file .txt tidak ada atau download gagal.
+    """
+    # Cek apakah input sudah file .txt
+    if nama_file.lower().endswith('.txt'):
+        print(f"📄 Input adalah file .txt: {nama_file}")
+        if not os.path.exists(nama_file):
+            raise AutomationError(f"File tidak ditemukan: {nama_file}")
+        base_name = os.path.splitext(os.path.basename(nama_file))[0]
+        identifier, is_code = extract_code_or_keywords(base_name)
+        print("⏭️ Skip download subtitle (file .txt sudah tersedia)")
+        return identifier, nama_file
+
+    # Ekstrak kode atau keywords dari nama_file
+    identifier, is_code = extract_code_or_keywords(nama_file)
+    subtitle_file = find_subtitle_file(identifier)
+    if subtitle_file:
+        print("✅ File subtitle sudah ada, skip download")
+    else:
+        print("📥 File subtitle tidak ditemukan, mencoba download...")
+        subtitle_file = download_subtitle(nama_file)
+    return identifier, subtitle_file
+
+def ensure_blog(subtitle_file, model_config='model.json', optimize_images=True, on_step_done=None):
+    """
+    Generate blog post kecuali folder output sudah berisi seo.json dan HTML.
+
+    Returns:
+        tuple: (output_folder, hasil `run_workflow` atau None jika dilewati)
+    """
+    # Folder output selalu dinamai sesuai file subtitle (sama seperti run_workflow)
+    output_folder = os.path.splitext(os.path.basename(subtitle_file))[0]
+    has_seo_json, has_html, _ = check_folder_contents(output_folder)
+    if has_seo_json and has_html:
+        print("⏭️ Skip generate blog post (seo.json + HTML sudah ada)")
+        post_index.record_outputs(post_index.record_transcript(subtitle_file), output_folder)
+        return output_folder, None
+    print("📝 Generate blog post")
+    workflow = generate_blog(subtitle_file, model_config, optimize_images, on_step_done)
+    return workflow["output_dir"], workflow
+
+def optimize_folder_images(folder_path, target_kb=100):
+    """
+    Kompres gambar di folder yang masih lebih besar dari `target_kb`
+    (uploader melewati gambar yang terlalu besar).
+
+    Returns:
+        list: Nama file gambar yang dikompres.
+    """
+    from lib import image_processing
+
+    optimized = []
+    for pattern in IMAGE_PATTERNS:
+        for image_path in sorted(glob.glob(os.path.join(glob.escape(folder_path), pattern))):
+            if os.path.getsize(image_path) / 1024 >= target_kb:
+                image_processing.resize_image(image_path, target_kb=target_kb)
+                optimized.append(os.path.basename(image_path))
+    return optimized
+
+def upload_folder(uploader, output_folder, post_status='draft'):
+    """
+    Upload folder output ke WordPress.
+
+    Returns:
+        UploadResult
+
+    Raises:
+        AutomationError: Jika ada post yang gagal dibuat.
+    """
+    with tracing.span("upload", kind="step", folder=os.path.basename(output_folder), post_status=post_status) as span:
+        upload = uploader.process_folder(output_folder, post_status)
+        span.set(posts=len(upload.posts), images=len(upload.images), failed=len(upload.failed))
+        if not upload.ok:
+            span.fail(f"{len(upload.failed)} post gagal")
+    if upload.posts:
+        # Nama folder output = nama transkrip, jadi kuncinya sama dengan entri transkrip
+        key, _ = post_index.identifier_for(os.path.basename(output_folder))
+        post_index.record_upload(key, [post["id"] for post in upload.posts], post_status)
+    if not upload.ok:
+        raise AutomationError(f"Gagal upload ke WordPress: {len(upload.failed)} post gagal, "
+                              f"{len(upload.posts)} berhasil")
+    return upload
+
+def create_uploader():
+    """Membuat WordPressUploader; kredensial dicek sebelum memakai kuota API."""
+    try:
+        return WordPressUploader()
+    except ValueError as e:
+        raise AutomationError(str(e))
+
+def process(nama_file, post_status='draft', model_config='model.json', uploader=None):
+    """
+    Download subtitle (jika perlu), generate blog post, lalu upload ke WordPress,
+    semuanya dalam satu proses: klien Gemini dan session WordPress dipakai ulang.
+
+    Args:
+        nama_file (str): File .txt, atau nama file/URL/kode video YouTube.
+        post_status (str): Status post WordPress (draft, publish, private).
+        model_config (str): Nama file konfigurasi di model/.
+        uploader (WordPressUploader, optional): Uploader yang sudah dibuat (mis. untuk banyak video).
+
+    Returns:
+        AutomationResult
+
+    Raises:
+        AutomationError: Jika salah satu tahap gagal.
+    """
+    # Kredensial WordPress dicek sebelum memakai kuota API
+    if uploader is None:
+        uploader = create_uploader()
+
+    # Langkah 1: Cari atau download subtitle
+    print("\n📥 LANGKAH 1: Cari atau download subtitle")
+    identifier, subtitle_file = resolve_subtitle(nama_file)
+
+    # Langkah 2-3: Cek folder output lalu generate blog post (jika diperlukan)
+    print("\n📝 LANGKAH 2: Cek folder output dan generate blog post")
+    output_folder, workflow = ensure_blog(subtitle_file, model_config)
+
+    # Langkah 4: Upload ke WordPress
+    print("\n📤 LANGKAH 3: Upload ke WordPress")
+    upload = upload_folder(uploader, output_folder, post_status)
+
+    return AutomationResult(identifier=identifier, subtitle_file=subtitle_file, output_folder=output_folder,
+                            workflow=workflow, upload=upload)
+
+def expand_playlist(url):
+    """
+    Ambil URL semua video dari playlist YouTube (memakai pytube).
+
+    Raises:
+        AutomationError: Jika pytube tidak tersedia atau playlist tidak bisa dibaca.
+    """
+    try:
+        from pytube import Playlist
+    except ImportError:
+        raise AutomationError("pytube diperlukan untuk playlist. Install dengan: pip install pytube")
     try:
-        result = subprocess.run(command, check=True, capture_output=True, text=True)
-        print(f"✅ {description} berhasil")
-        if result.stdout:
-            print(f"📤 Output: {result.stdout.strip()}")
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"❌ {description} gagal")
-        print(f"Error code: {e.returncode}")
-        if e.stdout:
-            print(f"Stdout: {e.stdout}")
-        if e.stderr:
-            print(f"Stderr: {e.stderr}")
-        return False
-    except FileNotFoundError:
-        print(f"❌ Command tidak ditemukan: {command[0]}")
-        return False
+        urls = list(Playlist(url).video_urls)
+    except Exception as e:
+        raise AutomationError(f"Gagal membaca playlist {url}: {e}")
+    print(f"📃 Playlist berisi {len(urls)} video")
+    return urls
 
+def read_video_list(list_file):
+    """
+    Baca daftar video dari file: satu kode video, URL, nama file atau file .txt
+    per baris. Baris kosong dan baris yang diawali '#' diabaikan; URL playlist
+    diperluas menjadi semua videonya.
+
+    Returns:
+        list: Input video sesuai urutan file.
+    """
+    try:
+        with open(list_file, 'r', encoding='utf-8') as f:
+            lines = [line.strip() for line in f]
+    except OSError as e:
+        raise AutomationError(f"Gagal membaca daftar video {list_file}: {e}")
+    videos = []
+    for line in lines:
+        if not line or line.startswith('#'):
+            continue
+        videos.extend(expand_playlist(line) if 'list=' in line else [line])
+    return videos
+
+def video_key(nama_file):
+    """Kunci status pipeline: kode video YouTube jika ada, selain itu input apa adanya."""
+    return (get_subs_youtube.extract_video_id_from_filename(nama_file)
+            or (None if nama_file.lower().endswith('.txt') else get_subs_youtube.extract_video_id(nama_file))
+            or nama_file)
+
+def run_pipeline(videos, post_status='draft', model_config='model.json', state_file=PIPELINE_STATE_FILE,
+                 download_workers=2, generate_workers=1, optimize_workers=1, upload_workers=1, queue_size=2,
+                 uploader=None):
+    """
+    Proses banyak video sebagai pipeline bertahap (download → generate →
+    optimize → upload). Setiap tahap punya worker sendiri dengan antrean
+    terbatas, jadi download video berikutnya berjalan selagi video sebelumnya
+    di-generate. Status per video disimpan di `state_file`; run ulang
+    melanjutkan dari tahap yang belum selesai dan tidak mengupload ulang post.
+
+    Returns:
+        dict: {kunci video: status dari `pipeline.PipelineState`}
+    """
+    from lib import pipeline
+
+    if uploader is None:
+        uploader = create_uploader()
+
+    def stage_download(item):
+        identifier, subtitle_file = resolve_subtitle(item["input"])
+        return {"identifier": identifier, "subtitle_file": subtitle_file}
+
+    def stage_generate(item):
+        output_folder, _ = ensure_blog(item["subtitle_file"], model_config, optimize_images=False)
+        return {"output_folder": output_folder}
+
+    def stage_optimize(item):
+        return {"optimized_images": optimize_folder_images(item["output_folder"])}
+
+    def stage_upload(item):
+        # Post yang sudah dibuat pada run sebelumnya (tercatat di indeks) tidak diupload ulang
+        entry = post_index.get(post_index.identifier_for(os.path.basename(item["output_folder"]))[0])
+        if entry and entry["post_ids"]:
+            print(f"⏭️ {item['key']}: post sudah dibuat sebelumnya ({entry['post_ids']}), upload dilewati")
+            return {"posts": [{"id": post_id, "link": ""} for post_id in entry["post_ids"]]}
+        upload = upload_folder(uploader, item["output_folder"], post_status)
+        return {"posts": [{"id": post["id"], "link": post.get("link", "")} for post in upload.posts]}
+
+    stages = [
+        pipeline.Stage("download", stage_download, download_workers),
+        pipeline.Stage("generate", stage_generate, generate_workers),
+        pipeline.Stage("optimize", stage_optimize, optimize_workers),
+        pipeline.Stage("upload", stage_upload, upload_workers),
+    ]
+    items, seen = [], set()
+    for video in videos:
+        key = video_key(video)
+        if key in seen:
+            print(f"⚠️ Duplikat dilewati: {video}")
+            continue
+        seen.add(key)
+        items.append({"key": key, "input": video})
+
+    print(f"🏭 Pipeline: {len(items)} video, worker download={download_workers} generate={generate_workers} "
+          f"optimize={optimize_workers} upload={upload_workers}, status di {state_file}")
+    return pipeline.run_pipeline(items, stages, pipeline.PipelineState(state_file), queue_size)
+
+def enqueue_videos(videos, post_status='draft', model_config='model.json'):
+    """
+    Masukkan video ke antrean job agar diproses `worker.py` (di direktori kerja yang sama).
+
+    Returns:
+        list: ID job yang dibuat.
+    """
+    from lib import job_queue
+
+    job_ids = [job_queue.enqueue("video", {"nama_file": video, "post_status": post_status,
+                                           "model_config": model_config})
+               for video in videos]
+    for video, job_id in zip(videos, job_ids):
+        print(f"📥 Job {job_id}: {video}")
+    print(f"✅ {len(job_ids)} job masuk antrean {job_queue.db_path()}. Jalankan: python worker.py --slots N")
+    return job_ids
+
+def print_pipeline_summary(results):
+    """Mencetak ringkasan status per video setelah pipeline selesai."""
+    print("\n" + "=" * 50)
+    print("📊 Ringkasan pipeline:")
+    for key, entry in results.items():
+        status = entry.get("status", "pending")
+        if status == "done":
+            posts = entry.get("stages", {}).get("upload", {}).get("posts", [])
+            links = ", ".join(post.get("link") or str(post["id"]) for post in posts)
+            print(f"✅ {key}: {links}")
+        else:
+            print(f"❌ {key}: {status} di tahap {entry.get('stage', '-')} {entry.get('error', '')}".rstrip())
+    done = sum(1 for entry in results.values() if entry.get("status") == "done")
+    print(f"\n🎯 {done}/{len(results)} video selesai")
 
 def main():
     """Fungsi utama"""
@@ -152,10 +400,16 @@ Contoh penggunaan:
   python subs-blog-wordpress.py my-video-file     # Proses dari my-video-file
   python subs-blog-wordpress.py video_id_123     # Proses dari video_id_123
   python subs-blog-wordpress.py subtitle.txt     # Skip download, langsung proses .txt file
+  python subs-blog-wordpress.py --list videos.txt           # Pipeline untuk banyak video
+  python subs-blog-wordpress.py --playlist "https://www.youtube.com/playlist?list=PL..."
+  python subs-blog-wordpress.py --rebuild-index             # Bangun ulang indeks post
+  python subs-blog-wordpress.py --list videos.txt --enqueue # Antrekan untuk worker.py
 
-Script akan menjalankan:
-- Jika input .txt: main.py file.txt → wordpress_uploader.py folder/
-- Jika bukan .txt: get_subs_youtube.py → main.py → wordpress_uploader.py
+Script akan menjalankan (dalam satu proses):
+- Jika input .txt: run_workflow(file.txt) → WordPressUploader.process_folder(folder/)
+- Jika bukan .txt: download_subtitles → run_workflow → WordPressUploader.process_folder
+- Mode --list/--playlist: tahap download, generate, optimize dan upload berjalan
+  bersamaan untuk video berbeda; status disimpan di pipeline_state.json
 
 Catatan:
 - File .env harus berisi kredensial WordPress
@@ -166,8 +420,45 @@ Catatan:
     parser.add_argument(
         'nama_file',
         type=str,
+        nargs='?',
         help='Nama file untuk diproses (bisa .txt file atau nama tanpa ekstensi)'
     )
+
+    parser.add_argument(
+        '--list',
+        dest='list_file',
+        help='File berisi daftar video (satu kode/URL/nama file per baris) untuk mode pipeline'
+    )
+
+    parser.add_argument(
+        '--playlist',
+        help='URL playlist YouTube untuk mode pipeline'
+    )
+
+    parser.add_argument(
+        '--state',
+        default=PIPELINE_STATE_FILE,
+        help=f'File status pipeline untuk resume (default: {PIPELINE_STATE_FILE})'
+    )
+
+    parser.add_argument(
+        '--rebuild-index',
+        action='store_true',
+        help=f'Bangun ulang indeks post ({post_index.DEFAULT_DB_NAME}) dari transkrip dan folder di direktori kerja'
+    )
+
+    parser.add_argument(
+        '--enqueue',
+        action='store_true',
+        help='Masukkan video ke antrean job (jobs.db) alih-alih memprosesnya; jalankan worker.py di direktori ini'
+    )
+
+    parser.add_argument('--download-workers', type=int, default=2, help='Worker tahap download (default: 2)')
+    parser.add_argument('--generate-workers', type=int, default=1, help='Worker tahap generate (default: 1)')
+    parser.add_argument('--optimize-workers', type=int, default=1, help='Worker tahap optimasi gambar (default: 1)')
+    parser.add_argument('--upload-workers', type=int, default=1, help='Worker tahap upload WordPress (default: 1)')
+    parser.add_argument('--queue-size', type=int, default=2,
+                        help='Kapasitas antrean di depan setiap tahap pipeline (default: 2)')
     
     parser.add_argument(
         '--status',
@@ -175,108 +466,78 @@ Catatan:
         default='draft',
         help='Status post WordPress (default: draft)'
     )
+
+    parser.add_argument(
+        '-m', '--model-config',
+        default='model.json',
+        help='File konfigurasi model di model/ (default: model.json)'
+    )
+
+    parser.add_argument('--trace', action='store_true',
+                        help='Catat span per langkah, panggilan API dan upload, lalu tampilkan ringkasan flame di akhir')
+    parser.add_argument('--trace-log', metavar='PATH',
+                        help='Tulis setiap span sebagai satu baris JSON ke file ini (default: GEMINI_TRACE_LOG)')
+    parser.add_argument('--otlp-endpoint', metavar='URL',
+                        help='Kirim span ke collector OpenTelemetry (OTLP/HTTP), mis. http://localhost:4318')
     
     args = parser.parse_args()
-    
-    nama_file = args.nama_file
-    post_status = args.status
-    
-    # Dapatkan direktori script ini
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    
-    # Path absolut untuk semua script
-    get_subs_script = os.path.join(script_dir, 'get_subs_youtube.py')
-    main_script = os.path.join(script_dir, 'main.py')
-    wordpress_script = os.path.join(script_dir, 'wordpress_uploader.py')
-    
-    print(f"🚀 Memulai otomasi untuk: {nama_file}")
-    print(f"📝 Status WordPress: {post_status}")
-    print(f"📂 Script directory: {script_dir}")
-    print("=" * 50)
-    
-    # Cek apakah input sudah file .txt
-    if nama_file.lower().endswith('.txt'):
-        print(f"📄 Input adalah file .txt: {nama_file}")
-        if not os.path.exists(nama_file):
-            print(f"❌ File tidak ditemukan: {nama_file}")
+    tracing.configure(log_path=args.trace_log, otlp_endpoint=args.otlp_endpoint, summary=args.trace)
+    if args.trace:
+        # Dicetak juga saat proses berakhir dengan sys.exit(1)
+        atexit.register(tracing.print_summary)
+    if args.rebuild_index and not (args.nama_file or args.list_file or args.playlist):
+        count = post_index.rebuild()
+        print(f"✅ Indeks post dibangun ulang: {count} entri di {post_index.db_path()}")
+        return
+    if args.rebuild_index:
+        post_index.rebuild()
+    if bool(args.nama_file) + bool(args.list_file) + bool(args.playlist) != 1:
+        parser.error("berikan tepat satu dari nama_file, --list atau --playlist")
+
+    if args.enqueue:
+        try:
+            videos = ([args.nama_file] if args.nama_file else
+                      read_video_list(args.list_file) if args.list_file else expand_playlist(args.playlist))
+        except AutomationError as e:
+            print(f"❌ {e}, menghentikan proses")
             sys.exit(1)
-        subtitle_file = nama_file
-        # Ekstrak identifier dari nama file untuk mencari folder output
-        base_name = os.path.splitext(os.path.basename(nama_file))[0]
-        identifier, is_code = extract_code_or_keywords(base_name)
-        print("\n⏭️ LANGKAH 1: Skip download subtitle (file .txt sudah tersedia)")
-    else:
-        # Ekstrak kode atau keywords dari nama_file
-        identifier, is_code = extract_code_or_keywords(nama_file)
-        
-        # Langkah 1: Cari atau download subtitle
-        print("\n📥 LANGKAH 1: Cari atau download subtitle")
-        subtitle_file = find_subtitle_file(identifier)
-        
-        if subtitle_file:
-            print("✅ File subtitle sudah ada, skip download")
-        else:
-            print("📥 File subtitle tidak ditemukan, mencoba download...")
-            if not run_command(['python', get_subs_script, '-f', nama_file], 
-                              "Download YouTube subtitles"):
-                print("❌ Gagal download subtitles, menghentikan proses")
-                sys.exit(1)
-            
-            # Cari lagi setelah download
-            subtitle_file = find_subtitle_file(identifier)
-            if not subtitle_file:
-                print(f"❌ File subtitle masih tidak ditemukan setelah download")
-                sys.exit(1)
-    
-    # Cek apakah folder output sudah ada
-    print("\n🔍 LANGKAH 2: Cek status folder output")
-    output_folder = find_output_folder(identifier, subtitle_file)
-    
-    if output_folder:
-        # Folder sudah ada, cek isinya
-        has_seo_json, has_html, html_file_path = check_folder_contents(output_folder)
-        
-        if has_seo_json and has_html:
-            print("✅ Folder sudah lengkap (seo.json + HTML), skip generate blog post")
-            need_generate = False
-        else:
-            print("⚠️ Folder tidak lengkap, perlu generate ulang")
-            need_generate = True
-    else:
-        print("⚠️ Folder belum ada, perlu generate blog post")
-        need_generate = True
-    
-    # Langkah 3: Generate blog post (jika diperlukan)
-    if need_generate:
-        print("\n📝 LANGKAH 3: Generate blog post")
-        if not run_command(['python', main_script, subtitle_file], 
-                          "Generate blog post"):
-            print("❌ Gagal generate blog post, menghentikan proses")
+        enqueue_videos(videos, args.status, args.model_config)
+        return
+
+    if args.list_file or args.playlist:
+        try:
+            videos = read_video_list(args.list_file) if args.list_file else expand_playlist(args.playlist)
+            results = run_pipeline(videos, args.status, args.model_config, args.state,
+                                   download_workers=args.download_workers, generate_workers=args.generate_workers,
+                                   optimize_workers=args.optimize_workers, upload_workers=args.upload_workers,
+                                   queue_size=args.queue_size)
+        except AutomationError as e:
+            print(f"❌ {e}, menghentikan proses")
             sys.exit(1)
-        
-        # Cari folder output setelah generate dengan multiple strategies
-        output_folder = find_output_folder(identifier, subtitle_file)
-        if not output_folder:
-            print(f"❌ Folder output tidak ditemukan setelah generate untuk identifier: {identifier}")
-            print(f"💡 Mencoba dengan nama file asli: {subtitle_file}")
+        print_pipeline_summary(results)
+        if any(entry.get("status") != "done" for entry in results.values()):
             sys.exit(1)
-    else:
-        print("\n⏭️ LANGKAH 3: Skip generate blog post (sudah ada)")
-    
-    # Langkah 4: Upload ke WordPress
-    print("\n📤 LANGKAH 4: Upload ke WordPress")
-    if not run_command(['python', wordpress_script, '-f', output_folder, '-s', post_status], 
-                      "Upload ke WordPress"):
-        print("❌ Gagal upload ke WordPress")
+        return
+
+    print(f"🚀 Memulai otomasi untuk: {args.nama_file}")
+    print(f"📝 Status WordPress: {args.status}")
+    print(f"📂 Script directory: {SCRIPT_DIR}")
+    print("=" * 50)
+
+    try:
+        result = process(args.nama_file, args.status, args.model_config)
+    except AutomationError as e:
+        print(f"❌ {e}, menghentikan proses")
         sys.exit(1)
     
     print("\n" + "=" * 50)
     print("🎉 Proses otomasi selesai!")
-    print(f"✅ Identifier: {identifier}")
-    print(f"✅ Subtitle file: {subtitle_file}")
-    print(f"✅ Blog folder: {output_folder}")
-    print(f"✅ WordPress uploaded dengan status: {post_status}")
+    print(f"✅ Identifier: {result.identifier}")
+    print(f"✅ Subtitle file: {result.subtitle_file}")
+    print(f"✅ Blog folder: {result.output_folder}")
+    for post in result.upload.posts:
+        print(f"✅ WordPress post {post['id']} ({args.status}): {post.get('link', '')}")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
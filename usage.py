@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+import os
+import sys
+import argparse
+from lib import usage_ledger
+
+def print_table(rows, by):
+    """Mencetak hasil agregasi sebagai tabel."""
+    if not rows:
+        print("ℹ️ Belum ada pemakaian yang tercatat untuk filter ini.")
+        return
+    key_width = min(60, max([len(str(row["key"])) for row in rows] + [len(by)]))
+    print(f"{by.capitalize():<{key_width}} {'Panggilan':>9} {'Input':>12} {'Output':>11} {'Cache':>10} "
+          f"{'Thinking':>9} {'Gambar':>6} {'Biaya ($)':>11} {'Latensi':>8}")
+    for row in rows:
+        latency = f"{row['avg_latency']:.1f}s" if row["avg_latency"] else "-"
+        print(f"{str(row['key'])[:key_width]:<{key_width}} {row['calls']:9d} {row['prompt_tokens'] or 0:12d} "
+              f"{row['output_tokens'] or 0:11d} {row['cached_tokens'] or 0:10d} {row['thinking_tokens'] or 0:9d} "
+              f"{row['images'] or 0:6d} {row['cost'] or 0:11.4f} {latency:>8}")
+    total_cost = sum(row["cost"] or 0 for row in rows)
+    total_calls = sum(row["calls"] for row in rows)
+    print(f"\n📊 Total: {total_calls} panggilan, estimasi biaya ${total_cost:.4f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Ringkasan pemakaian dan biaya API dari ledger SQLite.")
+    parser.add_argument("--db", help="Path database ledger (default: usage.db di root project atau GEMINI_USAGE_DB).")
+    subparsers = parser.add_subparsers(dest="command")
+
+    summary = subparsers.add_parser("summary", help="Agregasi pemakaian per hari, model, post atau langkah.")
+    summary.add_argument("--by", choices=["day", "model", "post", "step"], default="day",
+                         help="Pengelompokan (default: day).")
+    summary.add_argument("--since", help="Mulai tanggal (YYYY-MM-DD).")
+    summary.add_argument("--until", help="Sampai tanggal (YYYY-MM-DD), inklusif.")
+    summary.add_argument("--model", help="Hanya model ini.")
+    summary.add_argument("--post", help="Hanya post (nama direktori output) ini.")
+
+    importer = subparsers.add_parser("import", help="Impor usage_log.csv lama ke ledger (sekali per file).")
+    importer.add_argument("csv_files", nargs="*", default=["usage_log.csv"],
+                          help="File CSV yang diimpor (default: usage_log.csv).")
+
+    # Tanpa subcommand: ringkasan per hari
+    parser.set_defaults(by="day", since=None, until=None, model=None, post=None)
+    args = parser.parse_args()
+    if args.db:
+        usage_ledger.configure(args.db)
+
+    if args.command == "import":
+        for csv_file in args.csv_files:
+            if not os.path.exists(csv_file):
+                print(f"❌ File tidak ditemukan: {csv_file}")
+                sys.exit(1)
+            imported = usage_ledger.import_csv(csv_file)
+            if imported:
+                print(f"✅ {imported} baris dari {csv_file} diimpor ke {usage_ledger.db_path()}")
+            else:
+                print(f"ℹ️ {csv_file} sudah pernah diimpor, dilewati.")
+        return
+
+    print(f"📒 Ledger: {usage_ledger.db_path()}\n")
+    print_table(usage_ledger.aggregate(by=args.by, since=args.since, until=args.until, model=args.model,
+                                       post_id=args.post), args.by)
+
+if __name__ == "__main__":
+    main()
@@ -11,8 +11,21 @@ from pathlib import Path
 from dotenv import load_dotenv
 import json
 import mimetypes
-from bs4 import BeautifulSoup
 import argparse
+from dataclasses import dataclass, field
+from lib import tracing
+
+@dataclass
+class UploadResult:
+    """Hasil `WordPressUploader.process_folder` untuk satu folder."""
+    folder: str
+    posts: list = field(default_factory=list)     # respon WordPress untuk setiap post yang dibuat
+    images: dict = field(default_factory=dict)    # {nama gambar: media data}
+    failed: list = field(default_factory=list)    # file HTML yang gagal diupload
+
+    @property
+    def ok(self):
+        return bool(self.posts) and not self.failed
 
 class WordPressUploader:
     def __init__(self, env_file='.env'):
@@ -45,6 +58,19 @@ class WordPressUploader:
             'Authorization': f'Basic {token.decode("utf-8")}',
             'Content-Type': 'application/json'
         }
+
+        # Satu session untuk semua request, agar koneksi TLS ke WordPress dipakai ulang
+        self.session = requests.Session()
+
+    def _post(self, url, **kwargs):
+        """POST lewat session bersama, dicatat sebagai span HTTP (status, byte dikirim/diterima)."""
+        with tracing.span(f"POST {url.rsplit('/', 1)[-1]}", kind="http", method="POST", url=url) as span:
+            response = self.session.post(url, **kwargs)
+            span.set(status_code=response.status_code, bytes_sent=len(response.request.body or b""),
+                     bytes_received=len(response.content))
+            if response.status_code >= 400:
+                span.fail(f"HTTP {response.status_code}")
+            return response
     
     def get_small_images(self, folder_path, max_size_kb=100):
         """Dapatkan list gambar yang ukurannya kurang dari max_size_kb"""
@@ -91,7 +117,7 @@ class WordPressUploader:
                 'Authorization': self.headers['Authorization']
             }
             
-            response = requests.post(
+            response = self._post(
                 self.media_endpoint,
                 headers=headers_upload,
                 files=files,
@@ -160,7 +186,7 @@ class WordPressUploader:
         }
         
         # Kirim request ke Rank Math API
-        response = requests.post(
+        response = self._post(
             self.rankmath_endpoint,
             headers=headers_rankmath,
             data=rankmath_data
@@ -171,9 +197,9 @@ class WordPressUploader:
             print(f"✅ Rank Math SEO berhasil diupdate")
             
             # Log field yang berhasil diupdate
-            for field, status in result.items():
+            for key, status in result.items():
                 if status == 'updated':
-                    print(f"   ✓ {field}: updated")
+                    print(f"   ✓ {key}: updated")
             
             return True
         else:
@@ -190,7 +216,8 @@ class WordPressUploader:
         with open(html_file_path, 'r', encoding='utf-8') as file:
             html_content = file.read()
         
-        # Parse HTML
+        # Parse HTML (bs4 diimpor di sini karena hanya dibutuhkan untuk post dari file HTML)
+        from bs4 import BeautifulSoup
         soup = BeautifulSoup(html_content, 'html.parser')
         
         # 1. Extract title dari H1 tag (prioritas utama)
@@ -229,7 +256,7 @@ class WordPressUploader:
             print(f"🔗 Slug: {seo_data['slug']}")
         
         # Kirim ke WordPress
-        response = requests.post(
+        response = self._post(
             self.posts_endpoint,
             headers=self.headers,
             json=post_data
@@ -252,12 +279,18 @@ class WordPressUploader:
             return None
     
     def process_folder(self, folder_path, post_status='draft'):
-        """Proses semua file HTML dan upload gambar kecil dalam folder"""
+        """
+        Proses semua file HTML dan upload gambar kecil dalam folder.
+
+        Returns:
+            UploadResult: Post dan gambar yang berhasil diupload serta file HTML yang gagal.
+        """
         folder_path = Path(folder_path)
+        result = UploadResult(folder=str(folder_path))
         
         if not folder_path.exists():
             print(f"❌ Folder tidak ditemukan: {folder_path}")
-            return
+            return result
         
         print(f"📁 Memproses folder: {folder_path}")
         
@@ -278,6 +311,7 @@ class WordPressUploader:
                 media_data = self.upload_image(str(image_file))
                 if media_data:
                     uploaded_images[image_file.stem] = media_data
+        result.images = uploaded_images
         
         # Proses setiap file HTML
         for html_file in html_files:
@@ -295,7 +329,13 @@ class WordPressUploader:
                 print("⚠️ Tidak ada gambar yang diupload untuk featured image")
             
             # Buat post dengan SEO data
-            self.create_post(str(html_file), featured_image_id, post_status, seo_data)
+            post_info = self.create_post(str(html_file), featured_image_id, post_status, seo_data)
+            if post_info:
+                result.posts.append(post_info)
+            else:
+                result.failed.append(str(html_file))
+
+        return result
 
 
 def main():
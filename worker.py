@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Job Queue Worker
+Mengambil job dari antrean SQLite (jobs.db) dan menjalankannya dengan N slot bersamaan.
+Job dimasukkan oleh `main.py --enqueue` dan `subs_blog_wordpress.py --enqueue`.
+"""
+
+import os
+import sys
+import time
+import socket
+import signal
+import argparse
+import threading
+
+from lib import job_queue
+
+class Worker:
+    """
+    Worker dengan `slots` thread; setiap thread mengambil satu job sekaligus.
+    Satu thread heartbeat memperpanjang lease semua job yang sedang berjalan,
+    sehingga job hanya diambil ulang worker lain jika proses ini mati.
+    """
+    def __init__(self, slots=1, lease_seconds=job_queue.DEFAULT_LEASE_SECONDS, poll_seconds=2.0, once=False,
+                 worker_id=None):
+        self.slots = max(1, slots)
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self.once = once
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.stop = threading.Event()
+        self._active = set()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.processed = {"done": 0, "queued": 0, "failed": 0}
+
+    def _uploader(self):
+        # Satu WordPressUploader (dan session HTTP) per slot
+        if getattr(self._local, "uploader", None) is None:
+            import subs_blog_wordpress
+            self._local.uploader = subs_blog_wordpress.create_uploader()
+        return self._local.uploader
+
+    def run_workflow_job(self, job):
+        """Job "workflow": satu `main.run_workflow` dengan checkpoint per langkah."""
+        import main as blog_workflow
+
+        payload = job.payload
+
+        def on_step_done(step_id, status, seconds):
+            job_queue.checkpoint(job.id, step_id, status, seconds)
+
+        result = blog_workflow.run_workflow(
+            payload["input_path"], payload["prompt_path"], payload["model_config_path"], payload["steps"],
+            payload.get("seo_keyphrase_choice"), on_step_done=on_step_done, **payload.get("options", {}))
+        return {"output_dir": result["output_dir"],
+                "steps": {str(step_id): step["status"] for step_id, step in result["steps"].items()}}
+
+    def run_video_job(self, job):
+        """Job "video": download subtitle, generate dan upload seperti `subs_blog_wordpress.process`."""
+        import subs_blog_wordpress
+        from lib import post_index
+
+        payload = job.payload
+        uploader = self._uploader()
+
+        start = time.perf_counter()
+        identifier, subtitle_file = subs_blog_wordpress.resolve_subtitle(payload["nama_file"])
+        job_queue.checkpoint(job.id, "subtitle", "ok", time.perf_counter() - start)
+
+        def on_step_done(step_id, status, seconds):
+            job_queue.checkpoint(job.id, step_id, status, seconds)
+
+        output_folder, _ = subs_blog_wordpress.ensure_blog(subtitle_file, payload.get("model_config", "model.json"),
+                                                           on_step_done=on_step_done)
+
+        # Post yang sudah dibuat pada percobaan sebelumnya tidak diupload ulang
+        # Kunci indeks diambil dari folder output (= nama transkrip), bukan dari input job
+        entry = post_index.get(post_index.identifier_for(os.path.basename(output_folder))[0])
+        if entry and entry["post_ids"] and job.attempts > 1:
+            print(f"⏭️ Job {job.id}: post sudah dibuat sebelumnya ({entry['post_ids']}), upload dilewati")
+            post_ids = entry["post_ids"]
+        else:
+            start = time.perf_counter()
+            upload = subs_blog_wordpress.upload_folder(uploader, output_folder, payload.get("post_status", "draft"))
+            job_queue.checkpoint(job.id, "upload", "ok", time.perf_counter() - start)
+            post_ids = [post["id"] for post in upload.posts]
+        return {"identifier": identifier, "subtitle_file": subtitle_file, "output_folder": output_folder,
+                "post_ids": post_ids}
+
+    def execute(self, job):
+        print(f"\n▶️ [{self.worker_id}] Job {job.id} ({job.kind}, percobaan {job.attempts}/{job.max_attempts})")
+        start = time.perf_counter()
+        try:
+            result = self.run_video_job(job) if job.kind == "video" else self.run_workflow_job(job)
+        except Exception as e:
+            status = job_queue.fail(job.id, self.worker_id, e)
+            print(f"❌ Job {job.id} gagal: {e} → {status or 'lease sudah diambil worker lain'}")
+            if status:
+                with self._lock:
+                    self.processed[status] += 1
+            return
+        if job_queue.complete(job.id, self.worker_id, result):
+            with self._lock:
+                self.processed["done"] += 1
+            print(f"✅ Job {job.id} selesai dalam {time.perf_counter() - start:.1f} detik")
+        else:
+            print(f"⚠️ Job {job.id} selesai, tetapi lease-nya sudah diambil worker lain")
+
+    def _slot(self):
+        while not self.stop.is_set():
+            job = job_queue.claim(self.worker_id, lease_seconds=self.lease_seconds)
+            if job is None:
+                if self.once:
+                    break
+                self.stop.wait(self.poll_seconds)
+                continue
+            with self._lock:
+                self._active.add(job.id)
+            try:
+                self.execute(job)
+            finally:
+                with self._lock:
+                    self._active.discard(job.id)
+
+    def _heartbeat(self, done):
+        while not done.wait(max(1.0, self.lease_seconds / 3)):
+            with self._lock:
+                active = list(self._active)
+            try:
+                lost = job_queue.heartbeat(active, self.worker_id, self.lease_seconds)
+            except Exception as e:
+                print(f"⚠️ Heartbeat gagal: {e}")
+                continue
+            for job_id in lost:
+                print(f"⚠️ Lease job {job_id} hilang (diambil worker lain atau dibatalkan)")
+
+    def run(self):
+        """Menjalankan slot sampai dihentikan (atau antrean kosong dengan `once`)."""
+        print(f"🛠️ Worker {self.worker_id}: {self.slots} slot, lease {self.lease_seconds} detik, "
+              f"antrean {job_queue.db_path()} (cwd {os.getcwd()})")
+        done = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(done,), name="heartbeat", daemon=True)
+        heartbeat.start()
+        slots = [threading.Thread(target=self._slot, name=f"slot-{n + 1}", daemon=True) for n in range(self.slots)]
+        for thread in slots:
+            thread.start()
+        try:
+            for thread in slots:
+                while thread.is_alive():
+                    thread.join(0.5)
+        finally:
+            done.set()
+        print(f"👋 Worker berhenti: {self.processed['done']} selesai, {self.processed['queued']} diantrekan ulang, "
+              f"{self.processed['failed']} gagal")
+
+def print_status(limit):
+    """Mencetak jumlah job per status dan job terbaru."""
+    counts = job_queue.counts()
+    print(f"📋 Antrean {job_queue.db_path()}: " + ", ".join(f"{status} {n}" for status, n in counts.items()))
+    for job in job_queue.list_jobs(limit=limit):
+        target = job.payload.get("input_path") or job.payload.get("nama_file", "")
+        steps = " ".join(f"{step}:{info['status']}" for step, info in job.checkpoint.items())
+        print(f"  #{job.id:<5} {job.status:<8} {job.kind:<8} {job.attempts}/{job.max_attempts} "
+              f"{os.path.basename(target)[:50]:<50} {steps}")
+        if job.error:
+            print(f"         ↳ {job.error}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker antrean job pembuatan blog (jobs.db).")
+    parser.add_argument("--db", help="Path database antrean (default: jobs.db di root project atau GEMINI_JOBS_DB).")
+    subparsers = parser.add_subparsers(dest="command")
+
+    run = subparsers.add_parser("run", help="Jalankan worker (default).")
+    run.add_argument("--slots", type=int, default=2, help="Jumlah job yang dijalankan bersamaan (default: 2).")
+    run.add_argument("--lease", type=int, default=job_queue.DEFAULT_LEASE_SECONDS,
+                     help="Durasi lease job dalam detik; diperpanjang heartbeat (default: %(default)s).")
+    run.add_argument("--poll", type=float, default=2.0, help="Jeda cek antrean saat kosong, detik (default: 2).")
+    run.add_argument("--once", action="store_true", help="Berhenti saat antrean kosong.")
+    run.add_argument("--worker-id", help="ID worker (default: hostname-pid).")
+
+    status = subparsers.add_parser("status", help="Tampilkan status antrean dan job terbaru.")
+    status.add_argument("--limit", type=int, default=20, help="Jumlah job terbaru yang ditampilkan (default: 20).")
+
+    # Tanpa subcommand: jalankan worker
+    parser.set_defaults(slots=2, lease=job_queue.DEFAULT_LEASE_SECONDS, poll=2.0, once=False, worker_id=None)
+    args = parser.parse_args()
+    if args.db:
+        job_queue.configure(args.db)
+
+    if args.command == "status":
+        print_status(args.limit)
+        return
+
+    worker = Worker(args.slots, args.lease, args.poll, args.once, args.worker_id)
+
+    def handle_signal(signum, frame):
+        if worker.stop.is_set():
+            # Sinyal kedua: keluar langsung; job yang berjalan diambil ulang setelah lease habis
+            print("\n⛔ Keluar paksa.")
+            os._exit(1)
+        print("\n🛑 Berhenti mengambil job baru, menunggu job yang sedang berjalan (Ctrl+C lagi untuk keluar paksa)...")
+        worker.stop.set()
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+    worker.run()
+    if worker.processed["failed"]:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()